@@ -0,0 +1,151 @@
+"""Micro-benchmark for the per-hook bookkeeping of DefiCheck3._analyze_state.
+
+Records the (function, pre/post, opcode) hook stream that LASER produces for
+a bytecode file, then replays it against node graphs of growing size. For
+every hook the replay does what _analyze_state does before building nodes:
+look up the entry/exit pair of the function and, on post hooks, the pending
+post-hook node. The legacy full scans are replayed alongside for comparison.
+
+Usage (from code/DMC):
+    python benchmarks/deficheck_hook_bench.py [bytecode_file] [--sizes 1000 10000 100000]
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+from types import SimpleNamespace
+
+from mythril.analysis.module.module_helpers import is_prehook
+from mythril.analysis.module.modules import DefiCheck3 as deficheck
+from mythril.analysis.module.modules.DefiCheck3 import NodeStore, NodeType, Post_hooks
+
+
+def record_hook_stream(bytecode_file):
+    """Run myth analyze on bytecode_file and record every DefiCheck3 hook call."""
+    stream = []
+
+    def _record(self, state):
+        prehook = is_prehook()
+        if prehook:
+            opcode = state.get_current_instruction()["opcode"]
+        else:
+            opcode = state.environment.code.instruction_list[state.mstate.pc - 1]["opcode"]
+        stream.append((state.environment.active_function_name, prehook, opcode))
+        return []
+
+    from mythril.interfaces import cli
+
+    analyze_state = deficheck.DefiCheck3._analyze_state
+    deficheck.DefiCheck3._analyze_state = _record
+    argv = sys.argv
+    sys.argv = ["myth", "analyze", "-f", bytecode_file, "-m", "DefiCheck3", "-t", "2"]
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            cli.main()
+    except SystemExit:
+        pass
+    finally:
+        sys.argv = argv
+        deficheck.DefiCheck3._analyze_state = analyze_state
+    return stream
+
+
+def _fake_node(uid, function_name, opcode, node_type=NodeType.CONTROL_FLOW, post_flag=False):
+    return SimpleNamespace(uid=uid, function_name=function_name, tx_id=1, opcode=opcode,
+                           offset=uid, node_type=node_type, symbol_vars=[], post_flag=post_flag)
+
+
+def build_graph(stream, size):
+    """Entry/exit pairs for every function in stream, padded with size filler nodes."""
+    nodes = NodeStore()
+    for function_name in dict.fromkeys(func for func, _, _ in stream):
+        for _ in range(2):
+            uid = len(nodes)
+            nodes[uid] = _fake_node(uid, function_name, "", NodeType.ENTRY_OR_EXIT_POINT)
+    for _ in range(size):
+        uid = len(nodes)
+        nodes[uid] = _fake_node(uid, "filler()", "JUMPDEST")
+    return nodes
+
+
+def replay_indexed(nodes, stream):
+    for function_name, prehook, opcode in stream:
+        EntryNode_uid, ExitNode_uid = nodes.entry_exit(function_name)
+        if prehook:
+            if opcode in Post_hooks:
+                uid = len(nodes)
+                nodes[uid] = _fake_node(uid, function_name, opcode, post_flag=True)
+            continue
+        old_node = nodes.pending_post_node()
+        if old_node is not None:
+            old_node.post_flag = False
+            EntryNode_uid = nodes.entry_uid(old_node.function_name)
+
+
+def replay_legacy(nodes, stream):
+    for function_name, prehook, opcode in stream:
+        EntryNode_uid = ExitNode_uid = -1
+        for node in nodes:
+            if nodes[node].function_name == function_name and nodes[node].node_type == NodeType.ENTRY_OR_EXIT_POINT:
+                if EntryNode_uid == -1:
+                    EntryNode_uid = node
+                else:
+                    ExitNode_uid = node
+                    break
+        if prehook:
+            if opcode in Post_hooks:
+                uid = len(nodes)
+                nodes[uid] = _fake_node(uid, function_name, opcode, post_flag=True)
+            continue
+        old_node = None
+        for node_uid in nodes:
+            if nodes[node_uid].post_flag:
+                old_node = nodes[node_uid]
+                break
+        if old_node is not None:
+            old_node.post_flag = False
+            for node in nodes:
+                if nodes[node].function_name == old_node.function_name and nodes[node].node_type == NodeType.ENTRY_OR_EXIT_POINT:
+                    EntryNode_uid = node
+                    break
+
+
+def _us_per_hook(replay, stream, size, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        nodes = build_graph(stream, size)
+        start = time.perf_counter()
+        replay(nodes, stream)
+        best = min(best, time.perf_counter() - start)
+    return best / len(stream) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("bytecode_file", nargs="?", default="tests/testdata/inputs/metacoin.sol.o")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--legacy-limit", type=int, default=10000,
+                        help="skip the legacy replay above this many filler nodes")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    stream = record_hook_stream(args.bytecode_file)
+    if not stream:
+        print("no DefiCheck3 hooks recorded for", args.bytecode_file)
+        return
+    print("recorded {} hooks ({} post hooks) from {}".format(
+        len(stream), sum(1 for _, prehook, _ in stream if not prehook), args.bytecode_file))
+    print("{:>10} {:>16} {:>16}".format("nodes", "indexed us/hook", "legacy us/hook"))
+    for size in args.sizes:
+        indexed = _us_per_hook(replay_indexed, stream, size, args.repeat)
+        if size <= args.legacy_limit:
+            legacy = "{:16.2f}".format(_us_per_hook(replay_legacy, stream, size, 1))
+        else:
+            legacy = "{:>16}".format("-")
+        print("{:>10} {:16.2f} {}".format(size, indexed, legacy))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Opcode throughput of LaserEVM.execute_state over the solidity_examples contracts.
+
+Runs myth analyze on every bytecode file given (all of solidity_examples/*.bin
+by default) and keeps a sample of the global states execute_state was called
+with. The sampled states are then replayed through execute_state of a fresh
+LaserEVM without any hooks, so the numbers cover instruction decoding and
+evaluation only. The benchmark reports instructions per second for every
+contract and for the most executed opcodes over all contracts.
+
+Run it on two trees to compare dispatch implementations.
+
+Usage (from code/DMC):
+    python benchmarks/opcode_throughput_bench.py [bytecode_file ...] [--samples 200] [--rounds 3] [--top 20]
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import os
+import sys
+import time
+from collections import defaultdict
+from copy import copy
+
+from mythril.laser.ethereum.svm import LaserEVM
+
+
+def record_states(bytecode_file, samples, transaction_count):
+    """Run myth analyze on bytecode_file, keeping up to samples states per opcode."""
+    recorded = defaultdict(list)
+    execute_state = LaserEVM.execute_state
+
+    def _record(self, global_state):
+        op_code = global_state.get_current_instruction()["opcode"]
+        if len(recorded[op_code]) < samples:
+            recorded[op_code].append(copy(global_state))
+        return execute_state(self, global_state)
+
+    from mythril.interfaces import cli
+
+    LaserEVM.execute_state = _record
+    argv = sys.argv
+    sys.argv = [
+        "myth",
+        "analyze",
+        "-f",
+        bytecode_file,
+        "-t",
+        str(transaction_count),
+        "--disable-block-stepping",
+    ]
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            cli.main()
+    except SystemExit:
+        pass
+    finally:
+        sys.argv = argv
+        LaserEVM.execute_state = execute_state
+    return recorded
+
+
+def _replay(laser, states, rounds):
+    """Seconds per instruction of execute_state over states, best of rounds."""
+    best = None
+    for _ in range(rounds):
+        # execute_state works on copies, the recorded states stay untouched
+        start = time.perf_counter()
+        for global_state in states:
+            laser.execute_state(global_state)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(states)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("bytecode_files", nargs="*")
+    parser.add_argument("--samples", type=int, default=200, help="states kept per opcode")
+    parser.add_argument("--transaction-count", type=int, default=1)
+    parser.add_argument("--rounds", type=int, default=3, help="replays, the best one counts")
+    parser.add_argument("--top", type=int, default=20, help="opcodes shown, most executed first")
+    args = parser.parse_args()
+
+    bytecode_files = args.bytecode_files or sorted(glob.glob("solidity_examples/*.bin"))
+    laser = LaserEVM(requires_statespace=False)
+    per_opcode = defaultdict(lambda: [0, 0.0])
+
+    print("{:<32} {:>8} {:>14}".format("contract", "states", "instr/s"))
+    for bytecode_file in bytecode_files:
+        recorded = record_states(bytecode_file, args.samples, args.transaction_count)
+        count = 0
+        elapsed = 0.0
+        for op_code, states in recorded.items():
+            seconds = _replay(laser, states, args.rounds)
+            count += len(states)
+            elapsed += seconds * len(states)
+            per_opcode[op_code][0] += len(states)
+            per_opcode[op_code][1] += seconds * len(states)
+        if count:
+            print(
+                "{:<32} {:>8} {:>14.0f}".format(
+                    os.path.basename(bytecode_file), count, count / elapsed
+                )
+            )
+
+    print()
+    print("{:<14} {:>8} {:>14}".format("opcode", "states", "instr/s"))
+    ranked = sorted(per_opcode.items(), key=lambda item: -item[1][0])
+    for op_code, (count, elapsed) in ranked[: args.top]:
+        print("{:<14} {:>8} {:>14.0f}".format(op_code, count, count / elapsed))
+    count = sum(count for count, _ in per_opcode.values())
+    elapsed = sum(elapsed for _, elapsed in per_opcode.values())
+    if count:
+        print("{:<14} {:>8} {:>14.0f}".format("total", count, count / elapsed))
+
+
+if __name__ == "__main__":
+    main()
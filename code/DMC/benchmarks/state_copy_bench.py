@@ -0,0 +1,136 @@
+"""Per-opcode cost of the state snapshot taken by StateTransition.
+
+Runs myth analyze on a bytecode file and keeps a sample of the global states
+each opcode was executed on. Every sampled instruction is then replayed
+without hooks, and the benchmark reports per opcode the time of the state
+snapshot alone (copy(global_state), as done by
+StateTransition.call_on_state_copy) and of the whole instruction, together
+with the bytes tracemalloc saw allocated by each.
+
+Run it on two trees to compare snapshot implementations.
+
+Usage (from code/DMC):
+    python benchmarks/state_copy_bench.py [bytecode_file] [--samples 50] [--top 25]
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from copy import copy
+
+from mythril.laser.ethereum.evm_exceptions import VmException
+from mythril.laser.ethereum.instructions import Instruction
+from mythril.laser.ethereum.transaction import TransactionEndSignal, TransactionStartSignal
+
+
+def record_states(bytecode_file, samples, transaction_count):
+    """Run myth analyze on bytecode_file, keeping up to samples states per opcode."""
+    recorded = defaultdict(list)
+    evaluate = Instruction.evaluate
+
+    def _record(self, global_state, post=False):
+        if not post and len(recorded[self.op_code]) < samples:
+            recorded[self.op_code].append((global_state, self.dynamic_loader))
+        return evaluate(self, global_state, post)
+
+    from mythril.interfaces import cli
+
+    Instruction.evaluate = _record
+    argv = sys.argv
+    sys.argv = ["myth", "analyze", "-f", bytecode_file, "-t", str(transaction_count)]
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            cli.main()
+    except SystemExit:
+        pass
+    finally:
+        sys.argv = argv
+        Instruction.evaluate = evaluate
+    return recorded
+
+
+def _run(action, global_state, dynamic_loader):
+    try:
+        action(global_state, dynamic_loader)
+    except (VmException, TransactionEndSignal, TransactionStartSignal):
+        pass
+
+
+def _measure(action, states):
+    """Mean seconds and peak allocated bytes of action over states.
+
+    Timing and allocation tracing are separate passes, tracemalloc slows
+    every allocation down by an order of magnitude.
+    """
+    start = time.perf_counter()
+    for global_state, dynamic_loader in states:
+        _run(action, global_state, dynamic_loader)
+    elapsed = time.perf_counter() - start
+    allocated = 0
+    for global_state, dynamic_loader in states:
+        tracemalloc.start()
+        _run(action, global_state, dynamic_loader)
+        allocated += tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return elapsed / len(states), allocated / len(states)
+
+
+def _snapshot(global_state, _):
+    copy(global_state)
+
+
+def _execute(global_state, dynamic_loader):
+    Instruction(global_state.get_current_instruction()["opcode"], dynamic_loader).evaluate(
+        global_state
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "bytecode_file", nargs="?", default="solidity_examples/ERC20_0.4.19.bin"
+    )
+    parser.add_argument("--samples", type=int, default=50, help="states kept per opcode")
+    parser.add_argument("--transaction-count", type=int, default=2)
+    parser.add_argument("--top", type=int, default=25, help="opcodes shown, most executed first")
+    args = parser.parse_args()
+
+    recorded = record_states(args.bytecode_file, args.samples, args.transaction_count)
+    print(
+        "{:<14} {:>7} {:>12} {:>12} {:>12} {:>12}".format(
+            "opcode", "states", "copy us", "copy bytes", "instr us", "instr bytes"
+        )
+    )
+    totals = [0.0, 0.0, 0.0, 0.0]
+    ranked = sorted(recorded.items(), key=lambda item: -len(item[1]))
+    for opcode, states in ranked[: args.top]:
+        copy_time, copy_bytes = _measure(_snapshot, states)
+        instr_time, instr_bytes = _measure(_execute, states)
+        for i, value in enumerate((copy_time, copy_bytes, instr_time, instr_bytes)):
+            totals[i] += value
+        print(
+            "{:<14} {:>7} {:>12.1f} {:>12.0f} {:>12.1f} {:>12.0f}".format(
+                opcode,
+                len(states),
+                copy_time * 1e6,
+                copy_bytes,
+                instr_time * 1e6,
+                instr_bytes,
+            )
+        )
+    shown = min(args.top, len(ranked))
+    print(
+        "{:<14} {:>7} {:>12.1f} {:>12.0f} {:>12.1f} {:>12.0f}".format(
+            "mean", "", *(total / shown * (1e6 if i % 2 == 0 else 1) for i, total in enumerate(totals))
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -136,6 +136,7 @@ def run_myth(type, address, creationCode, index):
                     '--execution-timeout', '1800',
                     '--transaction-sequences', '[[0x095ea7b3,0xcae9ca51,0xa22cb465,0xa9059cbb],[0x23b872dd,0x42842e0e]]',
                     '--infura-id', 'a00f214ce0b940e2a5b67459c2b1fcc3',
+                    '--onchain-cache', './onchain_cache',
                     '--solver-timeout', '15000']
                 # 清空并重新运行
                 with open(output_file, 'w') as f:
@@ -168,6 +169,7 @@ def run_myth(type, address, creationCode, index):
                    '--transaction-sequences', '[[],[0x095ea7b3,0xcae9ca51,0xa22cb465,0xa9059cbb],[0x23b872dd,0x42842e0e]]',
                    '-t','3',
                    '--infura-id', 'a00f214ce0b940e2a5b67459c2b1fcc3',
+                   '--onchain-cache', './onchain_cache',
                     '--solver-timeout', '15000']
             # 清空并重新运行
             with open(output_file, 'w') as f:
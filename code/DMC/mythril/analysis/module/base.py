@@ -4,7 +4,7 @@ This module includes an definition of the DetectionModule interface.
 DetectionModules implement different analysis rules to find weaknesses and vulnerabilities.
 """
 import logging
-from typing import List, Set, Optional, Tuple
+from typing import Any, Callable, List, Set, Optional, Tuple
 
 from mythril.analysis.report import Issue
 from mythril.laser.ethereum.state.global_state import GlobalState
@@ -42,6 +42,8 @@ class DetectionModule(ABC):
                 [IMPORTANT] POST entry points severely slow down the analysis, try to always use callback style modules
     :param pre_hooks: A list of instructions to hook the laser vm for (pre execution of the instruction)
     :param post_hooks: A list of instructions to hook the laser vm for (post execution of the instruction)
+    :param function_filter: Optionally, a function taking an active_function_name that tells whether the
+                module is interested in that function. The hooks of the module do not run in other functions.
     """
 
     name = "Detection Module Name / Title"
@@ -50,6 +52,7 @@ class DetectionModule(ABC):
     entry_point: EntryPoint = EntryPoint.CALLBACK
     pre_hooks: List[str] = []
     post_hooks: List[str] = []
+    function_filter: Optional[Callable[[str], bool]] = None
 
     def __init__(self) -> None:
         self.issues: List[Issue] = []
@@ -60,6 +63,34 @@ class DetectionModule(ABC):
         """Resets the storage of this module"""
         self.issues = []
 
+    def start_worker(self) -> None:
+        """Runs in each worker process of a forked exploration right after the fork"""
+        self._worker_issue_count = len(self.issues)
+
+    def export_worker_state(self) -> Any:
+        """
+        Runs in each worker process of a forked exploration once it is done
+        :return: What the worker found, merged with merge_worker_state
+        """
+        return self.issues[self._worker_issue_count :], self.cache
+
+    def merge_worker_state(self, state: Any) -> None:
+        """
+        Merges what a worker process of a forked exploration found into this module
+        :param state: What export_worker_state returned in the worker
+        """
+        issues, cache = state
+        self.issues += issues
+        self.cache |= cache
+
+    def stealable(self, global_state: GlobalState) -> bool:
+        """
+        Tells whether a work stealing exploration may move global_state to another worker process
+        :param global_state: A state from the work list
+        :return: False if this module needs the state explored in the process that reached it
+        """
+        return True
+
     def update_cache(self, issues=None):
         """
         Updates cache with param issues, updates against self.issues, if the param is None
@@ -7,12 +7,17 @@ import logging
 import re
 from typing import Dict, List, TYPE_CHECKING
 from collections import deque
+from bisect import bisect_left, insort
 from mythril.laser.ethereum.state.constraints import Constraints
 from enum import Enum
 from flags import Flags
 import concurrent.futures
+import io
+import multiprocessing
+from contextlib import redirect_stdout
 
 import z3
+from z3 import z3printer
 
 
 from antlr4 import (
@@ -38,6 +43,8 @@ from mythril.analysis.potential_issues import (
 )
 from mythril.analysis.swc_data import WRITE_TO_ARBITRARY_STORAGE
 
+from mythril.laser.ethereum.cfg import NodeFlags
+from mythril.laser.ethereum.exploration_filter import FunctionCategory
 from mythril.laser.ethereum.state.global_state import GlobalState
 from mythril.laser.ethereum.transaction.symbolic import ACTORS
 from mythril.analysis.issue_annotation import IssueAnnotation
@@ -68,8 +75,6 @@ from mythril.laser.ethereum.call import get_call_data
 from mythril.laser.ethereum.state.calldata import ConcreteCalldata, SymbolicCalldata
 from mythril.support.model import get_model
 import signal
-import multiprocessing
-from functools import wraps
 # from z3 import Model, unsat, unknown
 
 log = logging.getLogger(__name__)
@@ -98,6 +103,7 @@ flag_airdrop = False #是否检查空投
 flag_ERC = False #是否只检查ERC20和ERC721的approve、transfer和transferFrom
 flag_NFT_MB = False #是否检查NFT的mint和burn
 flag_swap = False #是否检查swap
+post_analysis_workers = 0 # 后处理阶段识别函数类型的并行进程数，0或1为串行
 
 # 常见的非空投函数
 not_airdrop_list = [
@@ -155,6 +161,14 @@ not_NFT_MB = [
     "supportsInterface"
 ]
 
+# 按行为类别排除的函数，LASER在分发器的JUMPI处直接丢弃进入这些函数的路径
+# 命令行的 --explore-deny/--explore-allow CATEGORY:NAME 可以增减每个类别的函数
+exploration_categories = [
+    FunctionCategory("Airdrop", not_airdrop_list, enabled=flag_airdrop), # 常见的非空投函数
+    FunctionCategory("NFTMint", not_NFT_MB, enabled=flag_NFT_MB, match="prefix"), # 非mint和burn的函数前缀
+    FunctionCategory("Swap", [], enabled=flag_swap),
+]
+
 
 # class JumpType(Enum):
 #     """An enum to represent the types of possible JUMP scenarios."""
@@ -175,46 +189,79 @@ not_NFT_MB = [
 #     FUNC_ENTRY = 1
 #     CALL_RETURN = 2
 
-class TimeoutException(Exception):
+address_mask = 2**160 - 1
+mask_filter_timeout = 1 # 表达式转成字符串超过该秒数则跳过，与原来的@timeout(1)一致
+
+
+class _PrintTimeout(Exception):
     pass
 
-def timeout(seconds):
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            def target(queue, *args, **kwargs):
-                try:
-                    result = func(*args, **kwargs)
-                    queue.put(result)
-                except Exception as e:
-                    queue.put(e)
-
-            queue = multiprocessing.Queue()
-            process = multiprocessing.Process(target=target, args=(queue, *args), kwargs=kwargs)
-            process.start()
-            process.join(seconds)
-            if process.is_alive():
-                process.terminate()
-                process.join()  # 确保进程已终止
-                return ""  # 超时返回空字符串
-            try:
-                result = queue.get_nowait()
-            except queue.Empty:
-                return ""  # 队列为空返回空字符串
-            if isinstance(result, Exception):
-                raise result
-            return result
-        return wrapper
-    return decorator
-
-# 使用装饰器定义过滤函数
-@timeout(1)
+
+class _DeadlineFormatter(z3printer.Formatter):
+    # 与str()相同的z3 Formatter，格式化每个子项前检查是否超时
+    def __init__(self, deadline):
+        super().__init__()
+        self.__dict__.update(z3printer._Formatter.__dict__)
+        self.deadline = deadline
+
+    def pp_expr(self, a, d, xs):
+        if time.monotonic() > self.deadline:
+            raise _PrintTimeout()
+        return super().pp_expr(a, d, xs)
+
+
+class _DeadlinePP(z3printer.PP):
+    # 与str()相同的z3 PP，排版每个部分前检查是否超时
+    def __init__(self, deadline):
+        super().__init__()
+        self.__dict__.update(z3printer._PP.__dict__)
+        self.deadline = deadline
+
+    def pp(self, f, indent):
+        if time.monotonic() > self.deadline:
+            raise _PrintTimeout()
+        return super().pp(f, indent)
+
+
+def str_within(expr, seconds):
+    """str(expr) of a z3 expression, or None if printing takes longer than seconds.
+
+    z3's printer time depends on the shape of the term rather than its size,
+    so the limit is on the printing itself, checked in-process.
+    """
+    deadline = time.monotonic() + seconds
+    out = io.StringIO()
+    try:
+        _DeadlinePP(deadline)(out, _DeadlineFormatter(deadline)(expr))
+    except (_PrintTimeout, RecursionError):
+        return None
+    return out.getvalue()
+
+def is_address_mask(expr):
+    # 结构化识别地址掩码 2**160-1，包括未化简的 2**160 - 1 / 2**160 + (-1)
+    if z3.is_bv_value(expr):
+        return expr.as_long() == address_mask
+    if (z3.is_app_of(expr, z3.Z3_OP_BSUB) or z3.is_app_of(expr, z3.Z3_OP_BADD)) and expr.num_args() == 2:
+        left, right = expr.arg(0), expr.arg(1)
+        if not (z3.is_bv_value(left) and z3.is_bv_value(right)):
+            return False
+        if z3.is_app_of(expr, z3.Z3_OP_BSUB):
+            value = left.as_long() - right.as_long()
+        else:
+            value = left.as_long() + right.as_long()
+        return value % (1 << expr.size()) == address_mask
+    return False
+
+# 过滤地址掩码，其余符号变量返回表达式字符串；过大的表达式直接跳过，避免卡死
 def filter_symbol_var(symbol_var):
     try:
-        symbol_var_expr = str(symbol_var.raw)
-        if symbol_var_expr in ["1461501637330902918203684832716283019655932542975", "1461501637330902918203684832716283019655932542976-1"]:
+        if is_address_mask(symbol_var.raw):
             return ""
-        return symbol_var_expr
+        expr = str_within(symbol_var.raw, mask_filter_timeout)
+        if expr is None:
+            log.debug("Mask filter skipped an expression that took over %ss to print", mask_filter_timeout)
+            return ""
+        return expr
     except Exception as e:
         print(f"ERROR: An unexpected error occurred in filter_symbol_var: {e}")
         return ""
@@ -429,10 +476,323 @@ NFT_MB_func_sign_dict = {
 }
 
 
-    
+def _reversed_before(uids, before_uid):
+    # uids为升序列表，逆序返回其中小于before_uid的元素
+    for i in range(bisect_left(uids, before_uid) - 1, -1, -1):
+        yield uids[i]
+
+
+def _uid_lists(node):
+    # 结点中保存uid的列表：(successors, predecessors_list, cfg_uid_info)
+    return (list(node.successors),
+            [list(predecessors) for predecessors in node.predecessors_list],
+            list(node.cfg_uid_info))
+
+
+def _list_change(old, new):
+    # worker中对已有结点uid列表的修改：None、("append", 新增部分)或("replace", 新列表)
+    if new == old:
+        return None
+    if new[:len(old)] == old:
+        return ("append", new[len(old):])
+    return ("replace", list(new))
+
+
+def _copy_provenance(result):
+    if isinstance(result, list):
+        return list(result)
+    if isinstance(result, tuple):
+        return tuple(_copy_provenance(part) for part in result)
+    return result
+
+
+def _provenance(nodes, key, compute):
+    """NodeStore.provenance，其他结点容器(如测试中的dict)直接计算"""
+    if isinstance(nodes, NodeStore):
+        return nodes.provenance(key, compute)
+    return compute()
+
+
+class NodeStore(dict):
+    """uid -> Node, with secondary indexes keyed by (function_name, tx_id).
+
+    Node.find_edge / find_cfg_start_node used to walk every node created
+    so far on each hooked opcode; the indexes below turn those backward
+    scans into lookups over the few candidates that can actually match.
+    Node attributes that the indexes depend on (function_name, tx_id,
+    opcode, offset, jump target) never change after insertion, so deleted
+    nodes are simply skipped at query time.
+
+    It also keeps the entry/exit pair of every function and the queue of
+    nodes still waiting for their post hook, so the bookkeeping done by
+    DefiCheck3._analyze_state on each hook does not grow with the graph.
+
+    The handlers that run after the exploration ask the same data-source
+    questions (find_start_node_ids, check_opcode) over and over; provenance()
+    remembers the answers until the graph changes again.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self._opcode_index = defaultdict(list)  # (function_name, tx_id, opcode) -> [uid]
+        self._offset_index = defaultdict(list)  # (function_name, tx_id, opcode, offset) -> [uid]
+        self._jump_index = defaultdict(list)  # (function_name, tx_id, target) -> [uid] JUMP/JUMPI 的跳转目标
+        self._global_opcode_index = defaultdict(list)  # opcode -> [uid]
+        self._function_index = defaultdict(list)  # function_name -> [uid] 包括入口/出口结点
+        self._entry_exit_uids = defaultdict(list)  # function_name -> [ENTRY_OR_EXIT_POINT结点uid]
+        self._pending_post = deque()  # post_flag为True的结点，按uid升序
+        self._provenance = {}  # (查询, 前驱uids, 参数) -> 结果，见provenance
+        self.update(*args, **kwargs)
+
+    def __setitem__(self, uid, node):
+        self._provenance.clear()
+        if uid not in self:
+            self._index(uid, node)
+            if getattr(node, "post_flag", False):
+                self._pending_post.append(uid)
+        super().__setitem__(uid, node)
+
+    def update(self, *args, **kwargs):
+        for uid, node in dict(*args, **kwargs).items():
+            self[uid] = node
+
+    def clear(self):
+        super().clear()
+        for index in (self._opcode_index, self._offset_index, self._jump_index,
+                      self._global_opcode_index, self._function_index, self._entry_exit_uids,
+                      self._pending_post, self._provenance):
+            index.clear()
+
+    def _index(self, uid, node):
+        insort(self._function_index[node.function_name], uid)
+        if node.node_type == NodeType.ENTRY_OR_EXIT_POINT:
+            insort(self._entry_exit_uids[node.function_name], uid)
+            return
+        key = (node.function_name, node.tx_id)
+        insort(self._opcode_index[key + (node.opcode,)], uid)
+        insort(self._offset_index[key + (node.opcode, node.offset)], uid)
+        insort(self._global_opcode_index[node.opcode], uid)
+        if node.opcode in ["JUMP", "JUMPI"]:
+            # 符号跳转目标与JUMPDEST的offset比较恒为False，不需要索引
+            target = getattr(node.symbol_vars[0], "value", None) if node.symbol_vars else None
+            if target is not None:
+                insort(self._jump_index[key + (target,)], uid)
+            if node.opcode == "JUMPI" and target != node.offset + 1: # JUMPI不跳转时顺序执行到offset+1
+                insort(self._jump_index[key + (node.offset + 1,)], uid)
+
+    def provenance(self, key, compute):
+        """Answer of the data-source query key, computed by compute() on the first ask.
+
+        Callers get their own copy of list results.
+        """
+        if key not in self._provenance:
+            self._provenance[key] = compute()
+        return _copy_provenance(self._provenance[key])
+
+    def invalidate_provenance(self):
+        """Forgets the cached queries, for edits of the edges of existing nodes."""
+        self._provenance.clear()
+
+    def function_uids(self, function_name):
+        """Uids of every node created for function_name, in ascending order."""
+        return self._function_index.get(function_name, [])
+
+    def _live_entry_exit(self, function_name):
+        # 被标记为DELETED的入口/出口结点在查询时跳过
+        return [uid for uid in self._entry_exit_uids.get(function_name, [])
+                if self[uid].node_type == NodeType.ENTRY_OR_EXIT_POINT]
+
+    def entry_uid(self, function_name):
+        """Uid of the first entry node of function_name that is not deleted, or None."""
+        uids = self._live_entry_exit(function_name)
+        return uids[0] if uids else None
+
+    def entry_exit(self, function_name):
+        """(EntryNode_uid, ExitNode_uid) of function_name, -1 for a missing one."""
+        uids = self._live_entry_exit(function_name) + [-1, -1]
+        return uids[0], uids[1]
+
+    def pending_post_node(self):
+        """Oldest node whose post hook has not run yet, or None.
+
+        Nodes leave the queue lazily once their post_flag has been cleared.
+        """
+        while self._pending_post and not self[self._pending_post[0]].post_flag:
+            self._pending_post.popleft()
+        return self[self._pending_post[0]] if self._pending_post else None
+
+    def latest(self, function_name, tx_id, opcode, before_uid):
+        """Uids of function_name/tx_id nodes with opcode, newest first, below before_uid."""
+        return _reversed_before(self._opcode_index.get((function_name, tx_id, opcode), []), before_uid)
+
+    def at_offset(self, function_name, tx_id, opcode, offset, before_uid):
+        """Like latest(), restricted to nodes at the given instruction offset."""
+        return _reversed_before(self._offset_index.get((function_name, tx_id, opcode, offset), []), before_uid)
+
+    def with_opcode(self, opcode, before_uid):
+        """Uids of nodes with opcode in every function, newest first, below before_uid."""
+        return _reversed_before(self._global_opcode_index.get(opcode, []), before_uid)
+
+    def jumps_to(self, function_name, tx_id, target, before_uid):
+        """JUMP/JUMPI uids that may continue at target, newest first, below before_uid.
+
+        Callers still have to check the successor conditions of each candidate.
+        """
+        return _reversed_before(self._jump_index.get((function_name, tx_id, target), []), before_uid)
+
+
+class FunctionCFG:
+    """Control flow view of one function of the DefiCheck graph, built once.
+
+    Symbolic execution unrolls the loops, so every JUMP/JUMPI/JUMPDEST node
+    has the single control flow predecessor predecessors_list[0][0] and the
+    control flow nodes of a function form a tree. That tree is the dominator
+    tree of the view. A JUMPI -> JUMPDEST edge whose JUMPDEST offset already
+    occurred on the path from the entry is a back edge of the program. An
+    offset entered more than twice on a path is a loop: the loop bound
+    unrolls every iteration.
+
+    One depth-first pass over the tree yields the paths of get_all_path and
+    the loops of every path.
+    """
+
+    def __init__(self, nodes, func_name):
+        """
+
+        :param nodes: The DefiCheck nodes
+        :param func_name: The function to build the view of
+        """
+        self.idom = {}  # cfg结点 -> 支配树中的父结点，根结点(entry)不在其中
+        self.paths = {}  # 路径终点 -> 从entry开始经过的所有cfg结点，同get_all_path
+        self.block_paths = []  # 与paths一一对应，路径上所有业务图结点
+        self.loops = {}  # 路径终点 -> {循环头JUMPDEST的offset: 路径上该offset的JUMPDEST结点}
+
+        if isinstance(nodes, NodeStore):
+            uids = nodes.function_uids(func_name)
+        else:
+            uids = [uid for uid, node in nodes.items() if node.function_name == func_name]
+        # 后继为exit结点的cfg结点为路径终点
+        leaves = [uid for uid in uids
+                  if nodes[uid].opcode in ["JUMP", "JUMPI", "JUMPDEST"] and nodes[uid].node_type != NodeType.DELETED
+                  and nodes[nodes[uid].successors[0]].node_type == NodeType.ENTRY_OR_EXIT_POINT]
+
+        # 从路径终点向前建立支配树，每个结点只访问一次
+        children = defaultdict(list)
+        roots = []
+        visited = set()
+        for uid in leaves:
+            while uid not in visited:
+                visited.add(uid)
+                node = nodes[uid]
+                if node.node_type == NodeType.ENTRY_OR_EXIT_POINT:
+                    roots.append(uid)
+                    break
+                if not node.predecessors_list[0]:
+                    print("ERROR:cfg_node", uid, "predecessors_list", node.predecessors_list)
+                    roots.append(uid)
+                    break
+                self.idom[uid] = node.predecessors_list[0][0]
+                children[self.idom[uid]].append(uid)
+                uid = self.idom[uid]
+
+        # 深度优先遍历，path为当前结点到根的路径，occurrences记录路径上JUMPI -> JUMPDEST边的目标
+        leaf_set = set(leaves)
+        paths = {}
+        path = []
+        occurrences = defaultdict(list)
+        looping = set()  # 进入超过两次的offset
+        for root in roots:
+            stack = [(root, False)]
+            while stack:
+                uid, leaving = stack.pop()
+                node = nodes[uid]
+                entered = node.opcode == "JUMPDEST" and uid in self.idom and nodes[self.idom[uid]].opcode == "JUMPI"
+                if leaving:
+                    path.pop()
+                    if entered:
+                        occurrences[node.offset].pop()
+                        if len(occurrences[node.offset]) == 2:
+                            looping.discard(node.offset)
+                    continue
+                path.append(uid)
+                if entered:
+                    occurrences[node.offset].append(uid)
+                    if len(occurrences[node.offset]) > 2:
+                        looping.add(node.offset)
+                if uid in leaf_set:
+                    paths[uid] = list(path)
+                    self.loops[uid] = {offset: list(occurrences[offset]) for offset in looping}
+                stack.append((uid, True))
+                stack.extend((child, False) for child in reversed(children[uid]))
+        self.paths = {uid: paths[uid] for uid in leaves if uid in paths}
+
+        for cfg_path in self.paths.values():
+            # 因为JUMPI节点有两个后继，JUMPI和JUMPDEST节点的cfg_uid_info分别记录了两条的基本块包含的节点
+            # 除去JUMPDEST前的相邻的JUMPI节点
+            block_path = [cfg_path[i] for i in range(len(cfg_path) - 1)
+                          if not (nodes[cfg_path[i]].opcode == "JUMPI" and cfg_path[i] == nodes[cfg_path[i + 1]].predecessors_list[0][0])]
+            block_path.append(cfg_path[-1])
+            path_uids = []
+            for block_uid in block_path:
+                path_uids += nodes[block_uid].cfg_uid_info
+            self.block_paths.append(path_uids)
+
+    def has_loop(self, leaf):
+        """Whether the path ending at leaf runs through a loop."""
+        return bool(self.loops.get(leaf))
+
+    def loop_range(self, leaf):
+        """(first, last) uid of the loop header JUMPDESTs on the path ending at leaf, (None, None) without a loop."""
+        loop_uids = [uid for uids in self.loops.get(leaf, {}).values() for uid in uids]
+        if len(loop_uids) <= 2:
+            return None, None
+        return min(loop_uids), max(loop_uids)
+
+    def loop_body(self, leaf):
+        """The control flow nodes of the path ending at leaf between the first and last loop header."""
+        first, last = self.loop_range(leaf)
+        if first is None:
+            return []
+        return [uid for uid in self.paths[leaf] if first <= uid <= last]
+
+
+class NodeState:
+    """The parts of a GlobalState the handlers use after the exploration.
+
+    A Node keeps this snapshot instead of the GlobalState, which would pin the
+    world state, the memory and the states of the whole basic block.
+    """
+    __slots__ = ("function_name", "contract_name", "bytecode", "sender",
+                 "address", "gas_used", "block_start", "constraints")
+
+    def __init__(self, state, keep_constraints=True) -> None:
+        """
+
+        :param state: The global state the node is created from
+        :param keep_constraints: Whether the path constraints are needed later
+        """
+        environment = state.environment
+        self.function_name = environment.active_function_name
+        self.contract_name = environment.active_account.contract_name
+        self.bytecode = environment.code.bytecode
+        self.sender = environment.sender
+        self.address = state.get_current_instruction()["address"]
+        self.gas_used = (state.mstate.min_gas_used, state.mstate.max_gas_used)
+        # 基本块第一条指令的(address, opcode)，用于find_cfg_start_node
+        self.block_start = None
+        cfg_node = getattr(state, "node", None)
+        if cfg_node is not None and cfg_node.states:
+            instruction = cfg_node.states[0].get_current_instruction()
+            self.block_start = (instruction["address"], instruction["opcode"])
+        self.constraints = state.world_state.constraints if keep_constraints else None
+
 
 class Node:
     """The representation of a call graph node."""
+    __slots__ = ("contract_name", "state", "node_type", "function_name", "tx_id",
+                 "uid", "pc", "offset", "opcode", "symbol_vars", "symbol_vars_expr",
+                 "log_hash", "call_func_signature", "call_params", "call_params_expr",
+                 "value", "predecessors_list", "successors", "cfg_uid_info", "post_flag")
     count = 0  # 类变量，用于跟踪Node的实例数量
     cur_pc= 0  # 暂时没有用上
     # find_edge_time = 0
@@ -467,17 +827,16 @@ class Node:
         self.contract_name = contract_name
         # self.start_addr = start_addr
         # self.states: List[GlobalState] = []
-        self.state = state 
         # self.constraints = constraints
         self.node_type = node_type
         self.function_name = function_name
         # tx_id
         try:
             # 如果current_transaction包含indentify，就用indentify
-            if hasattr(self.state.current_transaction, "indentify"):
-                self.tx_id = self.state.current_transaction.indentify
+            if hasattr(state.current_transaction, "indentify"):
+                self.tx_id = state.current_transaction.indentify
             else:#否则从call_value中提取tx_id
-                call_value = self.state.current_transaction.call_value
+                call_value = state.current_transaction.call_value
                 match = re.search(r'call_value(\d+)', str(call_value))
                 if match:
                     self.tx_id = int(match.group(1))
@@ -497,11 +856,11 @@ class Node:
         # print("self.uid: ",self.uid)
         Node.count += 1  # 每次创建新的Node实例时，增加count的值
         self.pc = Node.cur_pc #自定义，看看能不能利用mythril的CFG图
-        self.offset = self.state.get_current_instruction()["address"] #原本的PC，用于区分分支
+        self.offset = state.get_current_instruction()["address"] #原本的PC，用于区分分支
         if self.node_type == NodeType.ENTRY_OR_EXIT_POINT:
             self.opcode = ""
         elif self.node_type == NodeType.UNKNOWN:
-            self.opcode = self.state.get_current_instruction()["opcode"]
+            self.opcode = state.get_current_instruction()["opcode"]
             if self.opcode == "CALLDATALOAD" or self.opcode == "CALLER" or self.opcode == "ADDRESS": #还有msg.value#or self.opcode == "PUSH1"
                 self.node_type = NodeType.ENVIRONMENT_CONTEXT
             elif self.opcode == "SLOAD" or self.opcode == "SSTORE":
@@ -515,10 +874,12 @@ class Node:
                 self.node_type = NodeType.CONTROL_FLOW
                 
         else:
-            self.opcode = self.state.get_current_instruction()["opcode"]
-        # self.argument = self.state.get_current_instruction()["argument"]
+            self.opcode = state.get_current_instruction()["opcode"]
+        # 只保留handler需要的信息，不持有GlobalState；只有SSTORE和CALL结点在报告问题时需要路径约束
+        self.state = NodeState(state, keep_constraints=self.opcode in ["SSTORE","CALL","DELEGATECALL"])
+        # self.argument = state.get_current_instruction()["argument"]
         # if self.opcode.startswith("PUSH"):
-        #     code += " " + "".join(str(self.state.get_current_instruction()["argument"]))
+        #     code += " " + "".join(str(state.get_current_instruction()["argument"]))
         self.symbol_vars = symbol_vars if symbol_vars is not None else []
         if self.opcode.startswith("LOG"):
             self.log_hash = hex(self.symbol_vars[0].value) if self.symbol_vars[0].value else Node.get_last_bracket_content(PreProcExpr(str(self.symbol_vars[0])))
@@ -557,7 +918,7 @@ class Node:
                 print("SymbolicCalldata")
                 print(f"SymbolicCalldata(size={call_data._size},Array(domain={call_data._calldata.domain}, value={call_data._calldata.range}))")
                 try:
-                    constraints = self.state.world_state.constraints
+                    constraints = state.world_state.constraints
                     model = get_model(constraints)
                     call_data_list =  call_data.concrete(model)
                     print("len(call_data_list)",len(call_data_list))
@@ -640,6 +1001,11 @@ class Node:
        
         
     
+    def var_key(self, index=0): # symbol_vars[index]的结构化key，用于身份和角色匹配
+        if index >= len(self.symbol_vars):
+            return ("expr", "")
+        return symbol_var_key(self.symbol_vars[index])
+
     # 删除nodes属性
     def remove_state(self):
         del self.state
@@ -953,7 +1319,7 @@ class Node:
             expr_time = time.time()
             # var1_expr = Node.get_last_bracket_content(PreProcExpr(str(var1)))
             if var1_expr == var2_expr:
-                constraints = copy(self.state.world_state.constraints)
+                constraints = copy(self.state.constraints)
                 constraints += [
                     var1 == var2,
                 ]
@@ -987,47 +1353,28 @@ class Node:
             ExitNode_uid,
         ): # 查找基本块的起始结点(JUMPI或JUMPDEST，以及第一个基本块的entry结点)
             tx_id = self.tx_id
-            instruction = self.state.node.states[0].get_current_instruction()  # 获取基本块第一条指令
-            if instruction["opcode"] == "JUMPDEST":
-                offset = instruction["address"]
+            start_address, start_opcode = self.state.block_start  # 基本块第一条指令
+            if start_opcode == "JUMPDEST":
+                offset = start_address
                 opcode = "JUMPDEST"
             else: #JUMPI的offset记为另一条分支的起始结点
-                offset = instruction["address"]-1
+                offset = start_address-1
                 opcode = "JUMPI"
             # print("##1temp 基本块第一条指令",offset,opcode,"self.offset",self.offset)
             # # trick:特殊情况
             if self.opcode in ["JUMPI"]:# 这种情况找找看前一个cfg结点JUMPDEST
-                for node_uid in range(self.uid-1, -1, -1):
-                    if nodes[node_uid].function_name != self.function_name:
-                        continue
-                    if nodes[node_uid].tx_id != tx_id:
-                        continue
-                    if nodes[node_uid].node_type == NodeType.ENTRY_OR_EXIT_POINT:
-                        continue
-                    if nodes[node_uid].node_type == NodeType.DELETED:
-                        continue
-                    if nodes[node_uid].opcode == "JUMPI":
-                        break
-                    if nodes[node_uid].opcode not in ["JUMPDEST"]:#,"JUMPI"
-                        continue
-                    if nodes[node_uid].opcode == "JUMPDEST" and nodes[node_uid].offset<self.offset:
-                        # print("##temp 基本块第一条指令",offset,opcode)
-                        return node_uid
-                    else:
-                        # print(nodes[node_uid].successors[0],"nodes[nodes[node_uid].successors[0]].node_type",nodes[nodes[node_uid].successors[0]].node_type)
-                        break
+                # 最近的未删除JUMPDEST晚于最近的未删除JUMPI时才可能返回
+                last_jumpi = next((uid for uid in nodes.latest(self.function_name, tx_id, "JUMPI", self.uid)
+                                   if nodes[uid].node_type != NodeType.DELETED), -1)
+                node_uid = next((uid for uid in nodes.latest(self.function_name, tx_id, "JUMPDEST", self.uid)
+                                 if nodes[uid].node_type != NodeType.DELETED), -1)
+                if node_uid > last_jumpi and nodes[node_uid].offset<self.offset:
+                    # print("##temp 基本块第一条指令",offset,opcode)
+                    return node_uid
             # 查找前驱结点
-            for node_uid in range(self.uid-1, -1, -1):
-                if nodes[node_uid].function_name != self.function_name:
-                    continue
-                if nodes[node_uid].tx_id != tx_id:
-                    continue
-                if nodes[node_uid].node_type == NodeType.ENTRY_OR_EXIT_POINT:
-                    continue
+            for node_uid in nodes.at_offset(self.function_name, tx_id, opcode, offset, self.uid):
                 if nodes[node_uid].node_type == NodeType.DELETED:
                     continue
-                if nodes[node_uid].opcode != opcode :
-                    continue
                 if self.opcode in ["JUMP","JUMPI"] \
                     and (
                         (nodes[node_uid].opcode == "JUMPI" \
@@ -1045,14 +1392,7 @@ class Node:
                         continue
             # print("##self.uid",self.uid,"self.offset",self.offset,"opcode",self.opcode,"offset",offset,"opcode",opcode)
             # 无前驱结点说明是第一个基本块，找到第一个结点
-            for node_uid in range(0, len(nodes)):
-                if nodes[node_uid].function_name != self.function_name:
-                    continue
-                if nodes[node_uid].node_type == NodeType.ENTRY_OR_EXIT_POINT:
-                    # 添加前驱结点
-                    # self.predecessors_list[0].append(node_uid)
-                    # nodes[node_uid].successors.append(self.uid)
-                    return node_uid
+            return nodes.entry_uid(self.function_name)
                 
             
         
@@ -1117,10 +1457,11 @@ class Node:
                 if temp_var_expr[1].isdigit() and temp_var_expr[1] != "26894051635933088883208542908936412374951772594250132926352947286596149155043": #如果是正整数，去掉temp_var_expr[1]
                     temp_var_expr = [temp_var_expr[0]]
                 temp_predecessors = [[] for _ in range(len(temp_var_expr))]
+                path_nodes = self.get_path_nodes(nodes)
                 for i in range(len(temp_var_expr)):
                     var = temp_var_expr[i]
                     # print("var",var)
-                    for uid in reversed(self.get_path_nodes(nodes)): # 从当前节点往前找（uid是从1开始的）
+                    for uid in reversed(path_nodes): # 从当前节点往前找（uid是从1开始的）
                         if nodes[uid].function_name != self.function_name:
                             continue
                         # print("uid:",uid,"nodes[uid].opcode:",nodes[uid].opcode)
@@ -1344,9 +1685,9 @@ class Node:
         # print("uid",self.uid,"opcode",self.opcode)
         start_time = time.time()
         basic_block_uid = self.cfg_uid_info[0]
-        res_nodes = []
+        chunks = [] # 各基本块的cfg_uid_info，逆序收集后再拼接
         while nodes[basic_block_uid].node_type != NodeType.ENTRY_OR_EXIT_POINT and basic_block_uid > start_uid:
-            res_nodes = nodes[basic_block_uid].cfg_uid_info + res_nodes
+            chunks.append(nodes[basic_block_uid].cfg_uid_info)
             if nodes[basic_block_uid].predecessors_list[0] != []:
                 pre_basic_block_uid = nodes[basic_block_uid].predecessors_list[0][0]
             else:
@@ -1356,9 +1697,9 @@ class Node:
             else:
                 basic_block_uid = pre_basic_block_uid
         # print("basic_block_uid",basic_block_uid)
-        res_nodes = nodes[basic_block_uid].cfg_uid_info + res_nodes #最后加上第一个基本块的结点
+        chunks.append(nodes[basic_block_uid].cfg_uid_info) #最后加上第一个基本块的结点
         #去除uid大于self.uid的，且交易id相同
-        res_nodes = [uid for uid in res_nodes if uid < self.uid and nodes[uid].tx_id == self.tx_id]
+        res_nodes = [uid for chunk in reversed(chunks) for uid in chunk if uid < self.uid and nodes[uid].tx_id == self.tx_id]
         get_path_time = time.time()-start_time
         if get_path_time > 1:
             print("get_path_nodes time:",get_path_time)
@@ -1385,16 +1726,10 @@ class Node:
             ## 暂时没有处理的情况:CALL和JUMP等
             # 处理JUMPDEST节点：查找前驱结点
             if self.opcode == "JUMPDEST":
-                # 查找前驱结点
-                for node_uid in range(self.uid-1, -1, -1):
-                    if nodes[node_uid].function_name != self.function_name:
-                        continue
+                # 查找前驱结点：只需检查跳转目标为self.offset的JUMP/JUMPI结点
+                for node_uid in nodes.jumps_to(self.function_name, self.tx_id, self.offset, self.uid):
                     if nodes[node_uid].node_type == NodeType.DELETED:
                         continue
-                    if nodes[node_uid].tx_id != self.tx_id:
-                        continue
-                    if nodes[node_uid].node_type == NodeType.ENTRY_OR_EXIT_POINT:
-                        continue
                     if nodes[node_uid].opcode == "JUMPI" and len(nodes[node_uid].successors) < 2 : # 避免两个JUMPDEST的错误情况?and nodes[nodes[node_uid].successors[0]].opcode != "JUMPDEST"
                         # print(self.uid,"###",nodes[node_uid].get_dict(),nodes[node_uid].successors)
                         if self.offset == nodes[node_uid].symbol_vars[0] \
@@ -1472,8 +1807,6 @@ class Node:
                     if symbol_var_expr == "":
                         continue
                     self.symbol_vars_expr.append(symbol_var_expr)
-                except TimeoutException:
-                    print("Mask filter execution exceeded 0.1 seconds, skipping the statement.")
                 except Exception as e:
                     print(f"ERORR：An unexpected error occurred: {e}")
                 finally:
@@ -1697,8 +2030,8 @@ class Node:
                     # 删除错误的前驱节点
                     # pre_node.predecessors_list[i].remove(prepre_uid)
                     # 更新前驱节点
-                    for k in range(uid-1, -1, -1):
-                        if nodes[k].opcode == "SLOAD" and nodes[k].symbol_vars[0] == nodes[uid].symbol_vars[0] and str(nodes[k].symbol_vars[1]) == "0":
+                    for k in nodes.with_opcode("SLOAD", uid):
+                        if nodes[k].symbol_vars[0] == nodes[uid].symbol_vars[0] and str(nodes[k].symbol_vars[1]) == "0":
                             pre_node.predecessors_list[i][j] = k
                             if uid not in nodes[k].successors:
                                 print("WARNING:trick fix_sstore_prepredecessors node",pre_node.uid,"prepre_uid",prepre_uid,"symbol_vars[0]",nodes[prepre_uid].symbol_vars[0])
@@ -1710,6 +2043,11 @@ class Node:
         
 
     def find_start_node_ids(nodes, uids: list[int], limit: int=2000,ret_SHA3_count: bool=False,ret_sload_count: bool=False) -> List[int]:
+        # 探索结束后结点图不再变化，相同的查询只遍历一次
+        return _provenance(nodes, ("find_start_node_ids", tuple(uids), limit, ret_SHA3_count, ret_sload_count),
+                           lambda: Node._find_start_node_ids(nodes, uids, limit, ret_SHA3_count, ret_sload_count))
+
+    def _find_start_node_ids(nodes, uids: list[int], limit: int=2000,ret_SHA3_count: bool=False,ret_sload_count: bool=False) -> List[int]:
         if flag_time:
             global find_start_nodes_time
             start_time = time.time()
@@ -1859,7 +2197,7 @@ class Node:
             cfg_node = nodes[cfg_path_uids[i+1]]
             if cfg_node.opcode == "JUMPDEST" and pre_cfg_node.opcode == "JUMPI":
             # if cfg_node.opcode == "JUMPDEST" and pre_cfg_node.opcode in ["JUMP","JUMPI"]:
-                cfg_path_uids_offset[cfg_node.offset] = cfg_path_uids_offset.get(cfg_node.offset,[]) + [cfg_node.uid]
+                cfg_path_uids_offset.setdefault(cfg_node.offset,[]).append(cfg_node.uid)
         print("cfg_path_uids_offset",cfg_path_uids_offset)
         # 如果存在offset一致的两组（默认循环次数限制为3次，我们设置--loop-bound 4），（超过两次）则视为发生循环
         if not ret_loop_cfg_uids:
@@ -1905,17 +2243,11 @@ class Node:
             # 排除掉常见的不是空投函数的情况，主要是transfer和transferfrom函数
             if any([not_airdrop in func_name for not_airdrop in not_airdrop_list]):
                 continue
-            flag_loop = False
-            cfg_path_uids_dict,path_uids_list = Node.get_all_path(nodes,func_name) #path_uids_list：[[uid,...],...]，该路径上所有业务图（数据源节点、数据流结点和STATE类结点）结点ID
-            for cfg_path_uids in cfg_path_uids_dict.values():
-                # print("path_uids",cfg_path_uids)
-                if Node.detect_path_loops(nodes,func_name,cfg_path_uids):
-                    flag_loop = True
-                    break
-            if flag_loop:
+            cfg = Node.function_cfg(nodes,func_name)
+            if any(cfg.has_loop(leaf) for leaf in cfg.paths):
                 func_name_list.append(func_name)
-                res_func_cfg_uids[func_name] = cfg_path_uids_dict
-                res_func_paths[func_name] = path_uids_list
+                res_func_cfg_uids[func_name] = cfg.paths
+                res_func_paths[func_name] = cfg.block_paths #[[uid,...],...]，该路径上所有业务图（数据源节点、数据流结点和STATE类结点）结点ID
         # print("res_func_paths",res_func_paths)
         if flag_detailed:
             print("# detect_loops func_paths:",len(func_name_list))
@@ -1933,8 +2265,13 @@ class Node:
             return False
         # func_cfg_uids中循环结构为cfg_start,cfg_end之间的结点
         func_cfg_uids = [func_cfg_uid for func_cfg_uid in func_cfg_uids if func_cfg_uid >= cfg_start and func_cfg_uid <= cfg_end]
+        return Node.loop_contains_transfer(nodes,func_cfg_uids)
+
+    # 输入循环体的cfg结点(FunctionCFG.loop_body)，判断循环体中是否包含transfer
+    @staticmethod
+    def loop_contains_transfer(nodes,loop_cfg_uids):
         # 检测循环结构是否包含Call调用函数签名为transfer(from)的结点或包含balance结构
-        for cfg_uid in func_cfg_uids:
+        for cfg_uid in loop_cfg_uids:
             for node_uid in nodes[cfg_uid].cfg_uid_info:
                 if nodes[node_uid].opcode in ["CALL","DELEGATECALL"]:
                     if hasattr(nodes[node_uid], 'value') and nodes[node_uid].value != "0":
@@ -2006,14 +2343,13 @@ class Node:
             if flag_detailed:
                 print("> function",func_name,"detect_transfer_in_loop <") 
             #func_cfg_uids[func_name].values(),func_paths[func_name]是对应一一关系
-            func_cfg_uids_list = list(func_cfg_uids[func_name].values())
-            for i in range(len(func_cfg_uids_list)): # 检测函数的每条路径
+            cfg = Node.function_cfg(nodes,func_name)
+            for i,leaf in enumerate(func_cfg_uids[func_name]): # 检测函数的每条路径
                 if flag_detailed:
                     print(">> function",func_name,"path",i)
-                # print("func_cfg_uids_list",func_cfg_uids_list)
                 # print("func_paths",func_paths[func_name][i])
                 # 1.首先检测路径是否存在循环: 排除没有循环的函数
-                if not Node.detect_path_loops(nodes,func_name,func_cfg_uids_list[i]):
+                if not cfg.has_loop(leaf):
                     if flag_detailed:
                         print(" 1.路径不存在循环")
                     continue
@@ -2041,7 +2377,7 @@ class Node:
                         print(" 2.不存在SSTORE或CALL、LOG结点")
                     continue
                 # 3.检测是否存在_balances[recipient] += amount;结构或CALL调用token.transfer(from)或CALL的value不为0
-                if Node.detect_transfer_in_path(nodes,func_name,func_cfg_uids_list[i],func_paths):
+                if Node.loop_contains_transfer(nodes,cfg.loop_body(leaf)):
                     res_func_name_list.append(func_name)
                     break
         print("detect_transfer_in_loop res_func_name_list",res_func_name_list)
@@ -2057,11 +2393,11 @@ class Node:
         for func_name in func_name_list: #检测每个函数
             print("> airdrop function",func_name," event correctness checking ... <") 
             #func_cfg_uids[func_name].values(),func_paths[func_name]是对应一一关系
-            func_cfg_uids_list = list(func_cfg_uids[func_name].values())
-            for i in range(len(func_cfg_uids_list)): # 检测函数的每条路径
+            cfg = Node.function_cfg(nodes,func_name)
+            for i,leaf in enumerate(func_cfg_uids[func_name]): # 检测函数的每条路径
                 # print(">> function",func_name,"path",i)
                 # 1.首先检测路径是否存在循环: 排除没有循环的函数
-                if not Node.detect_path_loops(nodes,func_name,func_cfg_uids_list[i]):
+                if not cfg.has_loop(leaf):
                     continue
                 # 2.检测函数路径中是否存在SSTORE结点或CALL/DELEGATECALL结点
                 flag_sstore_or_call = False
@@ -2122,11 +2458,18 @@ class Node:
                     if func_cfg_uids_list[i][j] >= last_node.uid \
                         and nodes[func_cfg_uids_list[i][j]].opcode in ["SSTORE","CALL","DELEGATECALL"]:
                         last_node = nodes[func_cfg_uids_list[i][j]]
-                        state = copy(last_node.state)
-                    instruction = state.get_current_instruction()
-                    constraints = copy(state.world_state.constraints)
+                        state = last_node.state
+                    # 只有SSTORE/CALL/DELEGATECALL结点保留了路径约束，state可能是路径末尾的LOG等结点，此时取路径上最后一个保留约束的结点
+                    constrained_state = state
+                    if constrained_state.constraints is None:
+                        constrained_states = [nodes[uid].state for uid in func_paths[func_name][i]
+                                              if nodes[uid].state.constraints is not None]
+                        if not constrained_states:
+                            continue
+                        constrained_state = constrained_states[-1]
+                    constraints = copy(constrained_state.constraints)
                     constraints += [
-                        state.environment.sender == ACTORS.attacker,
+                        constrained_state.sender == ACTORS.attacker,
                     ]
                     try:
                         solver.get_model(constraints)
@@ -2185,71 +2528,29 @@ class Node:
         print("# detect_airdrop issues",issues)
         return issues
     
+    # 函数的控制流视图(支配树、循环)，结点图不变时只构建一次
+    @staticmethod
+    def function_cfg(nodes,func_name) -> FunctionCFG:
+        return _provenance(nodes, ("function_cfg", func_name), lambda: FunctionCFG(nodes, func_name))
+
     # 获取所有路径
     @staticmethod
     def get_all_path(nodes,func_name):
         start_time = time.time()
-        cfg_path_uids_dict = {} # 记录该分支从entry节点开始，经过的所有cfg节点，最后一个节点的uid:[uids]
-        path_uids_list = [] # 记录该分支所有业务图节点[[uids],...]
-        for node in nodes.values():
-            if node.function_name == func_name and node.opcode in ["JUMP","JUMPI","JUMPDEST"] and node.node_type != NodeType.DELETED:
-                # 如果后继节点时exit节点，则为路径终点
-                # if not hasattr(node, 'successors'):
-                #     print("node.uid",node.uid)
-                # else:
-                #     print("node.uid",node.uid,"node.successors",node.successors)
-                # print("node.uid",node.uid,"node.successors",node.successors)
-                if hasattr(node, 'successors') and nodes[node.successors[0]].node_type == NodeType.ENTRY_OR_EXIT_POINT:
-                    cfg_path_uids_dict[node.uid] = [node.uid]
-            # 检查是否有异常CFG节点
-            # if node.opcode in ["JUMP","JUMPDEST"] and len(node.successors) > 2:
-            #     # 如果后继节点时exit节点，则为路径终点
-            #     print("####node.uid",node.uid,"node.successors",node.successors,"node.node_type",node.node_type)
-            # 检查JUMPI是否正确
-            # if node.opcode == "JUMPI" and len(node.successors) == 2:
-            #     # 如果后继节点时exit节点，则为路径终点
-            #     print("####node.uid",node.uid,"node.successors",node.successors)
-        # 获取完整CFG路径
-        for node_uid in cfg_path_uids_dict:
-            if nodes[node_uid].node_type == NodeType.ENTRY_OR_EXIT_POINT: # 如果是只有一个entry结点所在基本块的情况
-                continue
-            cfg_node = nodes[node_uid]
-            if cfg_node.opcode in ["CALL","DELEGATECALL"]:
-                continue
-            while cfg_node.node_type != NodeType.ENTRY_OR_EXIT_POINT: # 向前找CFG节点直到entry节点开始
-                if not cfg_node.predecessors_list[0]:
-                    print("ERROR:cfg_node",cfg_node.uid,"predecessors_list",cfg_node.predecessors_list)
-                    break
-                cfg_node = nodes[cfg_node.predecessors_list[0][0]]
-                cfg_path_uids_dict[node_uid] = [cfg_node.uid] + cfg_path_uids_dict[node_uid]
-        # 获取完整路径
-        for node_uid in cfg_path_uids_dict:
-            cfg_path = cfg_path_uids_dict[node_uid] #因为JUMPI节点有两个后继，JUMPI和JUMPDEST节点的cfg_uid_info分别记录了两条的基本块包含的节点
-            block_path = []
-            # 除去JUMPDEST前的相邻的JUMPI节点
-            for i in range(len(cfg_path)-1):
-                if nodes[cfg_path[i]].opcode == "JUMPI" and cfg_path[i] == nodes[cfg_path[i+1]].predecessors_list[0][0]:
-                    continue
-                block_path.append(cfg_path[i])
-            block_path.append(cfg_path[-1])
-            # print("block_path",block_path)
-            # 获取完整路径
-            path = []
-            for block_uid in block_path:
-                path += nodes[block_uid].cfg_uid_info
-            path_uids_list.append(path)
-        # # 打印路径
-        # for uid in cfg_path_uids_dict:
-        #     print(f"uid:{uid} offset {nodes[uid].offset} path:{cfg_path_uids_dict[uid]}")
-        # for path in path_uids_list:
-        #     print(f"path:{path}")
+        cfg = Node.function_cfg(nodes,func_name)
+        cfg_path_uids_dict = dict(cfg.paths) # 记录该分支从entry节点开始，经过的所有cfg节点，最后一个节点的uid:[uids]
+        path_uids_list = list(cfg.block_paths) # 记录该分支所有业务图节点[[uids],...]
         if flag_time:
             print("get_all_path time:",time.time() - start_time)
         return cfg_path_uids_dict,path_uids_list
 
 
 # 检查前驱前驱节点是否包含操作码为opcode的节点，例如ADD或SUB等，只判断遇到的第一个
-def check_opcode(nodes, uids: list[int],opcode, limit: int=100) -> bool: 
+def check_opcode(nodes, uids: list[int],opcode, limit: int=100) -> bool:
+    return _provenance(nodes, ("check_opcode", tuple(uids), opcode, limit),
+                       lambda: _check_opcode(nodes, uids, opcode, limit))
+
+def _check_opcode(nodes, uids: list[int],opcode, limit: int=100) -> bool: 
         #因为使用的是队列，所以顺序是由右到左;uids时var i的直接前驱数组
         start_node_ids = set()
         visited = set()
@@ -2514,30 +2815,215 @@ def PreProcExpr2(token_expr):
     
     return token_expr
 
+
+# 结构化符号变量key：遍历一次z3 AST得到可哈希的tuple，代替字符串+正则匹配
+# ("const", v)                          数值
+# ("calldata", tx, lo, hi, base)        tx_calldata[base+lo : base+hi]，base为None表示偏移为常数
+# ("sender", tx)                        sender_tx
+# ("var", name)                         其他符号变量
+# ("sha3", width, parts)                keccak256_width(Concat(parts))，已去掉开头的0
+# ("concat", parts)                     Concat，相邻的calldata字节已合并，已去掉开头的0
+# ("load", slot)                        Store链中找不到slot时的读取，对应字符串"[slot]"
+# ("op", name, params, children)        其他运算
+symbol_key_cache_limit = 200000
+_symbol_key_cache = {}  # z3 AST id -> (ast, key)，保留ast避免id被复用
+# z3打印为中缀的运算及其优先级(数值越大越松)，用于判断字符串最左边的项
+_INFIX_PRECEDENCE = {
+    "bvmul": 2, "bvsdiv": 2, "bvsmod": 2,
+    "bvadd": 3, "bvsub": 3,
+    "bvshl": 4, "bvashr": 4,
+    "bvand": 5, "bvxor": 6, "bvor": 7,
+    "=": 8, "distinct": 8, "bvsle": 8, "bvslt": 8, "bvsge": 8, "bvsgt": 8,
+}
+_SENDER_PATTERN = re.compile(r"sender_(\d+)$")
+_CALLDATA_PATTERN = re.compile(r"(\d+)_calldata$")
+
+
+def _calldata_index(index_key):
+    # 下标拆分为(常数偏移, 符号部分)
+    if index_key[0] == "const":
+        return index_key[1], None
+    if index_key[0] == "op" and index_key[1] == "bvadd" and len(index_key[3]) == 2:
+        left, right = index_key[3]
+        if left[0] == "const":
+            return left[1], right
+        if right[0] == "const":
+            return right[1], left
+    return 0, index_key
+
+
+def _concat_parts(parts):
+    # 合并相邻的calldata字节，并去掉开头的0
+    merged = []
+    for part in parts:
+        if merged and part[0] == "calldata" and merged[-1][0] == "calldata":
+            last = merged[-1]
+            if last[1] == part[1] and last[4] == part[4] and last[3] + 1 == part[2]:
+                merged[-1] = ("calldata", last[1], last[2], part[3], last[4])
+                continue
+        merged.append(part)
+    while len(merged) > 1 and merged[0] == ("const", 0):
+        merged.pop(0)
+    return tuple(merged)
+
+
+def _resolve_load(array_key, slot_key):
+    # 与Node.extract_value_from_store一致：按字符串顺序(最内层的Store在前)找写入slot的值
+    writes = []
+    while array_key[0] == "op" and array_key[1] == "store":
+        array_key, index_key, value_key = array_key[3]
+        writes.append((index_key, value_key))
+    for index_key, value_key in reversed(writes):
+        if index_key == slot_key:
+            return value_key
+    return ("load", slot_key)
+
+
+def _make_symbol_key(expr, child_keys):
+    if z3.is_bv_value(expr):
+        return ("const", expr.as_long())
+    if z3.is_true(expr) or z3.is_false(expr):
+        return ("const", z3.is_true(expr))
+    if z3.is_const(expr):
+        name = expr.decl().name()
+        match = _SENDER_PATTERN.match(name)
+        if match:
+            return ("sender", match.group(1))
+        return ("var", name)
+    kind = expr.decl().kind()
+    if kind == z3.Z3_OP_SELECT:
+        match = _CALLDATA_PATTERN.match(str(expr.arg(0))) if z3.is_const(expr.arg(0)) else None
+        if match:
+            offset, base = _calldata_index(child_keys[1])
+            return ("calldata", match.group(1), offset, offset, base)
+        return _resolve_load(child_keys[0], child_keys[1])
+    elif kind == z3.Z3_OP_ITE and child_keys[2][0] == "calldata" and child_keys[1] == ("const", 0):
+        # If(tx_calldatasize <= i, 0, tx_calldata[i])
+        return child_keys[2]
+    elif kind == z3.Z3_OP_CONCAT:
+        parts = _concat_parts(child_keys)
+        return parts[0] if len(parts) == 1 else ("concat", parts)
+    name = expr.decl().name()
+    if name.startswith("keccak256_") and len(child_keys) == 1:
+        parts = child_keys[0][1] if child_keys[0][0] == "concat" else (child_keys[0],)
+        return ("sha3", name[len("keccak256_"):], parts)
+    params = tuple(str(param) for param in expr.decl().params())
+    return ("op", name, params, tuple(child_keys))
+
+
+def symbol_var_key(symbol_var):
+    """Hashable structural key of a symbolic variable, memoized by z3 AST id.
+
+    Walks the AST once (iteratively, shared subterms are visited once) and
+    normalizes the shapes that the string pipeline (symbol_var_preprocess +
+    Node.get_last_bracket_content) rewrites with regexes: calldata byte
+    ranges, sender and keccak256 storage slots.
+    """
+    expr = getattr(symbol_var, "raw", symbol_var)
+    if isinstance(expr, int):
+        return ("const", expr)
+    if not z3.is_expr(expr):
+        return ("expr", str(expr))
+    if len(_symbol_key_cache) > symbol_key_cache_limit:
+        _symbol_key_cache.clear()
+    cached = _symbol_key_cache.get(expr.get_id())
+    if cached is not None:
+        return cached[1]
+    stack = [(expr, False)]
+    while stack:
+        current, children_done = stack.pop()
+        current_id = current.get_id()
+        if current_id in _symbol_key_cache:
+            continue
+        if not z3.is_app(current):  # 量词等，不做结构化处理
+            _symbol_key_cache[current_id] = (current, ("expr", str(current)))
+            continue
+        children = current.children()
+        if not children_done:
+            stack.append((current, True))
+            stack.extend((child, False) for child in children if child.get_id() not in _symbol_key_cache)
+            continue
+        child_keys = [_symbol_key_cache[child.get_id()][1] for child in children]
+        _symbol_key_cache[current_id] = (current, _make_symbol_key(current, child_keys))
+    return _symbol_key_cache[expr.get_id()][1]
+
+
+def _leading_key(key):
+    # 字符串形式最左边的项（中缀运算的第一个操作数，Concat的第一部分）；被括号包住则返回None
+    while True:
+        if key[0] == "concat":
+            key = key[1][0]
+        elif key[0] == "op" and key[1] in _INFIX_PRECEDENCE and key[3]:
+            child = key[3][0]
+            if child[0] == "op" and _INFIX_PRECEDENCE.get(child[1], 0) > _INFIX_PRECEDENCE[key[1]]:
+                return None
+            key = child
+        else:
+            return key
+
+
+def _key_identity(key):
+    # 对应正则 keccak256_512\((?:0,)?(?:.*?),(\d+)\)：第一个keccak256_512内最先出现的"…,数字)"
+    stack = [key]
+    while stack:
+        current = stack.pop()
+        if current[0] == "sha3" and current[1] == "512":
+            return _first_const_tail(current)
+        stack.extend(reversed(_key_children(current)))
+    return None
+
+
+def _first_const_tail(key):
+    # 后序遍历，返回第一个以常数作为最后一个参数的函数式项的常数
+    stack = [(key, False)]
+    while stack:
+        current, children_done = stack.pop()
+        children = _key_children(current)
+        if not children_done:
+            stack.append((current, True))
+            stack.extend((child, False) for child in reversed(children))
+            continue
+        function_style = current[0] == "sha3" or (current[0] == "op" and current[1] not in _INFIX_PRECEDENCE)
+        if function_style and len(children) > 1 and children[-1][0] == "const":
+            return str(children[-1][1])
+    return None
+
+
+def _key_children(key):
+    if key[0] == "sha3":
+        return key[2]
+    if key[0] == "load":
+        return (key[1],)
+    if key[0] == "concat":
+        return key[1]
+    if key[0] == "op":
+        return key[3]
+    return ()
+
+
 def ret_report(Funcname,error,slot,value):
     print("Function_name:", Funcname)
     print(error)
     print("slot: ", slot, "\nvalue: ", value, end="\n\n")
     
     
-def ret_issues(state, severity:str="High", description_head:str="", description_tail:str=""):
-    environment = state.environment
-    function_name = environment.active_function_name
+def ret_issues(state: NodeState, severity:str="High", description_head:str="", description_tail:str=""):
+    function_name = state.function_name
     # description_head, description_tail = descriptions
     if description_head == "":
         description_head = str(function_name)
-    print("Function_name:", state.environment.active_function_name,description_tail,description_tail)
+    print("Function_name:", state.function_name,description_tail,description_tail)
     issue = Issue(
-        contract=environment.active_account.contract_name,
+        contract=state.contract_name,
         function_name=function_name,
-        address=state.get_current_instruction()["address"],
+        address=state.address,
         swc_id=WRITE_TO_ARBITRARY_STORAGE,
-        bytecode=environment.code.bytecode,
+        bytecode=state.bytecode,
         title=function_name+" handle",
         severity=severity,
         description_head=description_head,
         description_tail=description_tail,
-        gas_used=(state.mstate.min_gas_used, state.mstate.max_gas_used),
+        gas_used=state.gas_used,
         # transaction_sequence=transaction_sequence,
     )
     return issue
@@ -2561,6 +3047,14 @@ def ret_issues(state, severity:str="High", description_head:str="", description_
 #     return data,identity_matches[0]
 
 def identity_extract(expr):
+    if isinstance(expr, tuple): # symbol_var_key
+        identity = _key_identity(expr)
+        if identity is not None:
+            return identity
+        elif expr[0] == "const":
+            return str(expr[1])
+        else:
+            return -1
     # pattern = r'keccak256_512\(Concat\((?:0,)?(?:.*?),(\d+)\)'
     pattern = r'keccak256_512\((?:0,)?(?:.*?),(\d+)\)'
     identity = re.findall(pattern, expr)
@@ -2604,14 +3098,8 @@ def identity_extract(expr):
 
 # 检查函数内是否存在ADDRESS结点
 def check_address_node(nodes,current_node:Node): #检查是否存在ADDRESS结点
-    current_uid = current_node.uid
-    for node_uid in range(current_uid-1, -1, -1):
-        if nodes[node_uid].function_name != current_node.function_name:
-            continue
-        if nodes[node_uid].tx_id != current_node.tx_id:
-            continue
-        if nodes[node_uid].opcode == "ADDRESS":
-            return True
+    for node_uid in nodes.latest(current_node.function_name, current_node.tx_id, "ADDRESS", current_node.uid):
+        return True
     return False
 
 def hard_code_check(nodes,current_node:Node): #检查是否存在硬编码；并给出正确的数据源节点数
@@ -2627,7 +3115,7 @@ def hard_code_check(nodes,current_node:Node): #检查是否存在硬编码；并
         # print("INFO:not mapping sstore")
         return issues
     elif len(slot_start_node_ids) != len(sha3_uids):
-        func_name = state.environment.active_function_name
+        func_name = state.function_name
         description_head = f"Hardcode or ADDRESS node detected"
         description = f"Hardcode detected in {func_name} function."
         if check_address_node(nodes,current_node):
@@ -2675,7 +3163,7 @@ def hard_code_check(nodes,current_node:Node): #检查是否存在硬编码；并
     # if len(value_nard_code) > 0 and value_nard_code[0] in slot_hard_code:
     #     value_nard_code.remove(value_nard_code[0])
     if len(slot_hard_code) > 0 or len(value_nard_code) > 0:
-        func_name = state.environment.active_function_name
+        func_name = state.function_name
         description = f"Hardcode detected in {func_name} function."
         if check_address_node(nodes,current_node):
             description += "ADDRESS node.\n"
@@ -2697,7 +3185,36 @@ def hard_code_check(nodes,current_node:Node): #检查是否存在硬编码；并
         
     return issues
 
-def check_roles(expr:str,role:Role):
+_ROLE_CALLDATA_RANGES = {
+    Role.PARAM1: [(4, 35), (16, 35)],
+    Role.PARAM2: [(36, 67)],
+    Role.PARAM3: [(68, 99)],
+}
+
+def _calldata_base(base):
+    # 对应Role.PARAM正则中的(\+\d+_calldata\[\d+:\d+\])*：偏移的符号部分只能是常数偏移的calldata之和
+    if base is None:
+        return True
+    if base[0] == "calldata":
+        return base[4] is None and base[2] != base[3]
+    if base[0] == "op" and base[1] == "bvadd":
+        return all(_calldata_base(child) for child in base[3])
+    return False
+
+def check_roles(expr,role:Role): # expr为字符串或symbol_var_key
+    if role and isinstance(expr, tuple):
+        lead = _leading_key(expr)
+        if lead is None:
+            return None
+        if role == Role.SENDER:
+            return True if lead[0] == "sender" else None
+        if lead[0] != "calldata" or lead[2] == lead[3]:
+            return None
+        if role == Role.PARAM:
+            return True if _calldata_base(lead[4]) else None
+        if lead[4] is None and (lead[2], lead[3]) in _ROLE_CALLDATA_RANGES[role]:
+            return True
+        return None
     if role: #不为Role.HARD_CODE
         match = re.match(role.value, expr)
         if match:
@@ -2766,7 +3283,7 @@ class DefiCheck3(DetectionModule):
     post_hooks = Post_hooks
     
     function_dict = {}
-    nodes: Dict[int, Node] = {}
+    nodes: Dict[int, Node] = NodeStore()
     identity_dict = {}
     deficheck_time =0
     memory_dict = defaultdict(dict)
@@ -2787,6 +3304,171 @@ class DefiCheck3(DetectionModule):
         """
         super().reset_module()
 
+    def start_worker(self):
+        """
+        fork出的worker进程开始探索交易前调用，记录fork时已有的结点
+        """
+        super().start_worker()
+        DefiCheck3._worker_base = Node.count
+        DefiCheck3._worker_uid_lists = {uid: _uid_lists(node) for uid, node in self.nodes.items()}
+        DefiCheck3._worker_pending = [uid for uid, node in self.nodes.items() if node.post_flag]
+        self.func_opcode_time.clear() # fork前的计时留在主进程
+
+    def export_worker_state(self):
+        """
+        worker进程探索完成后调用，导出新建的结点和对fork前已有结点的修改
+        :return: merge_worker_state的参数
+        """
+        changes = {}
+        for uid, (successors, predecessors_list, cfg_uid_info) in self._worker_uid_lists.items():
+            node = self.nodes[uid]
+            if len(node.predecessors_list) == len(predecessors_list):
+                predecessors_change = [_list_change(old, new) for old, new in zip(predecessors_list, node.predecessors_list)]
+            else:
+                predecessors_change = ("replace", [list(predecessors) for predecessors in node.predecessors_list])
+            change = (_list_change(successors, node.successors),
+                      predecessors_change,
+                      _list_change(cfg_uid_info, node.cfg_uid_info))
+            if change != (None, [None] * len(predecessors_list), None):
+                changes[uid] = change
+        return dict(
+            module=super().export_worker_state(),
+            base=self._worker_base,
+            nodes=[node for uid, node in self.nodes.items() if uid >= self._worker_base],
+            # fork时等待post_hook、在worker中完成post_hook的结点整体替换
+            completed=[self.nodes[uid] for uid in self._worker_pending if not self.nodes[uid].post_flag],
+            changes=changes,
+            function_dict=self.function_dict,
+            identity_dict=self.identity_dict,
+            func_opcode_time=self.func_opcode_time,
+        )
+
+    def merge_worker_state(self, state):
+        """
+        在主进程中合并一个worker进程导出的结点：新结点按顺序重新编号，uid保持连续
+        :param state: export_worker_state的返回值
+        """
+        super().merge_worker_state(state["module"])
+        uids = {}  # worker中的uid -> 本进程中的uid
+        folded = set()  # 合并到已有入口/出口结点上的结点
+        entry_or_exit = defaultdict(int)
+        for node in state["nodes"]:
+            if node.node_type == NodeType.ENTRY_OR_EXIT_POINT and entry_or_exit[node.function_name] < 2:
+                # 每个worker都会为函数创建入口/出口结点，合并到本进程已有的入口/出口结点上
+                existing = self.nodes.entry_exit(node.function_name)[entry_or_exit[node.function_name]]
+                entry_or_exit[node.function_name] += 1
+                if existing != -1:
+                    uids[node.uid] = existing
+                    folded.add(id(node))
+                    continue
+            uids[node.uid] = Node.count
+            Node.count += 1
+
+        def remap(uid_list):
+            return [uids.get(uid, uid) for uid in uid_list]
+
+        def remap_change(change):
+            return None if change is None else (change[0], remap(change[1]))
+
+        def apply_change(uid_list, change):
+            if change is None:
+                return uid_list
+            if change[0] == "append":
+                return uid_list + change[1]
+            return change[1]
+
+        for node in state["nodes"] + state["completed"]:
+            node.uid = uids.get(node.uid, node.uid)
+            node.successors = remap(node.successors)
+            node.predecessors_list = [remap(predecessors) for predecessors in node.predecessors_list]
+            node.cfg_uid_info = remap(node.cfg_uid_info)
+        for node in state["nodes"]:
+            if id(node) in folded:
+                existing = self.nodes[node.uid]
+                existing.successors += [uid for uid in node.successors if uid not in existing.successors]
+                existing.cfg_uid_info += [uid for uid in node.cfg_uid_info if uid not in existing.cfg_uid_info]
+                for predecessors, new_predecessors in zip(existing.predecessors_list, node.predecessors_list):
+                    predecessors += [uid for uid in new_predecessors if uid not in predecessors]
+            else:
+                self.nodes[node.uid] = node
+        for node in state["completed"]:
+            self.nodes[node.uid] = node
+        completed = {node.uid for node in state["completed"]}
+        for uid, (successors, predecessors_change, cfg_uid_info) in state["changes"].items():
+            if uid in completed:
+                continue
+            node = self.nodes[uid]
+            node.successors = apply_change(node.successors, remap_change(successors))
+            node.cfg_uid_info = apply_change(node.cfg_uid_info, remap_change(cfg_uid_info))
+            if isinstance(predecessors_change, tuple):
+                node.predecessors_list = [remap(predecessors) for predecessors in predecessors_change[1]]
+            else:
+                node.predecessors_list = [apply_change(predecessors, remap_change(change))
+                                          for predecessors, change in zip(node.predecessors_list, predecessors_change)]
+
+        self.nodes.invalidate_provenance()
+        for Func_name, func_type in state["function_dict"].items():
+            if self.function_dict.get(Func_name, FunctionType.UNKNOWN) == FunctionType.UNKNOWN:
+                self.function_dict[Func_name] = func_type
+        self.identity_dict.update(state["identity_dict"])
+        for Func_name, opcode_time in state["func_opcode_time"].items():
+            func_time = self.func_opcode_time.setdefault(Func_name, {})
+            for opcode, duration in opcode_time.items():
+                func_time[opcode] = func_time.get(opcode, 0) + duration
+
+    def stealable(self, global_state: GlobalState) -> bool:
+        """
+        结点的前驱在同一路径(同一函数、同一交易)的已有结点中查找，这些结点只在到达该状态的进程中，
+        因此只有刚进入函数或刚开始交易、还没有执行指令的状态可以转移到其他worker进程
+        :param global_state: work_list中的状态
+        :return: 是否可以转移
+        """
+        if not self.function_filter(global_state.environment.active_function_name):
+            return True  # 不分析的函数不创建结点
+        if len(global_state.transaction_stack) > 1:
+            return False  # 外部调用返回后还要继续调用者的路径
+        node = global_state.node
+        if global_state.get_current_instruction()["address"] != node.start_addr:
+            return False
+        return node.start_addr == 0 or bool(node.flags & NodeFlags.FUNC_ENTRY)
+
+    def function_filter(self, Func_name: str) -> bool:
+        """
+        判断是否分析该函数，LASER只在被接受的函数中触发本模块的hook
+        :param Func_name: active_function_name
+        :return: 是否分析
+        """
+        if Func_name == "balanceOf(address)" or \
+            Func_name == "balanceOf(address,uint256)" or \
+            Func_name == "ownerOf(uint256)" or \
+            Func_name == "getApproved(uint256)" or \
+            Func_name == "name()" or \
+            Func_name == "symbol()" or \
+            Func_name == "isApprovedForAll(address,address)":
+            if flag_detailed:
+                print("Func_name_r: ", Func_name)
+            return False
+        
+        # if Func_name != "approve(address,uint256)": #只处理approve函数
+        # # if Func_name != "transfer(address,uint256)": #只处理transfer函数
+        # if Func_name != "transferFrom(address,address,uint256)": #只处理setApprovalForAll函数
+            # return False
+        func_list = ["approve",
+                     "Approval",
+                     "permit",
+                     "transfer",
+                     "airdrop",
+                     "constructor",
+                     "fallback"] 
+        # 如果Func_name不包含func_list中任何一个元素(包含是指func_list[i] in Func_name)，则不分析
+        if flag_ERC and not any([func.lower() in Func_name.lower() for func in func_list]):
+            return False
+        
+        # 如果检测空投函数，则排除常见的空投函数的检测
+        if flag_airdrop and Func_name in not_airdrop_list:
+            return False
+        return True
+
     def _execute(self, state: GlobalState) -> None:
         """
 
@@ -2806,6 +3488,7 @@ class DefiCheck3(DetectionModule):
         :return:
         """
         issues = []
+        self.nodes.invalidate_provenance()  # 本次hook可能修改已有结点的前驱/后继
         Func_name=state.environment.active_function_name
         # if Func_name=="revokeOperator(address)" or \
         #     Func_name=="authorizeOperator(address)" or \
@@ -2819,35 +3502,7 @@ class DefiCheck3(DetectionModule):
         #     Func_name == "setCrowdsaleAddress(address)":
         #         print("Func_name_r: ", Func_name)
         #         return []
-        if Func_name == "balanceOf(address)" or \
-            Func_name == "balanceOf(address,uint256)" or \
-            Func_name == "ownerOf(uint256)" or \
-            Func_name == "getApproved(uint256)" or \
-            Func_name == "name()" or \
-            Func_name == "symbol()" or \
-            Func_name == "isApprovedForAll(address,address)":
-            if flag_detailed:
-                print("Func_name_r: ", Func_name)
-            return []
-        
-            
-        # if state.environment.active_function_name != "approve(address,uint256)": #只处理approve函数
-        # # if state.environment.active_function_name != "transfer(address,uint256)": #只处理transfer函数
-        # if state.environment.active_function_name != "transferFrom(address,address,uint256)": #只处理setApprovalForAll函数
-            # return []
-        func_list = ["approve",
-                     "Approval",
-                     "permit",
-                     "transfer",
-                     "airdrop",
-                     "constructor",
-                     "fallback"] 
-        # 如果Func_name不包含func_list中任何一个元素(包含是指func_list[i] in Func_name)，则返回
-        if flag_ERC and not any([func.lower() in Func_name.lower() for func in func_list]):
-            return []
-        
-        # 如果检测空投函数，则排除常见的空投函数的检测
-        if flag_airdrop and Func_name in not_airdrop_list:
+        if not self.function_filter(Func_name):
             return []
         
         #如果函数名未记录function_list中，则记录
@@ -2869,11 +3524,7 @@ class DefiCheck3(DetectionModule):
         #     print("balance: ",PreProcExpr(str(account.balance()))) 
         environment = state.environment
         # 如果没有function_name == Func_name的node，则创建起始节点
-        EntryNode_uid= -1
-        for node in self.nodes:
-            if self.nodes[node].function_name == Func_name and self.nodes[node].node_type == NodeType.ENTRY_OR_EXIT_POINT:
-                EntryNode_uid = self.nodes[node].uid
-                break
+        EntryNode_uid, ExitNode_uid = self.nodes.entry_exit(Func_name)
         # if flag_create == False:
         if EntryNode_uid == -1:
             new_node = Node(nodes=self.nodes,
@@ -2897,17 +3548,6 @@ class DefiCheck3(DetectionModule):
             # for node in self.nodes:
             #     if self.nodes[node].function_name == Func_name:
             #         print("node:",self.nodes[node].get_dict())
-        else:
-            EntryNode_uid = -1
-            ExitNode_uid = -1
-            for node in self.nodes:
-                if self.nodes[node].function_name == Func_name:
-                    if self.nodes[node].node_type == NodeType.ENTRY_OR_EXIT_POINT:
-                        if EntryNode_uid == -1:
-                            EntryNode_uid = node
-                        else:
-                            ExitNode_uid = node
-                            break               
 
         #old_node时function_name == Func_name的最后一个节点
         # old_node = self.nodes[Node.count-1]
@@ -2915,12 +3555,9 @@ class DefiCheck3(DetectionModule):
         # if Node.count>2 and old_node.post_flag: #POST_HOOK  and not is_prehook()
         old_node = None
         if not is_prehook():
-            for node_uid in self.nodes:
-                if self.nodes[node_uid].post_flag:
-                    old_node = self.nodes[node_uid]
-                    if flag_detailed:
-                        print("find old_node",old_node.uid)
-                    break
+            old_node = self.nodes.pending_post_node()
+            if flag_detailed and old_node is not None:
+                print("find old_node",old_node.uid)
             if old_node == None:
                 for node in self.nodes:
                     print("old_node == None")
@@ -2929,10 +3566,8 @@ class DefiCheck3(DetectionModule):
                 "opcode"
             ]
             # old_node的起始结点
-            for node in self.nodes:
-                if self.nodes[node].function_name == old_node.function_name and self.nodes[node].node_type == NodeType.ENTRY_OR_EXIT_POINT:
-                    EntryNode_uid = self.nodes[node].uid
-                    break
+            if self.nodes.entry_uid(old_node.function_name) is not None:
+                EntryNode_uid = self.nodes.entry_uid(old_node.function_name)
             if flag_detailed:
                 print("posthook_opcode",posthook_opcode)
             if flag_time:
@@ -3642,8 +4277,8 @@ class DefiCheck3(DetectionModule):
         print("=== detect ERC20/ERC721 approve/transfer/transferFrom ===")
         issues = []
         # 判断函数类型，并调用对应检测方案
-        for Func_name in self.function_dict:
-            func_type,identity_dict = self.check_func_type(Func_name,self.nodes,flag_detailed)
+        # handler之间共享self.identity_dict，依赖函数顺序，只能串行执行
+        for Func_name,func_type,identity_dict in self.iter_func_types(list(self.function_dict),self.nodes,flag_detailed):
             if Func_name not in self.function_dict or self.function_dict[Func_name] != FunctionType.UNKNOWN:
                 self.function_dict[Func_name] = func_type
             if flag_detailed:
@@ -3744,6 +4379,38 @@ class DefiCheck3(DetectionModule):
         return issues
             
     
+    def iter_func_types(self,func_names,nodes,flag_detailed=False):
+        """Yields (Func_name, func_type, identity_dict) for func_names in order.
+
+        check_func_type only reads the graph and the entry of its own function
+        in function_dict, so with post_analysis_workers > 1 the functions are
+        classified by a pool of forked processes that share the graph
+        copy-on-write (nothing but the results is pickled). Results come back
+        in func_names order and the output of each worker is replayed when its
+        function is yielded, so the log reads exactly like a sequential run.
+
+        :param func_names: functions to classify, in report order
+        :param nodes: the DefiCheck node graph
+        :param flag_detailed: passed on to check_func_type
+        :return: generator of (Func_name, func_type, identity_dict)
+        """
+        global _post_analysis_task
+        if post_analysis_workers <= 1 or len(func_names) <= 1 \
+                or "fork" not in multiprocessing.get_all_start_methods():
+            for Func_name in func_names:
+                func_type,identity_dict = self.check_func_type(Func_name,nodes,flag_detailed)
+                yield Func_name,func_type,identity_dict
+            return
+        _post_analysis_task = (self, nodes, flag_detailed)
+        try:
+            with multiprocessing.get_context("fork").Pool(min(post_analysis_workers, len(func_names))) as pool:
+                results = pool.imap(_check_func_type_worker, func_names)
+                for Func_name,(func_type,identity_dict,output) in zip(func_names,results):
+                    sys.stdout.write(output)
+                    yield Func_name,func_type,identity_dict
+        finally:
+            _post_analysis_task = None
+
     # 检查单个函数的type
     def check_func_type(self,Func_name:str,nodes,flag_detailed=False):
         if flag_detailed:
@@ -3754,9 +4421,7 @@ class DefiCheck3(DetectionModule):
             func_type = self.function_dict[Func_name]
         else:
             func_type = FunctionType.UNKNOWN #初始化为UNKNOWN
-            for node in nodes:
-                if nodes[node].function_name != Func_name: #只处理当前函数的node
-                    continue
+            for node in nodes.function_uids(Func_name): #只处理当前函数的node
                 opcode = nodes[node].opcode
                 if opcode == "SSTORE":
                     slot = nodes[node].symbol_vars_expr[0]
@@ -3765,7 +4430,7 @@ class DefiCheck3(DetectionModule):
                     slot_start_node_ids = Node.find_start_node_ids(nodes, nodes[node].predecessors_list[0])
                     # value_predecessors = nodes[node].predecessors_list[1]
                     value_start_node_ids = Node.find_start_node_ids(nodes, nodes[node].predecessors_list[1])
-                    identity = identity_extract(slot)
+                    identity = identity_extract(nodes[node].var_key(0))
                     core_structures.append((slot, value, slot_start_node_ids, value_start_node_ids,identity))
             if flag_detailed:
                 # print(Func_name,"core_structures",core_structures)
@@ -3808,15 +4473,15 @@ class DefiCheck3(DetectionModule):
                     # 是存在包含两个keccak256_512的结构
                     for slot, value, slot_start_node_ids, value_start_node_ids,_ in core_structures:
                         if len(slot_start_node_ids) == 2 \
-                            and check_roles(nodes[slot_start_node_ids[0]].symbol_vars_expr[0],Role.PARAM) \
-                            and check_roles(nodes[slot_start_node_ids[1]].symbol_vars_expr[0],Role.PARAM):
+                            and check_roles(nodes[slot_start_node_ids[0]].var_key(0),Role.PARAM) \
+                            and check_roles(nodes[slot_start_node_ids[1]].var_key(0),Role.PARAM):
                             func_type = FunctionType.ERC20_TRANSFERFROM
                             break
                     if func_type == FunctionType.UNKNOWN:
                         for slot, value, slot_start_node_ids, value_start_node_ids,_ in core_structures:
                             if len(slot_start_node_ids) == 1 \
                                 and len(value_start_node_ids) == 1\
-                                and check_roles(nodes[slot_start_node_ids[0]].symbol_vars_expr[0],Role.PARAM2):#_owners[tokenId] = to;
+                                and check_roles(nodes[slot_start_node_ids[0]].var_key(0),Role.PARAM2):#_owners[tokenId] = to;
                                 func_type = FunctionType.ERC721_TRANSFERFROM
                             
             # elif "mint(address,uint256)" in Func_name: #mint
@@ -4026,14 +4691,14 @@ class DefiCheck3(DetectionModule):
             print(f"value_start_node_ids: {value_start_node_ids}, value_sload_count: {value_sload_count}")
             # 检查
             if len(slot_start_node_ids) == 2 \
-                and (check_roles(nodes[slot_start_node_ids[0]].symbol_vars_expr[0],Role.PARAM) or check_roles(nodes[slot_start_node_ids[0]].symbol_vars_expr[0],Role.SENDER)) \
-                and (check_roles(nodes[slot_start_node_ids[1]].symbol_vars_expr[0],Role.PARAM) or check_roles(nodes[slot_start_node_ids[1]].symbol_vars_expr[0],Role.SENDER)):
+                and (check_roles(nodes[slot_start_node_ids[0]].var_key(0),Role.PARAM) or check_roles(nodes[slot_start_node_ids[0]].var_key(0),Role.SENDER)) \
+                and (check_roles(nodes[slot_start_node_ids[1]].var_key(0),Role.PARAM) or check_roles(nodes[slot_start_node_ids[1]].var_key(0),Role.SENDER)):
                 # slot满足条件：二维映射，有两个key来自参数
                 # 检查value
                 if len(value_start_node_ids) == 3 \
-                    and (check_roles(nodes[value_start_node_ids[0]].symbol_vars_expr[0],Role.PARAM) or check_roles(nodes[value_start_node_ids[0]].symbol_vars_expr[0],Role.SENDER)) \
-                    and (check_roles(nodes[value_start_node_ids[1]].symbol_vars_expr[0],Role.PARAM) or check_roles(nodes[value_start_node_ids[1]].symbol_vars_expr[0],Role.SENDER)) \
-                    and (check_roles(nodes[value_start_node_ids[2]].symbol_vars_expr[0],Role.PARAM) or check_roles(nodes[value_start_node_ids[2]].symbol_vars_expr[0],Role.SENDER)):
+                    and (check_roles(nodes[value_start_node_ids[0]].var_key(0),Role.PARAM) or check_roles(nodes[value_start_node_ids[0]].var_key(0),Role.SENDER)) \
+                    and (check_roles(nodes[value_start_node_ids[1]].var_key(0),Role.PARAM) or check_roles(nodes[value_start_node_ids[1]].var_key(0),Role.SENDER)) \
+                    and (check_roles(nodes[value_start_node_ids[2]].var_key(0),Role.PARAM) or check_roles(nodes[value_start_node_ids[2]].var_key(0),Role.SENDER)):
                     # value满足条件：三个key来自参数
                     if '115792089237316195423570985008687907853269984665640564039457584007913129639935' in value_expr: #check_opcode(nodes,nodes[node_id].predecessors_list[1],"SUB") \
                         # 返回函数类型：ERC1155的burn函数
@@ -4054,7 +4719,7 @@ class DefiCheck3(DetectionModule):
                 if slot_sload_count >= 1: #且是嵌套映射
                     # 检查value
                     if len(value_start_node_ids) == 1 \
-                        and (check_roles(nodes[value_start_node_ids[0]].symbol_vars_expr[0],Role.PARAM) or check_roles(nodes[value_start_node_ids[0]].symbol_vars_expr[0],Role.SENDER)):
+                        and (check_roles(nodes[value_start_node_ids[0]].var_key(0),Role.PARAM) or check_roles(nodes[value_start_node_ids[0]].var_key(0),Role.SENDER)):
                         if value_sload_count >= 2:
                             if value_sload_count > 2:
                                 if value_sload_count >= 3 \
@@ -4074,7 +4739,7 @@ class DefiCheck3(DetectionModule):
                                 flag_ERC721_mint_balance = True
                 else: # slot_sload_count == 0
                     if len(value_start_node_ids) == 1 \
-                        and (check_roles(nodes[value_start_node_ids[0]].symbol_vars_expr[0],Role.PARAM) or check_roles(nodes[value_start_node_ids[0]].symbol_vars_expr[0],Role.SENDER)):
+                        and (check_roles(nodes[value_start_node_ids[0]].var_key(0),Role.PARAM) or check_roles(nodes[value_start_node_ids[0]].var_key(0),Role.SENDER)):
                         if value_sload_count == 1:
                             # value_expr以逗号分割，最后一位是否位0
                             if ',' in value_expr\
@@ -4095,13 +4760,13 @@ class DefiCheck3(DetectionModule):
                             
                     elif len(value_start_node_ids) == 2 \
                         and (
-                            (check_roles(nodes[value_start_node_ids[1]].symbol_vars_expr[0],Role.PARAM) or check_roles(nodes[value_start_node_ids[1]].symbol_vars_expr[0],Role.SENDER))
-                            or ((check_roles(nodes[value_start_node_ids[0]].symbol_vars_expr[0],Role.PARAM) or check_roles(nodes[value_start_node_ids[0]].symbol_vars_expr[0],Role.SENDER)))
+                            (check_roles(nodes[value_start_node_ids[1]].var_key(0),Role.PARAM) or check_roles(nodes[value_start_node_ids[1]].var_key(0),Role.SENDER))
+                            or ((check_roles(nodes[value_start_node_ids[0]].var_key(0),Role.PARAM) or check_roles(nodes[value_start_node_ids[0]].var_key(0),Role.SENDER)))
                         ):
                         # and (check_roles(nodes[value_start_node_ids[0]].symbol_vars_expr[0],Role.PARAM) or check_roles(nodes[value_start_node_ids[0]].symbol_vars_expr[0],Role.SENDER)) \
                         if value_sload_count == 1:
                             flag_ERC721_mint_owner = True
-                            if (check_roles(nodes[value_start_node_ids[0]].symbol_vars_expr[0],Role.PARAM) or check_roles(nodes[value_start_node_ids[0]].symbol_vars_expr[0],Role.SENDER))\
+                            if (check_roles(nodes[value_start_node_ids[0]].var_key(0),Role.PARAM) or check_roles(nodes[value_start_node_ids[0]].var_key(0),Role.SENDER))\
                                 and check_opcode(nodes,nodes[node_id].predecessors_list[1],"ADD"): # TODO：可能导致721误报为1155
                                 flag_ERC1155_mint_balance = True
                         elif value_sload_count == 2:
@@ -4110,10 +4775,10 @@ class DefiCheck3(DetectionModule):
                 if slot_sload_count == 0:
                     if len(value_start_node_ids) == 2 \
                         and (
-                            check_roles(nodes[value_start_node_ids[0]].symbol_vars_expr[0],Role.PARAM) \
-                            or check_roles(nodes[value_start_node_ids[0]].symbol_vars_expr[0],Role.SENDER) \
-                            or check_roles(nodes[value_start_node_ids[1]].symbol_vars_expr[0],Role.PARAM) \
-                            or check_roles(nodes[value_start_node_ids[1]].symbol_vars_expr[0],Role.SENDER)
+                            check_roles(nodes[value_start_node_ids[0]].var_key(0),Role.PARAM) \
+                            or check_roles(nodes[value_start_node_ids[0]].var_key(0),Role.SENDER) \
+                            or check_roles(nodes[value_start_node_ids[1]].var_key(0),Role.PARAM) \
+                            or check_roles(nodes[value_start_node_ids[1]].var_key(0),Role.SENDER)
                         ):
                         if value_sload_count == 1:
                             # print("value_expr.split(',')[-1].strip()",value_expr.split(',')[-1].strip())
@@ -4123,16 +4788,16 @@ class DefiCheck3(DetectionModule):
                         elif value_sload_count == 2:
                             flag_ERC721_mint_owner = True # BURN的SHA3没有正确查找前驱结点
                     elif len(value_start_node_ids) == 1\
-                        and check_roles(nodes[value_start_node_ids[0]].symbol_vars_expr[0],Role.PARAM):
+                        and check_roles(nodes[value_start_node_ids[0]].var_key(0),Role.PARAM):
                         if value_sload_count == 1: #ERC721 balance[to] +=1
                             flag_ERC721_mint_balance = True
                 elif slot_sload_count == 1:
                     if len(value_start_node_ids) == 2\
                         and (
-                            check_roles(nodes[value_start_node_ids[0]].symbol_vars_expr[0],Role.PARAM) \
-                            or check_roles(nodes[value_start_node_ids[0]].symbol_vars_expr[0],Role.SENDER) \
-                            or check_roles(nodes[value_start_node_ids[1]].symbol_vars_expr[0],Role.PARAM) \
-                            or check_roles(nodes[value_start_node_ids[1]].symbol_vars_expr[0],Role.SENDER)
+                            check_roles(nodes[value_start_node_ids[0]].var_key(0),Role.PARAM) \
+                            or check_roles(nodes[value_start_node_ids[0]].var_key(0),Role.SENDER) \
+                            or check_roles(nodes[value_start_node_ids[1]].var_key(0),Role.PARAM) \
+                            or check_roles(nodes[value_start_node_ids[1]].var_key(0),Role.SENDER)
                         ):
                         if value_sload_count == 2:
                             flag_ERC721_mint_balance = True
@@ -4187,14 +4852,14 @@ class DefiCheck3(DetectionModule):
             # print(f"value_start_node_ids: {value_start_node_ids}, value_sload_count: {value_sload_count}")
             # 检查
             if len(slot_start_node_ids) == 2 \
-                and (check_roles(nodes[slot_start_node_ids[0]].symbol_vars_expr[0],Role.PARAM) or check_roles(nodes[slot_start_node_ids[0]].symbol_vars_expr[0],Role.SENDER)) \
-                and (check_roles(nodes[slot_start_node_ids[1]].symbol_vars_expr[0],Role.PARAM) or check_roles(nodes[slot_start_node_ids[1]].symbol_vars_expr[0],Role.SENDER)):
+                and (check_roles(nodes[slot_start_node_ids[0]].var_key(0),Role.PARAM) or check_roles(nodes[slot_start_node_ids[0]].var_key(0),Role.SENDER)) \
+                and (check_roles(nodes[slot_start_node_ids[1]].var_key(0),Role.PARAM) or check_roles(nodes[slot_start_node_ids[1]].var_key(0),Role.SENDER)):
                 # slot满足条件：二维映射，有两个key来自参数
                 # 检查value
                 if len(value_start_node_ids) == 3 \
-                    and (check_roles(nodes[value_start_node_ids[0]].symbol_vars_expr[0],Role.PARAM) or check_roles(nodes[value_start_node_ids[0]].symbol_vars_expr[0],Role.SENDER)) \
-                    and (check_roles(nodes[value_start_node_ids[1]].symbol_vars_expr[0],Role.PARAM) or check_roles(nodes[value_start_node_ids[1]].symbol_vars_expr[0],Role.SENDER)) \
-                    and (check_roles(nodes[value_start_node_ids[2]].symbol_vars_expr[0],Role.PARAM) or check_roles(nodes[value_start_node_ids[2]].symbol_vars_expr[0],Role.SENDER)):
+                    and (check_roles(nodes[value_start_node_ids[0]].var_key(0),Role.PARAM) or check_roles(nodes[value_start_node_ids[0]].var_key(0),Role.SENDER)) \
+                    and (check_roles(nodes[value_start_node_ids[1]].var_key(0),Role.PARAM) or check_roles(nodes[value_start_node_ids[1]].var_key(0),Role.SENDER)) \
+                    and (check_roles(nodes[value_start_node_ids[2]].var_key(0),Role.PARAM) or check_roles(nodes[value_start_node_ids[2]].var_key(0),Role.SENDER)):
                     # value满足条件：三个key来自参数
                     if '115792089237316195423570985008687907853269984665640564039457584007913129639935' in value_expr:
                         # 返回函数类型：ERC1155的burn函数
@@ -4219,7 +4884,7 @@ class DefiCheck3(DetectionModule):
                 if slot_sload_count >= 1: #且是嵌套映射
                     # 检查value
                     if len(value_start_node_ids) == 1 \
-                        and (check_roles(nodes[value_start_node_ids[0]].symbol_vars_expr[0],Role.PARAM) or check_roles(nodes[value_start_node_ids[0]].symbol_vars_expr[0],Role.SENDER)):
+                        and (check_roles(nodes[value_start_node_ids[0]].var_key(0),Role.PARAM) or check_roles(nodes[value_start_node_ids[0]].var_key(0),Role.SENDER)):
                         if value_sload_count >= 2:
                             if value_sload_count > 2:
                                 if value_sload_count >= 3 \
@@ -4244,13 +4909,13 @@ class DefiCheck3(DetectionModule):
                                 flag_ERC721_mint_balance = True
                                 balance_state = state
                     elif len(value_start_node_ids) == 1\
-                        and check_roles(nodes[value_start_node_ids[0]].symbol_vars_expr[0],Role.PARAM):
+                        and check_roles(nodes[value_start_node_ids[0]].var_key(0),Role.PARAM):
                         if value_sload_count == 1: #ERC721 balance[to] +=1
                             flag_ERC721_mint_balance = True
                             balance_state = state
                 else: # slot_sload_count == 0
                     if len(value_start_node_ids) == 1 \
-                        and (check_roles(nodes[value_start_node_ids[0]].symbol_vars_expr[0],Role.PARAM) or check_roles(nodes[value_start_node_ids[0]].symbol_vars_expr[0],Role.SENDER)):
+                        and (check_roles(nodes[value_start_node_ids[0]].var_key(0),Role.PARAM) or check_roles(nodes[value_start_node_ids[0]].var_key(0),Role.SENDER)):
                         if value_sload_count == 1:
                             # value_expr以逗号分割，最后一位是否位0
                             if ',' in value_expr\
@@ -4275,14 +4940,14 @@ class DefiCheck3(DetectionModule):
                             
                     elif len(value_start_node_ids) == 2 \
                         and (
-                            (check_roles(nodes[value_start_node_ids[1]].symbol_vars_expr[0],Role.PARAM) or check_roles(nodes[value_start_node_ids[1]].symbol_vars_expr[0],Role.SENDER))
-                            or ((check_roles(nodes[value_start_node_ids[0]].symbol_vars_expr[0],Role.PARAM) or check_roles(nodes[value_start_node_ids[0]].symbol_vars_expr[0],Role.SENDER)))
+                            (check_roles(nodes[value_start_node_ids[1]].var_key(0),Role.PARAM) or check_roles(nodes[value_start_node_ids[1]].var_key(0),Role.SENDER))
+                            or ((check_roles(nodes[value_start_node_ids[0]].var_key(0),Role.PARAM) or check_roles(nodes[value_start_node_ids[0]].var_key(0),Role.SENDER)))
                         ):
                         #and (check_roles(nodes[value_start_node_ids[0]].symbol_vars_expr[0],Role.PARAM) or check_roles(nodes[value_start_node_ids[0]].symbol_vars_expr[0],Role.SENDER)) \
                         if value_sload_count == 1:
                             flag_ERC721_mint_owner = True
                             owner_state = state
-                            if (check_roles(nodes[value_start_node_ids[0]].symbol_vars_expr[0],Role.PARAM) or check_roles(nodes[value_start_node_ids[0]].symbol_vars_expr[0],Role.SENDER))\
+                            if (check_roles(nodes[value_start_node_ids[0]].var_key(0),Role.PARAM) or check_roles(nodes[value_start_node_ids[0]].var_key(0),Role.SENDER))\
                                 and check_opcode(nodes,nodes[node_id].predecessors_list[1],"ADD"): # TODO：可能导致721误报为1155
                                 flag_ERC1155_mint_balance = True
                                 balance_state = state
@@ -4293,10 +4958,10 @@ class DefiCheck3(DetectionModule):
                 if slot_sload_count == 0:
                     if len(value_start_node_ids) == 2 \
                         and (
-                            check_roles(nodes[value_start_node_ids[0]].symbol_vars_expr[0],Role.PARAM) \
-                            or check_roles(nodes[value_start_node_ids[0]].symbol_vars_expr[0],Role.SENDER) \
-                            or check_roles(nodes[value_start_node_ids[1]].symbol_vars_expr[0],Role.PARAM) \
-                            or check_roles(nodes[value_start_node_ids[1]].symbol_vars_expr[0],Role.SENDER)
+                            check_roles(nodes[value_start_node_ids[0]].var_key(0),Role.PARAM) \
+                            or check_roles(nodes[value_start_node_ids[0]].var_key(0),Role.SENDER) \
+                            or check_roles(nodes[value_start_node_ids[1]].var_key(0),Role.PARAM) \
+                            or check_roles(nodes[value_start_node_ids[1]].var_key(0),Role.SENDER)
                         ):
                         if value_sload_count == 1:
                             # print("value_expr.split(',')[-1].strip()",value_expr.split(',')[-1].strip())
@@ -4310,10 +4975,10 @@ class DefiCheck3(DetectionModule):
                 elif slot_sload_count == 1:
                     if len(value_start_node_ids) == 2\
                         and (
-                            check_roles(nodes[value_start_node_ids[0]].symbol_vars_expr[0],Role.PARAM) \
-                            or check_roles(nodes[value_start_node_ids[0]].symbol_vars_expr[0],Role.SENDER) \
-                            or check_roles(nodes[value_start_node_ids[1]].symbol_vars_expr[0],Role.PARAM) \
-                            or check_roles(nodes[value_start_node_ids[1]].symbol_vars_expr[0],Role.SENDER)
+                            check_roles(nodes[value_start_node_ids[0]].var_key(0),Role.PARAM) \
+                            or check_roles(nodes[value_start_node_ids[0]].var_key(0),Role.SENDER) \
+                            or check_roles(nodes[value_start_node_ids[1]].var_key(0),Role.PARAM) \
+                            or check_roles(nodes[value_start_node_ids[1]].var_key(0),Role.SENDER)
                         ):
                         if value_sload_count == 2:
                             flag_ERC721_mint_balance = True
@@ -4322,9 +4987,9 @@ class DefiCheck3(DetectionModule):
         if False and nftmbType in [FunctionType.ERC721_BURN,FunctionType.ERC721_MINT]\
             and (flag_ERC721_mint_owner or flag_ERC721_burn_owner):
             # 需要检查owner正确性
-            constraints = copy(owner_state.world_state.constraints)
+            constraints = copy(owner_state.constraints)
             constraints += [
-                owner_state.environment.sender == ACTORS.attacker,
+                owner_state.sender == ACTORS.attacker,
             ]
             try:
                 solver.get_model(constraints)
@@ -4339,9 +5004,9 @@ class DefiCheck3(DetectionModule):
         #  TODO:检查逻辑存在问题，--unconstrained-storage参数导致是符号变量化的storage，无法检查
         if False and (flag_ERC1155_burn_balance or flag_ERC1155_mint_balance or flag_ERC721_burn_balance or flag_ERC721_mint_balance):
             # 需要检查余额state
-            constraints = copy(balance_state.world_state.constraints)
+            constraints = copy(balance_state.constraints)
             constraints += [
-                balance_state.environment.sender == ACTORS.attacker,
+                balance_state.sender == ACTORS.attacker,
             ]
             try:
                 solver.get_model(constraints)
@@ -4405,6 +5070,7 @@ class DefiCheck3(DetectionModule):
                 # environment = state.environment
                 if nodes[node].opcode == "SSTORE":
                     slot_expr = current_node.symbol_vars_expr[0]
+                    slot_key = current_node.var_key(0)
                     value_expr = current_node.symbol_vars_expr[1]
                     if slot_expr == "":
                         print("ERROR:slot_expr is empty")
@@ -4428,17 +5094,17 @@ class DefiCheck3(DetectionModule):
                     # 判断slot并判断对应核心语句
                     if len(start_node_ids) == 1:
                         # balances[msg.sender] -= _amount;
-                        if check_roles(start_nodes[0].symbol_vars_expr[0],Role.SENDER):
+                        if check_roles(start_nodes[0].var_key(0),Role.SENDER):
                             # 添加indentity
-                            indentity = identity_extract(slot_expr)
+                            indentity = identity_extract(slot_key)
                             if indentity not in self.identity_dict or self.identity_dict[indentity] == IdentityType.UNKNOWN:
                                 self.identity_dict[indentity] = IdentityType.ERC20_BALANCE
                             # print("core:",indentity,"slot",slot_expr,start_node_ids,"value",value_expr,value_start_node_ids)
                             
                             # 检查value：balances[msg.sender] - _amount
                             if len(value_start_node_ids) == 2 \
-                                and check_roles(value_start_nodes[0].symbol_vars_expr[0],Role.SENDER) \
-                                and check_roles(value_start_nodes[1].symbol_vars_expr[0],Role.PARAM2) \
+                                and check_roles(value_start_nodes[0].var_key(0),Role.SENDER) \
+                                and check_roles(value_start_nodes[1].var_key(0),Role.PARAM2) \
                                     and check_opcode(nodes,current_node.predecessors_list[1],"SUB"):
                                 pass
                             else: #value错误
@@ -4446,18 +5112,18 @@ class DefiCheck3(DetectionModule):
                                 issue = ret_issues(state,description_tail=description)
                                 issues.append(issue)
                         # balances[_to] += _amount;
-                        elif check_roles(start_nodes[0].symbol_vars_expr[0],Role.PARAM1):  
+                        elif check_roles(start_nodes[0].var_key(0),Role.PARAM1):  
                             # 添加indentity
-                            indentity = identity_extract(slot_expr)
+                            indentity = identity_extract(slot_key)
                             if indentity not in self.identity_dict or self.identity_dict[indentity] == IdentityType.UNKNOWN:
                                 self.identity_dict[indentity] = IdentityType.ERC20_BALANCE
                             # 检查value：balances[_to] + _amount
                             if len(value_start_node_ids) == 2 \
-                                and ((check_roles(value_start_nodes[0].symbol_vars_expr[0],Role.PARAM2) \
-                                    and check_roles(value_start_nodes[1].symbol_vars_expr[0],Role.PARAM1) \
+                                and ((check_roles(value_start_nodes[0].var_key(0),Role.PARAM2) \
+                                    and check_roles(value_start_nodes[1].var_key(0),Role.PARAM1) \
                                     and check_opcode(nodes,current_node.predecessors_list[1],"ADD")) \
-                                or (check_roles(value_start_nodes[0].symbol_vars_expr[0],Role.PARAM1) \
-                                    and check_roles(value_start_nodes[1].symbol_vars_expr[0],Role.PARAM2)) \
+                                or (check_roles(value_start_nodes[0].var_key(0),Role.PARAM1) \
+                                    and check_roles(value_start_nodes[1].var_key(0),Role.PARAM2)) \
                                     and check_opcode(nodes,current_node.predecessors_list[1],"ADD")):
                                 pass
                             
@@ -4495,6 +5161,7 @@ class DefiCheck3(DetectionModule):
                 state = current_node.state
                 if nodes[node].opcode == "SSTORE":
                     slot_expr = current_node.symbol_vars_expr[0]
+                    slot_key = current_node.var_key(0)
                     value_expr = current_node.symbol_vars_expr[1]
                     if slot_expr == "":
                         print("ERROR:slot_expr is empty")
@@ -4521,19 +5188,19 @@ class DefiCheck3(DetectionModule):
                         print("node",node,"slot",slot_expr,start_node_ids,"value",value_expr,value_start_node_ids)
                     # 判断slot并判断对应核心语句
                     if len(start_node_ids) == 2:# allowed[_from][msg.sender] -= _amount; 
-                        if check_roles(start_nodes[0].symbol_vars_expr[0],Role.SENDER)\
-                            and check_roles(start_nodes[1].symbol_vars_expr[0],Role.PARAM1):
+                        if check_roles(start_nodes[0].var_key(0),Role.SENDER)\
+                            and check_roles(start_nodes[1].var_key(0),Role.PARAM1):
                             # 添加indentity
-                            indentity = identity_extract(slot_expr)
+                            indentity = identity_extract(slot_key)
                             if indentity not in self.identity_dict or self.identity_dict[indentity] == IdentityType.UNKNOWN:
                                 self.identity_dict[indentity] = IdentityType.ERC20_ALLOWANCE
                             # print("core:",indentity,"slot",slot_expr,start_node_ids,"value",value_expr,value_start_node_ids)
                             
                             # 检查value：allowed[_from][msg.sender] - _amount  
                             if len(value_start_node_ids) == 3\
-                                and check_roles(value_start_nodes[0].symbol_vars_expr[0],Role.SENDER) \
-                                and check_roles(value_start_nodes[1].symbol_vars_expr[0],Role.PARAM1) \
-                                and check_roles(value_start_nodes[2].symbol_vars_expr[0],Role.PARAM3) \
+                                and check_roles(value_start_nodes[0].var_key(0),Role.SENDER) \
+                                and check_roles(value_start_nodes[1].var_key(0),Role.PARAM1) \
+                                and check_roles(value_start_nodes[2].var_key(0),Role.PARAM3) \
                                 and (
                                     minus_one in value_expr
                                     or check_opcode(nodes,current_node.predecessors_list[1],"SUB")
@@ -4555,15 +5222,15 @@ class DefiCheck3(DetectionModule):
                             or check_opcode(nodes,current_node.predecessors_list[1],"SUB") 
                         ):# balances[_from] -= _amount;
                             # 检查slot
-                            if check_roles(start_nodes[0].symbol_vars_expr[0],Role.PARAM1):
+                            if check_roles(start_nodes[0].var_key(0),Role.PARAM1):
                                 # 添加indentity
-                                indentity = identity_extract(slot_expr)
+                                indentity = identity_extract(slot_key)
                                 if indentity not in self.identity_dict or self.identity_dict[indentity] == IdentityType.UNKNOWN:
                                     self.identity_dict[indentity] = IdentityType.ERC20_BALANCE
                                 # 检查value：balances[_from] - _amount
                                 if len(value_start_node_ids) == 2 \
-                                    and check_roles(value_start_nodes[0].symbol_vars_expr[0],Role.PARAM1) \
-                                    and check_roles(value_start_nodes[1].symbol_vars_expr[0],Role.PARAM3): # \
+                                    and check_roles(value_start_nodes[0].var_key(0),Role.PARAM1) \
+                                    and check_roles(value_start_nodes[1].var_key(0),Role.PARAM3): # \
                                     # and (
                                     #     minus_one in value_expr
                                     #     or check_opcode(nodes,current_node.predecessors_list[1],"SUB")
@@ -4578,18 +5245,18 @@ class DefiCheck3(DetectionModule):
                                 issue = ret_issues(state,description_tail=description)
                                 issues.append(issue)    
                         else:# balances[_to] += _amount
-                            if check_roles(start_nodes[0].symbol_vars_expr[0],Role.PARAM2):
+                            if check_roles(start_nodes[0].var_key(0),Role.PARAM2):
                                 # 添加indentity
-                                indentity = identity_extract(slot_expr)
+                                indentity = identity_extract(slot_key)
                                 if indentity not in self.identity_dict or self.identity_dict[indentity] == IdentityType.UNKNOWN:
                                     self.identity_dict[indentity] = IdentityType.ERC20_BALANCE
                                 # 检查value：balances[_to] + _amount
                                 if len(value_start_node_ids) == 2 \
-                                    and ((check_roles(value_start_nodes[0].symbol_vars_expr[0],Role.PARAM2) \
-                                        and check_roles(value_start_nodes[1].symbol_vars_expr[0],Role.PARAM3) \
+                                    and ((check_roles(value_start_nodes[0].var_key(0),Role.PARAM2) \
+                                        and check_roles(value_start_nodes[1].var_key(0),Role.PARAM3) \
                                         and check_opcode(nodes,current_node.predecessors_list[1],"ADD"))\
-                                    or (check_roles(value_start_nodes[0].symbol_vars_expr[0],Role.PARAM3) \
-                                        and check_roles(value_start_nodes[1].symbol_vars_expr[0],Role.PARAM2) \
+                                    or (check_roles(value_start_nodes[0].var_key(0),Role.PARAM3) \
+                                        and check_roles(value_start_nodes[1].var_key(0),Role.PARAM2) \
                                         and check_opcode(nodes,current_node.predecessors_list[1],"ADD"))):
                                     pass
                                 else:
@@ -4632,6 +5299,7 @@ class DefiCheck3(DetectionModule):
                 state = current_node.state
                 if nodes[node].opcode == "SSTORE":
                     slot_expr = current_node.symbol_vars_expr[0]
+                    slot_key = current_node.var_key(0)
                     value_expr = current_node.symbol_vars_expr[1]
                     if slot_expr == "":
                         print("ERROR:slot_expr is empty")
@@ -4663,17 +5331,17 @@ class DefiCheck3(DetectionModule):
                     # 判断slot并判断对应核心语句
                     if len(start_node_ids) == 1:
                         #  _tokenOwners[tokenId] = to;
-                        if check_roles(start_nodes[0].symbol_vars_expr[0],Role.PARAM3):
+                        if check_roles(start_nodes[0].var_key(0),Role.PARAM3):
                             # 添加indentity
-                            indentity = identity_extract(slot_expr)
+                            indentity = identity_extract(slot_key)
                             if indentity not in self.identity_dict or self.identity_dict[indentity] == IdentityType.UNKNOWN:
                                 self.identity_dict[indentity] = IdentityType.ERC721_OWNER
                             # 检查value：_tokenOwners[tokenId] = to;
                             if (len(value_start_nodes) == 2 \
-                                    and check_roles(value_start_nodes[0].symbol_vars_expr[0],Role.PARAM2) \
-                                    and check_roles(value_start_nodes[1].symbol_vars_expr[0],Role.PARAM3))\
+                                    and check_roles(value_start_nodes[0].var_key(0),Role.PARAM2) \
+                                    and check_roles(value_start_nodes[1].var_key(0),Role.PARAM3))\
                                 or (len(value_start_nodes) == 1 \
-                                    and check_roles(value_start_nodes[0].symbol_vars_expr[0],Role.PARAM2)):
+                                    and check_roles(value_start_nodes[0].var_key(0),Role.PARAM2)):
                                 pass
                             # 或者是_approve(address(0), tokenId);，即value_expr以Extract(开头，以),0结束
                             elif (
@@ -4689,33 +5357,33 @@ class DefiCheck3(DetectionModule):
                                 issue = ret_issues(state,description_tail=description)
                                 issues.append(issue)
                         #  _balances[from] -= 1; #from来自于参数1或_ownerOf(tokenId);
-                        elif (check_roles(start_nodes[0].symbol_vars_expr[0],Role.PARAM1) \
-                            or check_roles(start_nodes[0].symbol_vars_expr[0],Role.PARAM2)) \
+                        elif (check_roles(start_nodes[0].var_key(0),Role.PARAM1) \
+                            or check_roles(start_nodes[0].var_key(0),Role.PARAM2)) \
                             and (
                                 minus_one in value_expr
                                 or check_opcode(nodes,current_node.predecessors_list[1],"SUB")
                             ):
                             # 添加indentity
-                            indentity = identity_extract(slot_expr)
+                            indentity = identity_extract(slot_key)
                             if indentity not in self.identity_dict or self.identity_dict[indentity] == IdentityType.UNKNOWN:
                                 self.identity_dict[indentity] = IdentityType.ERC721_BALANCE
                             # 检查value：_balances[from] - 1;
                             if len(value_start_node_ids) == 1\
-                                and check_roles(value_start_nodes[0].symbol_vars_expr[0],Role.PARAM1):
+                                and check_roles(value_start_nodes[0].var_key(0),Role.PARAM1):
                                 pass
                             else: #value错误
                                 description = "ERROR value in mapping:value is not _balances[from] - 1"
                                 issue = ret_issues(state,description_tail=description)
                                 issues.append(issue)
                         #  _balances[to] += 1;
-                        elif check_roles(start_nodes[0].symbol_vars_expr[0],Role.PARAM2):
+                        elif check_roles(start_nodes[0].var_key(0),Role.PARAM2):
                             # 添加indentity
-                            indentity = identity_extract(slot_expr)
+                            indentity = identity_extract(slot_key)
                             if indentity not in self.identity_dict or self.identity_dict[indentity] == IdentityType.UNKNOWN:
                                 self.identity_dict[indentity] = IdentityType.ERC721_BALANCE
                             # 检查value：_balances[to] + 1;
                             if len(value_start_node_ids) == 1 \
-                                and check_roles(value_start_nodes[0].symbol_vars_expr[0],Role.PARAM2)\
+                                and check_roles(value_start_nodes[0].var_key(0),Role.PARAM2)\
                                 and check_opcode(nodes,current_node.predecessors_list[1],"ADD"):
                                 pass
                             else:
@@ -4777,12 +5445,12 @@ class DefiCheck3(DetectionModule):
                     continue
                 current_node = nodes[node]
                 state = current_node.state
-                environment = state.environment                
                 # if nodes[node].function_name != environment.active_function_name:
                 #     continue
                 if nodes[node].opcode == "SSTORE":
                     # print("current_node.uid: ",current_node.uid)
                     slot_expr = current_node.symbol_vars_expr[0]
+                    slot_key = current_node.var_key(0)
                     value_expr = current_node.symbol_vars_expr[1]
                     
                     # identity = identity_extract(slot_expr)
@@ -4806,20 +5474,20 @@ class DefiCheck3(DetectionModule):
                         #检查hardcode
                         #key1 owner->msg.sender (key1的1是从expr右往左的序号)
                         if approveType == FunctionType.ERC20_APPROVE:
-                            flag_1 = check_roles(slot_start_nodes[1].symbol_vars_expr[0],Role.SENDER)
+                            flag_1 = check_roles(slot_start_nodes[1].var_key(0),Role.SENDER)
                         else:#permit
-                            flag_1 = check_roles(slot_start_nodes[1].symbol_vars_expr[0],Role.PARAM1)
+                            flag_1 = check_roles(slot_start_nodes[1].var_key(0),Role.PARAM1)
                         # print("OK ERC20")
                         if approveType == FunctionType.ERC20_APPROVE:
                             #key2 spender 来自参数1 address _spender
-                            flag_2 = check_roles(slot_start_nodes[0].symbol_vars_expr[0],Role.PARAM1)
+                            flag_2 = check_roles(slot_start_nodes[0].var_key(0),Role.PARAM1)
                         else:#permit
-                            flag_2 = check_roles(slot_start_nodes[0].symbol_vars_expr[0],Role.PARAM2)
+                            flag_2 = check_roles(slot_start_nodes[0].var_key(0),Role.PARAM2)
                         # 判断slot
                         if flag_1 and flag_2:
                             # print("OK ERC20 slot")
                             ## 添加到identity_dict中  
-                            indentity = identity_extract(slot_expr)    
+                            indentity = identity_extract(slot_key)    
                             if indentity not in self.identity_dict or self.identity_dict[indentity] == IdentityType.UNKNOWN:
                                 self.identity_dict[indentity] = IdentityType.ERC20_ALLOWANCE
                         else:
@@ -4844,9 +5512,9 @@ class DefiCheck3(DetectionModule):
                             issues.append(issue)
                         # 判断value
                         # value_start_node = nodes[value_start_node_ids[0]]
-                        if approveType == FunctionType.ERC20_APPROVE and len(value_start_node_ids) == 1 and check_roles(nodes[value_start_node_ids[0]].symbol_vars_expr[0],Role.PARAM2):
+                        if approveType == FunctionType.ERC20_APPROVE and len(value_start_node_ids) == 1 and check_roles(nodes[value_start_node_ids[0]].var_key(0),Role.PARAM2):
                             pass
-                        elif approveType == FunctionType.ERC20_PERMIT and len(value_start_node_ids) == 1 and check_roles(nodes[value_start_node_ids[0]].symbol_vars_expr[0],Role.PARAM3):
+                        elif approveType == FunctionType.ERC20_PERMIT and len(value_start_node_ids) == 1 and check_roles(nodes[value_start_node_ids[0]].var_key(0),Role.PARAM3):
                             pass
                         elif len(value_start_node_ids) == 1 and value_expr == "0":
                             pass #示例：0x2f09be58c1f5792171d9c5165afe210c011b88ac：ERC20函数，条件不符合设置allowance=0，允许
@@ -4931,18 +5599,18 @@ class DefiCheck3(DetectionModule):
                     continue
                 current_node = nodes[node]
                 state = current_node.state
-                environment = state.environment
                 # if nodes[node].function_name != environment.active_function_name:
                 #     continue
                 if nodes[node].opcode == "SSTORE":
                     if flag_detailed:
                         print("current_node.uid: ",current_node.uid)
                     slot_expr = current_node.symbol_vars_expr[0]
+                    slot_key = current_node.var_key(0)
                     value_expr = current_node.symbol_vars_expr[1]
                     if slot_expr == "":
                         print("slot_expr is empty")
                         continue
-                    identity = identity_extract(slot_expr)
+                    identity = identity_extract(slot_key)
                     hardcode_issues = hard_code_check(nodes,current_node)
                     if hardcode_issues != [] : #该语句存在硬编码
                         issues.extend(hardcode_issues)
@@ -4961,10 +5629,10 @@ class DefiCheck3(DetectionModule):
                     # if len(value_start_node_ids) == 2 and '+' not in value_expr and '-' not in value_expr: #只有赋值，没有其他操作(ERC721的value符号变量会包含tokenId的切片，原因未知)
 
                     # 检测slot:判断slot_expr是否来自参数2 uint256 tokenId
-                    if slot_start_node.opcode == "CALLDATALOAD" and check_roles(slot_start_node.symbol_vars_expr[0],Role.PARAM2): #slot正确
+                    if slot_start_node.opcode == "CALLDATALOAD" and check_roles(slot_start_node.var_key(0),Role.PARAM2): #slot正确
                         # print("OK ERC721 slot")
                         # slot正确，则添加对应indentity
-                        indentity = identity_extract(slot_expr)
+                        indentity = identity_extract(slot_key)
                         if identity not in self.identity_dict:
                             self.identity_dict[identity] = IdentityType.ERC721_TOKENAPPROVAL
                     else:
@@ -4976,7 +5644,7 @@ class DefiCheck3(DetectionModule):
                         return issues
 
                     # 检查value:判断value_expr是否为{}_calldata[4:35],{}为数字
-                    if len(value_start_node_ids) >0 and check_roles(nodes[value_start_node_ids[0]].symbol_vars_expr[0],Role.PARAM1):
+                    if len(value_start_node_ids) >0 and check_roles(nodes[value_start_node_ids[0]].var_key(0),Role.PARAM1):
                         pass
                     # match = re.match(r"\d+_calldata\[4:35\]", value_start_node.symbol_vars_expr[0])
                     # if check_roles(value_start_node.symbol_vars_expr[0],Role.PARAM1): #value正确
@@ -5064,11 +5732,12 @@ class DefiCheck3(DetectionModule):
                 if nodes[node].opcode == "SSTORE":
                     # print("current_node.uid: ",current_node.uid)
                     slot_expr = current_node.symbol_vars_expr[0]
+                    slot_key = current_node.var_key(0)
                     value_expr = current_node.symbol_vars_expr[1]
                     if slot_expr == "":
                         print("ERROR:slot_expr is empty")
                         continue
-                    identity = identity_extract(slot_expr)
+                    identity = identity_extract(slot_key)
                     hardcode_issues = hard_code_check(nodes,current_node)
                     if hardcode_issues != [] : #该语句存在硬编码
                         issues.extend(hardcode_issues)
@@ -5093,12 +5762,12 @@ class DefiCheck3(DetectionModule):
                     if "If" in value_expr:
                         # 检查hard_code
                         # key1 msg.sender
-                        flag_1 = check_roles(slot_start_nodes[1].symbol_vars_expr[0],Role.SENDER)
+                        flag_1 = check_roles(slot_start_nodes[1].var_key(0),Role.SENDER)
                         # key2 operator -> parameter 1
-                        flag_2 = check_roles(slot_start_nodes[0].symbol_vars_expr[0],Role.PARAM1)
+                        flag_2 = check_roles(slot_start_nodes[0].var_key(0),Role.PARAM1)
                         if flag_1 and flag_2:
                             # print("OK ERC721 setApproveForAll slot")
-                            indentity = identity_extract(slot_expr)
+                            indentity = identity_extract(slot_key)
                             if indentity not in self.identity_dict or self.identity_dict[indentity] == IdentityType.UNKNOWN:
                                 self.identity_dict[indentity] = IdentityType.ERC721_OPERATORAPPROVAL  
                         else:
@@ -5112,7 +5781,7 @@ class DefiCheck3(DetectionModule):
                             issue = ret_issues(state,description_tail=description)
                             issues.append(issue)  
                         # value
-                        if check_roles(value_start_node.symbol_vars_expr[0],Role.PARAM2):
+                        if check_roles(value_start_node.var_key(0),Role.PARAM2):
                             # and "If" in value_expr:
                             pass
                         else:
@@ -5152,6 +5821,18 @@ class DefiCheck3(DetectionModule):
 detector = DefiCheck3()
 
 
+_post_analysis_task = None # fork前设置的(detector, nodes, flag_detailed)，子进程通过写时复制继承
+
+
+def _check_func_type_worker(Func_name):
+    """Runs check_func_type in a pool process and returns its result with the captured output."""
+    detector, nodes, detailed = _post_analysis_task
+    output = io.StringIO()
+    with redirect_stdout(output):
+        func_type,identity_dict = detector.check_func_type(Func_name,nodes,detailed)
+    return func_type,identity_dict,output.getvalue()
+
+
 
 
 # ---------- Custom Error Listener ----------
@@ -1,7 +1,6 @@
 from mythril.analysis.report import Issue
 from mythril.analysis.issue_annotation import IssueAnnotation
-from mythril.analysis.solver import get_transaction_sequence
-from mythril.exceptions import UnsatError
+from mythril.analysis.solver import get_transaction_sequences
 from mythril.laser.ethereum.state.annotation import StateAnnotation
 from mythril.laser.ethereum.state.global_state import GlobalState
 from mythril.laser.smt import And
@@ -89,12 +88,17 @@ def check_potential_issues(state: GlobalState) -> None:
     """
     annotation = get_potential_issues_annotation(state)
     unsat_potential_issues = []
-    for potential_issue in annotation.potential_issues:
-        try:
-            transaction_sequence = get_transaction_sequence(
-                state, state.world_state.constraints + potential_issue.constraints
-            )
-        except UnsatError:
+    transaction_sequences = get_transaction_sequences(
+        state,
+        [
+            state.world_state.constraints + potential_issue.constraints
+            for potential_issue in annotation.potential_issues
+        ],
+    )
+    for potential_issue, transaction_sequence in zip(
+        annotation.potential_issues, transaction_sequences
+    ):
+        if transaction_sequence is None:
             unsat_potential_issues.append(potential_issue)
             continue
 
@@ -101,13 +101,11 @@ def retrieve_callback_issues(white_list: Optional[List[str]] = None) -> List[Iss
     
     if flag_time:
         start_time = time.time()
-    for Func_name in detector.function_dict:
-        func_type,identity_dict = detector.check_func_type(Func_name,detector.nodes)
+    for Func_name,func_type,identity_dict in detector.iter_func_types(list(detector.function_dict),detector.nodes):
         detector.function_dict[Func_name] = func_type
         print("\nFunc_name: ",Func_name,"func_type: ",func_type)
-        for node in detector.nodes:
-            if detector.nodes[node].function_name == Func_name:
-                print("node:",detector.nodes[node].get_dict())
+        for node in detector.nodes.function_uids(Func_name):
+            print("node:",detector.nodes[node].get_dict())
     
     for node_uid in range(len(detector.nodes)-1, -1, -1):
         if detector.nodes[node_uid].node_type != NodeType.CONTROL_FLOW:
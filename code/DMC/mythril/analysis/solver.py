@@ -1,6 +1,6 @@
 """This module contains analysis module helpers to solve path constraints."""
 
-from typing import Dict, List, Tuple, Union, Any
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 
 import z3
 import logging
@@ -19,7 +19,7 @@ from mythril.laser.ethereum.transaction.transaction_models import (
     ContractCreationTransaction,
 )
 from mythril.laser.smt import UGE, symbol_factory
-from mythril.support.model import get_model
+from mythril.support.model import get_model, get_models
 
 log = logging.getLogger(__name__)
 z3.set_option(
@@ -61,17 +61,66 @@ def get_transaction_sequence(
     :param global_state: GlobalState to generate transaction sequence for
     :param constraints: list of constraints used to generate transaction sequence
     """
-    transaction_sequence = global_state.world_state.transaction_sequence
-    concrete_transactions = []
-    tx_constraints, minimize = _set_minimisation_constraints(
-        transaction_sequence, constraints.copy(), [], 5000, global_state.world_state
-    )
+    tx_constraints, minimize = _transaction_query(global_state, constraints)
 
     try:
         model = get_model(tx_constraints, minimize=minimize)
     except UnsatError:
         raise UnsatError
 
+    return _concrete_transaction_sequence(global_state, model)
+
+
+def get_transaction_sequences(
+    global_state: GlobalState, constraints_list: List[Constraints]
+) -> Iterator[Optional[Dict[str, Any]]]:
+    """Generate concrete transaction sequences for several sets of constraints.
+    The models of all sets are searched together, see get_transaction_sequence
+
+    :param global_state: GlobalState to generate transaction sequences for
+    :param constraints_list: The constraints of each transaction sequence
+    :return: The transaction sequence of each set of constraints, None if the
+    solver found none
+    """
+    queries = [
+        _transaction_query(global_state, constraints)
+        for constraints in constraints_list
+    ]
+    for outcome in get_models(queries):
+        if isinstance(outcome, UnsatError):
+            yield None
+        else:
+            yield _concrete_transaction_sequence(global_state, outcome)
+
+
+def _transaction_query(
+    global_state: GlobalState, constraints: Constraints
+) -> Tuple[Constraints, tuple]:
+    """
+    :param global_state: GlobalState to generate the transaction sequence for
+    :param constraints: list of constraints used to generate the transaction sequence
+    :return: The constraints and minimisation conditions of the model search
+    """
+    return _set_minimisation_constraints(
+        global_state.world_state.transaction_sequence,
+        constraints.copy(),
+        [],
+        5000,
+        global_state.world_state,
+    )
+
+
+def _concrete_transaction_sequence(
+    global_state: GlobalState, model: z3.Model
+) -> Dict[str, Any]:
+    """
+    :param global_state: GlobalState to generate the transaction sequence for
+    :param model: The model of the transaction sequence constraints
+    :return: The concrete transaction sequence
+    """
+    transaction_sequence = global_state.world_state.transaction_sequence
+    concrete_transactions = []
+
     if isinstance(transaction_sequence[0], ContractCreationTransaction):
         initial_world_state = transaction_sequence[0].prev_world_state
     else:
@@ -176,16 +176,24 @@ class SymExecWrapper:
             analysis_modules = ModuleLoader().get_detection_modules(
                 EntryPoint.CALLBACK, modules
             )
-            self.laser.register_hooks(
-                hook_type="pre",
-                hook_dict=get_detection_module_hooks(analysis_modules, hook_type="pre"),
-            )
-            self.laser.register_hooks(
-                hook_type="post",
-                hook_dict=get_detection_module_hooks(
-                    analysis_modules, hook_type="post"
-                ),
-            )
+            for module in analysis_modules:
+                self.laser.register_hooks(
+                    hook_type="pre",
+                    hook_dict=get_detection_module_hooks([module], hook_type="pre"),
+                    function_filter=module.function_filter,
+                )
+                self.laser.register_hooks(
+                    hook_type="post",
+                    hook_dict=get_detection_module_hooks([module], hook_type="post"),
+                    function_filter=module.function_filter,
+                )
+                self.laser.register_worker_state(
+                    "module:" + module.name,
+                    module.export_worker_state,
+                    module.merge_worker_state,
+                    start=module.start_worker,
+                )
+                self.laser.register_steal_filter(module.stealable)
 
         if isinstance(contract, SolidityContract) and create_timeout != 0:
             self.laser.sym_exec(
@@ -31,6 +31,16 @@ class BaseClient(object):
 
         pass
 
+    @abstractmethod
+    def _batch_call(self, calls):
+        """Sends several calls in one request.
+
+        :param calls: List of (method, params) tuples
+        :return: The results in the order of the calls
+        """
+
+        pass
+
     def eth_coinbase(self):
         """TODO: documentation
 
@@ -70,6 +80,19 @@ class BaseClient(object):
         block = validate_block(block)
         return self._call("eth_getStorageAt", [address, hex(position), block])
 
+    def eth_getStorageAtBatch(self, address, positions, block=BLOCK_TAG_LATEST):
+        """Reads several storage slots of an account in one batch request.
+
+        https://www.jsonrpc.org/specification#batch
+        """
+        block = validate_block(block)
+        return self._batch_call(
+            [
+                ("eth_getStorageAt", [address, hex(position), block])
+                for position in positions
+            ]
+        )
+
     def eth_getCode(self, address, default_block=BLOCK_TAG_LATEST):
         """TODO: documentation
 
@@ -80,7 +103,7 @@ class BaseClient(object):
         if isinstance(default_block, str):
             if default_block not in BLOCK_TAGS:
                 raise ValueError
-        return self._call("eth_getCode", [address, default_block])
+        return self._call("eth_getCode", [address, validate_block(default_block)])
 
     def eth_getBlockByNumber(self, block=BLOCK_TAG_LATEST, tx_objects=True):
         """TODO: documentation
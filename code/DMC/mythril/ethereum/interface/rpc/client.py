@@ -53,6 +53,43 @@ class EthJsonRpc(BaseClient):
         """
         params = params or []
         data = {"jsonrpc": "2.0", "method": method, "params": params, "id": _id}
+        response = self._post(data)
+        try:
+            return response["result"]
+        except KeyError:
+            raise BadResponseError(response)
+
+    def _batch_call(self, calls):
+        """Sends the calls in a single JSON-RPC batch request.
+
+        :param calls: List of (method, params) tuples
+        :return: The results in the order of the calls
+        """
+        data = [
+            {"jsonrpc": "2.0", "method": method, "params": params or [], "id": _id}
+            for _id, (method, params) in enumerate(calls)
+        ]
+        response = self._post(data)
+        if not isinstance(response, list):
+            raise BadResponseError(response)
+        # The responses of a batch may come in any order
+        results = {}
+        for item in response:
+            try:
+                results[item["id"]] = item["result"]
+            except (KeyError, TypeError):
+                raise BadResponseError(item)
+        try:
+            return [results[_id] for _id in range(len(calls))]
+        except KeyError:
+            raise BadResponseError(response)
+
+    def _post(self, data):
+        """
+
+        :param data: The JSON-RPC request or batch
+        :return: The decoded response
+        """
         scheme = "http"
         if self.tls:
             scheme += "s"
@@ -78,10 +115,7 @@ class EthJsonRpc(BaseClient):
             log.debug("rpc response: %s" % response)
         except ValueError:
             raise BadJsonError(r.text)
-        try:
-            return response["result"]
-        except KeyError:
-            raise BadResponseError(response)
+        return response
 
     def close(self):
         """Close the RPC client's session."""
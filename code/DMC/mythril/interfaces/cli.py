@@ -14,6 +14,7 @@ import sys
 import coloredlogs
 import traceback
 from ast import literal_eval
+from typing import Dict, List
 
 import mythril.support.signatures as sigs
 from argparse import ArgumentParser, Namespace, RawTextHelpFormatter
@@ -29,6 +30,7 @@ from mythril.plugin.loader import MythrilPluginLoader
 from mythril.mythril import MythrilAnalyzer, MythrilDisassembler, MythrilConfig
 
 from mythril.analysis.module import ModuleLoader
+from mythril.analysis.module.modules.DefiCheck3 import exploration_categories
 from mythril.analysis.report import Report
 
 from mythril.__version__ import __version__ as VERSION
@@ -190,6 +192,11 @@ def get_rpc_parser() -> ArgumentParser:
         "--rpctls", type=bool, default=False, help="RPC connection over TLS"
     )
     parser.add_argument("--infura-id", help="set infura id for onchain analysis")
+    parser.add_argument(
+        "--onchain-cache",
+        help="Directory of the on-disk cache of on-chain code, balances and storage; repeated analyses of an address read it instead of the RPC",
+        metavar="DIR",
+    )
 
     return parser
 
@@ -516,8 +523,22 @@ def add_analysis_args(options):
     )
     options.add_argument(
         "--parallel-solving",
+        type=int,
+        nargs="?",
+        const=os.cpu_count() or 1,
+        default=0,
+        metavar="N",
+        help="Solve z3 queries on N solver threads (default N: number of CPUs)",
+    )
+    options.add_argument(
+        "--incremental-solving",
         action="store_true",
-        help="Enable solving z3 queries in parallel",
+        help="Reuse the solver across queries with push/pop on the shared constraint prefix",
+    )
+    options.add_argument(
+        "--result-cache",
+        help="Directory of the on-disk result cache; contracts whose bytecode and options were analysed before are not executed again",
+        metavar="DIR",
     )
     options.add_argument(
         "--solver-log",
@@ -556,6 +577,60 @@ def add_analysis_args(options):
     options.add_argument(
         "--disable-iprof", action="store_true", help="Disable the instruction profiler"
     )
+    options.add_argument(
+        "--disable-block-stepping",
+        action="store_true",
+        help="Execute every instruction through the work list instead of running hook-free straight-line code in one step",
+    )
+    categories = ", ".join(category.name for category in exploration_categories)
+    options.add_argument(
+        "--explore-deny",
+        action="append",
+        metavar="CATEGORY:NAME",
+        help="Leave the functions matching NAME unexplored in addition to the built-in list of CATEGORY ({}), "
+        "their paths end at the dispatcher. Can be repeated".format(categories),
+    )
+    options.add_argument(
+        "--explore-allow",
+        action="append",
+        metavar="CATEGORY:NAME",
+        help="Explore the functions matching NAME even if the deny list of CATEGORY matches them. Can be repeated",
+    )
+    options.add_argument(
+        "--function-timeout",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="Stop exploring a function once its states took this many seconds to execute, over all transactions",
+    )
+    options.add_argument(
+        "--function-max-states",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Stop exploring a function once it created this many states",
+    )
+    options.add_argument(
+        "--function-max-solver-calls",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Stop exploring a function once its states ran this many solver queries",
+    )
+    options.add_argument(
+        "--transaction-workers",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Explore the message calls in N forked processes that split the functions of the first message call",
+    )
+    options.add_argument(
+        "--state-workers",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Explore the states of each message call in N forked processes that steal states from each other",
+    )
     options.add_argument(
         "--disable-dependency-pruning",
         action="store_true",
@@ -621,6 +696,28 @@ def create_foundry_parser(foundry_parser: ArgumentParser):
     add_analysis_args(options)
 
 
+def parse_exploration_patterns(outform: str, entries: List[str]) -> Dict[str, List[str]]:
+    """
+    Parses the CATEGORY:NAME entries of --explore-allow and --explore-deny
+    :param outform: The output format for errors
+    :param entries: The entries
+    :return: The names per category
+    """
+    names = {category.name.lower(): category.name for category in exploration_categories}
+    patterns: Dict[str, List[str]] = {}
+    for entry in entries:
+        category, _, name = entry.partition(":")
+        if category.lower() not in names or not name:
+            exit_with_error(
+                outform,
+                "Invalid exploration filter {}, it should be CATEGORY:NAME with CATEGORY one of {}".format(
+                    entry, ", ".join(names.values())
+                ),
+            )
+        patterns.setdefault(names[category.lower()], []).append(name)
+    return patterns
+
+
 def validate_args(args: Namespace):
     """
     Validate cli args
@@ -648,6 +745,10 @@ def validate_args(args: Namespace):
     if args.command in DISASSEMBLE_LIST and len(args.solidity_files) > 1:
         exit_with_error("text", "Only a single arg is supported for using disassemble")
 
+    for option in ("explore_allow", "explore_deny"):
+        if getattr(args, option, None):
+            setattr(args, option, parse_exploration_patterns(args.outform, getattr(args, option)))
+
     if getattr(args, "transaction_sequences", None):
         if getattr(args, "disable_dependency_pruning", False) is False:
             log.warning(
@@ -964,12 +1065,14 @@ def parse_args_and_execute(parser: ArgumentParser, args: Namespace) -> None:
         solc_json = getattr(args, "solc_json", None)
         solv = getattr(args, "solv", None)
         solc_args = getattr(args, "solc_args", None)
+        onchain_cache = getattr(args, "onchain_cache", None)
         disassembler = MythrilDisassembler(
             eth=config.eth,
             solc_version=solv,
             solc_settings_json=solc_json,
             enable_online_lookup=query_signature,
             solc_args=solc_args,
+            onchain_cache=onchain_cache,
         )
 
         address = load_code(disassembler, args)
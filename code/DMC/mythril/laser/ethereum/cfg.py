@@ -55,6 +55,13 @@ class Node:
 
         self.uid = hash(self)
 
+    def __getstate__(self) -> Dict:
+        # A pickled node leaves its states behind, pickling them would pull in every
+        # state of the basic block and, through their world states, the state space
+        state = self.__dict__.copy()
+        state["states"] = []
+        return state
+
     def get_cfg_dict(self) -> Dict:
         """
 
@@ -0,0 +1,62 @@
+"""This module contains the dispatch table LASER uses to decode an instruction
+list once instead of on every executed instruction."""
+from typing import Callable, Dict, List
+
+from mythril.laser.ethereum.instruction_data import get_required_stack_elements
+from mythril.laser.ethereum.instructions import Instruction
+
+
+class DispatchEntry:
+    """The decoded form of an opcode: the Instruction evaluating it and the hooks
+    LASER runs around it. Entries are shared by all pcs with the same opcode."""
+
+    __slots__ = (
+        "op_code",
+        "instruction",
+        "pre_hooks",
+        "post_hooks",
+        "required_stack_elements",
+    )
+
+    def __init__(
+        self,
+        instruction: Instruction,
+        pre_hooks: List[Callable],
+        post_hooks: List[Callable],
+    ) -> None:
+        """
+
+        :param instruction: The Instruction evaluating the opcode
+        :param pre_hooks: The pre hooks of the opcode, the list is shared with LASER
+        :param post_hooks: The post hooks of the opcode, the list is shared with LASER
+        """
+        self.op_code = instruction.op_code
+        self.instruction = instruction
+        self.pre_hooks = pre_hooks
+        self.post_hooks = post_hooks
+        self.required_stack_elements = get_required_stack_elements(self.op_code)
+
+
+class DispatchTable:
+    """Maps every pc of an instruction list to its DispatchEntry."""
+
+    def __init__(
+        self, instruction_list: List[Dict], entry: Callable[[str], DispatchEntry]
+    ) -> None:
+        """
+
+        :param instruction_list: The instruction list of a Disassembly
+        :param entry: Returns the DispatchEntry of an opcode
+        """
+        self.instruction_list = instruction_list
+        self.entries = [entry(instruction["opcode"]) for instruction in instruction_list]
+
+    def __getitem__(self, pc: int) -> DispatchEntry:
+        """
+        :param pc: The index of the instruction
+        :return: The entry of the instruction, raises IndexError past the end of the code
+        """
+        return self.entries[pc]
+
+    def __len__(self) -> int:
+        return len(self.entries)
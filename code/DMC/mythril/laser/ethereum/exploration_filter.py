@@ -0,0 +1,107 @@
+"""This module contains the filter LASER uses to leave functions of the analysed
+contract unexplored."""
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from mythril.disassembler.disassembly import Disassembly
+
+# Functions that are always explored
+ALWAYS_EXPLORED = frozenset(["fallback", "constructor"])
+
+
+class FunctionCategory:
+    """A behaviour category of functions, e.g. the functions that are never an
+    airdrop. A function belongs to the category if a pattern matches its name,
+    either as a substring or as a prefix of the name."""
+
+    def __init__(
+        self, name: str, patterns: List[str], enabled: bool = True, match="substring"
+    ) -> None:
+        """
+
+        :param name: The name of the category, used on the command line
+        :param patterns: The built-in patterns of the category
+        :param enabled: Whether the built-in patterns are used
+        :param match: substring or prefix
+        """
+        if match not in ("substring", "prefix"):
+            raise ValueError("Invalid match %s. Must be one of {substring, prefix}" % match)
+        self.name = name
+        self.patterns = list(patterns) if enabled else []
+        self.match = match
+
+    def matches(self, patterns: List[str], function_name: str) -> bool:
+        """
+        :param patterns: Patterns of this category
+        :param function_name: The function name, e.g. transfer(address,uint256)
+        :return: Whether one of patterns matches function_name
+        """
+        if self.match == "prefix":
+            return any(function_name.startswith(pattern) for pattern in patterns)
+        return any(pattern in function_name for pattern in patterns)
+
+
+class ExplorationFilter:
+    """Decides which functions LASER leaves unexplored.
+
+    A function is excluded if the deny patterns of a category match its name and
+    none of the allow patterns of that category do. The deny patterns of a
+    category are its built-in patterns and the ones given on the command line.
+    """
+
+    def __init__(
+        self,
+        categories: List[FunctionCategory],
+        allow: Optional[Dict[str, List[str]]] = None,
+        deny: Optional[Dict[str, List[str]]] = None,
+    ) -> None:
+        """
+
+        :param categories: The behaviour categories
+        :param allow: Extra allow patterns per category name
+        :param deny: Extra deny patterns per category name
+        """
+        allow = allow or {}
+        deny = deny or {}
+        self.rules: List[Tuple[FunctionCategory, List[str], List[str]]] = []
+        for category in categories:
+            deny_patterns = category.patterns + deny.get(category.name, [])
+            if deny_patterns:
+                self.rules.append(
+                    (category, deny_patterns, allow.get(category.name, []))
+                )
+        self._excluded: Dict[str, bool] = {}
+        self._entries: Dict[int, Tuple[List[Dict], FrozenSet[int]]] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.rules)
+
+    def excluded(self, function_name: str) -> bool:
+        """
+        :param function_name: The function name, e.g. transfer(address,uint256)
+        :return: Whether the function is left unexplored
+        """
+        if function_name not in self._excluded:
+            self._excluded[function_name] = function_name not in ALWAYS_EXPLORED and any(
+                category.matches(deny_patterns, function_name)
+                and not category.matches(allow_patterns, function_name)
+                for category, deny_patterns, allow_patterns in self.rules
+            )
+        return self._excluded[function_name]
+
+    def excluded_entries(self, code: Disassembly) -> FrozenSet[int]:
+        """
+        :param code: The code of an environment
+        :return: The entry addresses of the excluded functions in the dispatcher of code
+        """
+        instruction_list = code.instruction_list
+        # The cache keeps the instruction list alive, so its id stays unique
+        cached = self._entries.get(id(instruction_list))
+        if cached is None or cached[0] is not instruction_list:
+            entries = frozenset(
+                address
+                for address, function_name in code.address_to_function_name.items()
+                if self.excluded(function_name)
+            )
+            cached = (instruction_list, entries)
+            self._entries[id(instruction_list)] = cached
+        return cached[1]
@@ -0,0 +1,162 @@
+"""This module contains the per-function resource budgets LASER enforces during
+symbolic execution."""
+import logging
+from copy import copy
+from typing import Dict, Optional
+
+from mythril.laser.ethereum.exploration_filter import ALWAYS_EXPLORED
+
+log = logging.getLogger(__name__)
+
+
+class FunctionUsage:
+    """The resources the states of one function used so far."""
+
+    __slots__ = ("time", "states", "solver_calls", "exhausted")
+
+    def __init__(self) -> None:
+        self.time = 0.0
+        self.states = 0
+        self.solver_calls = 0
+        # The budget that ran out, None while the function is within its budgets
+        self.exhausted: Optional[str] = None
+
+    def __copy__(self) -> "FunctionUsage":
+        result = FunctionUsage()
+        result.time = self.time
+        result.states = self.states
+        result.solver_calls = self.solver_calls
+        result.exhausted = self.exhausted
+        return result
+
+
+class FunctionBudgets:
+    """Time, state and solver call budgets per active_function_name.
+
+    Every budget applies to each function on its own, over all transactions. Once
+    a function has used up one of them, LASER drops its remaining states so that
+    the other functions get the rest of the execution timeout. The constructor and
+    the fallback function, which runs the dispatcher, have no budgets.
+    """
+
+    def __init__(
+        self,
+        time_budget: Optional[float] = None,
+        state_budget: Optional[int] = None,
+        solver_budget: Optional[int] = None,
+    ) -> None:
+        """
+
+        :param time_budget: Seconds of execution per function
+        :param state_budget: States created per function
+        :param solver_budget: Solver queries per function
+        """
+        self.time_budget = time_budget
+        self.state_budget = state_budget
+        self.solver_budget = solver_budget
+        self.usage: Dict[str, FunctionUsage] = {}
+
+    def __bool__(self) -> bool:
+        return (
+            self.time_budget is not None
+            or self.state_budget is not None
+            or self.solver_budget is not None
+        )
+
+    def exhausted(self, function_name: str) -> bool:
+        """
+        :param function_name: The active function name of a state
+        :return: Whether the function has used up one of its budgets
+        """
+        usage = self.usage.get(function_name)
+        return usage is not None and usage.exhausted is not None
+
+    def charge(
+        self, function_name: str, time: float, states: int, solver_calls: int
+    ) -> None:
+        """Adds the resources one execution step of function_name used.
+
+        :param function_name: The active function name of the executed state
+        :param time: Seconds the step took
+        :param states: States the step created
+        :param solver_calls: Solver queries the step ran
+        """
+        usage = self.usage.get(function_name)
+        if usage is None:
+            usage = self.usage[function_name] = FunctionUsage()
+        usage.time += time
+        usage.states += states
+        usage.solver_calls += solver_calls
+        if usage.exhausted is not None or function_name in ALWAYS_EXPLORED:
+            return
+        if self.time_budget is not None and usage.time >= self.time_budget:
+            usage.exhausted = "time"
+        elif self.state_budget is not None and usage.states >= self.state_budget:
+            usage.exhausted = "states"
+        elif self.solver_budget is not None and usage.solver_calls >= self.solver_budget:
+            usage.exhausted = "solver calls"
+        if usage.exhausted is not None:
+            log.info(
+                "Function {} used up its {} budget, dropping its states".format(
+                    function_name, usage.exhausted
+                )
+            )
+
+    def merge(self, usage: Dict[str, FunctionUsage]) -> None:
+        """Adds the usage recorded by other budgets, e.g. in a worker process.
+
+        :param usage: The usage per function of the other budgets
+        """
+        for function_name, other in usage.items():
+            own = self.usage.get(function_name)
+            if own is None:
+                own = self.usage[function_name] = FunctionUsage()
+            own.time += other.time
+            own.states += other.states
+            own.solver_calls += other.solver_calls
+            own.exhausted = own.exhausted or other.exhausted
+
+    def copy_usage(self) -> Dict[str, FunctionUsage]:
+        """
+        :return: A copy of the usage per function, see usage_since
+        """
+        return {
+            function_name: copy(usage) for function_name, usage in self.usage.items()
+        }
+
+    def usage_since(self, before: Dict[str, FunctionUsage]) -> Dict[str, FunctionUsage]:
+        """The usage added since copy_usage returned before, e.g. in a worker process.
+
+        :param before: The usage per function at that time
+        :return: The usage per function added since then
+        """
+        added: Dict[str, FunctionUsage] = {}
+        for function_name, usage in self.usage.items():
+            delta = copy(usage)
+            earlier = before.get(function_name)
+            if earlier is not None:
+                delta.time -= earlier.time
+                delta.states -= earlier.states
+                delta.solver_calls -= earlier.solver_calls
+            added[function_name] = delta
+        return added
+
+    def __repr__(self) -> str:
+        lines = [
+            "{:<48} {:>10} {:>10} {:>12}  {}".format(
+                "function", "time (s)", "states", "solver calls", "budget used up"
+            )
+        ]
+        for function_name, usage in sorted(
+            self.usage.items(), key=lambda item: -item[1].time
+        ):
+            lines.append(
+                "{:<48} {:>10.2f} {:>10} {:>12}  {}".format(
+                    function_name,
+                    usage.time,
+                    usage.states,
+                    usage.solver_calls,
+                    usage.exhausted or "",
+                )
+            )
+        return "\n".join(lines)
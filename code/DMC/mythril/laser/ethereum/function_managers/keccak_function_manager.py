@@ -53,6 +53,40 @@ class KeccakFunctionManager:
         self.concrete_hashes = {}
         self.symbolic_inputs = {}
 
+    def start_worker(self) -> None:
+        """Runs in each worker process of a forked exploration right after the fork"""
+        self._worker_input_counts = {
+            length: len(inputs) for length, inputs in self.symbolic_inputs.items()
+        }
+
+    def export_worker_state(
+        self,
+    ) -> Tuple[Dict[int, List[BitVec]], Dict[BitVec, BitVec], Dict[BitVec, BitVec]]:
+        """
+        Runs in each worker process of a forked exploration once it is done
+        :return: The hashes the worker created, merged with merge_worker_state
+        """
+        symbolic_inputs = {
+            length: inputs[self._worker_input_counts.get(length, 0) :]
+            for length, inputs in self.symbolic_inputs.items()
+        }
+        return symbolic_inputs, self.concrete_hashes, self.quick_inverse
+
+    def merge_worker_state(self, state) -> None:
+        """
+        Adds the hashes a worker process of a forked exploration created, so that
+        create_conditions constrains them in the later transactions as well.
+        The intervals of the input sizes are still assigned by this process.
+        :param state: What export_worker_state returned in the worker
+        """
+        symbolic_inputs, concrete_hashes, quick_inverse = state
+        for length, inputs in symbolic_inputs.items():
+            func, _ = self.get_function(length)
+            self.symbolic_inputs.setdefault(length, []).extend(inputs)
+            self.hash_result_store[length] += [func(data) for data in inputs]
+        self.concrete_hashes.update(concrete_hashes)
+        self.quick_inverse.update(quick_inverse)
+
     @staticmethod
     def find_concrete_keccak(data: BitVec) -> BitVec:
         """
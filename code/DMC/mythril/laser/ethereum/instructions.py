@@ -3,7 +3,8 @@ transitions between them."""
 import logging
 
 from copy import copy, deepcopy
-from typing import cast, Callable, List, Union, Tuple
+from functools import lru_cache
+from typing import cast, Callable, List, Optional, Union, Tuple
 
 from mythril.exceptions import UnsatError
 from mythril.laser.smt import (
@@ -222,8 +223,11 @@ class Instruction:
         """
         self.dynamic_loader = dynamic_loader
         self.op_code = op_code.upper()
-        self.pre_hook = pre_hooks if pre_hooks else []
-        self.post_hook = post_hooks if post_hooks else []
+        # Keep the hook lists themselves, LASER shares one Instruction per opcode
+        # and hooks registered later are appended to these lists
+        self.pre_hook = pre_hooks if pre_hooks is not None else []
+        self.post_hook = post_hooks if post_hooks is not None else []
+        self._mutator, self._post_mutator = _resolve_mutators(self.op_code)
 
     def _execute_pre_hooks(self, global_state: GlobalState):
         for hook in self.pre_hook:
@@ -240,29 +244,14 @@ class Instruction:
         :param post:
         :return:
         """
-        # Generalize some ops
         log.debug("Evaluating %s at %i", self.op_code, global_state.mstate.pc)
 
-        op = self.op_code.lower()
-        if self.op_code.startswith("PUSH"):
-            op = "push"
-        elif self.op_code.startswith("DUP"):
-            op = "dup"
-        elif self.op_code.startswith("SWAP"):
-            op = "swap"
-        elif self.op_code.startswith("LOG"):
-            op = "log"
-
-        instruction_mutator = (
-            getattr(self, op + "_", None)
-            if not post
-            else getattr(self, op + "_" + "post", None)
-        )
+        instruction_mutator = self._post_mutator if post else self._mutator
         if instruction_mutator is None:
             raise NotImplementedError
 
         self._execute_pre_hooks(global_state)
-        result = instruction_mutator(global_state)
+        result = instruction_mutator(self, global_state)
         self._execute_post_hooks(global_state)
 
         return result
@@ -2702,3 +2691,20 @@ class Instruction:
         global_state.world_state.constraints.append(return_value == 1)
 
         return [global_state]
+
+
+@lru_cache(maxsize=None)
+def _resolve_mutators(
+    op_code: str,
+) -> Tuple[Optional[Callable], Optional[Callable]]:
+    """
+    :param op_code: The upper case opcode
+    :return: The Instruction functions evaluating op_code and its post handler
+    """
+    # Generalize some ops
+    op = op_code.lower()
+    for family in ("push", "dup", "swap", "log"):
+        if op.startswith(family):
+            op = family
+            break
+    return getattr(Instruction, op + "_", None), getattr(Instruction, op + "_post", None)
@@ -15,14 +15,43 @@ from mythril.support.support_args import args
 log = logging.getLogger(__name__)
 
 
+class _CopyOnWrite:
+    """Storage attribute that may still be shared with the storage it was copied from.
+
+    Every access goes through Storage._detach first, so the containers are
+    only cloned once a copy is actually read from or written to.
+    """
+
+    def __set_name__(self, owner, name):
+        self.name = "_cow_" + name
+
+    def __get__(self, storage, owner=None):
+        if storage is None:
+            return self
+        storage._detach()
+        return storage.__dict__[self.name]
+
+    def __set__(self, storage, value):
+        storage._detach()
+        storage.__dict__[self.name] = value
+
+
 class Storage:
     """Storage class represents the storage of an Account."""
 
+    _standard_storage = _CopyOnWrite()
+    printable_storage = _CopyOnWrite()
+    storage_keys_loaded = _CopyOnWrite()
+    keys_set = _CopyOnWrite()
+    keys_get = _CopyOnWrite()
+
     def __init__(self, concrete=False, address=None, dynamic_loader=None) -> None:
         """Constructor for Storage.
 
         :param concrete: bool indicating whether to interpret uninitialized storage as concrete versus symbolic
         """
+        # True while the containers are shared with a copy of this storage
+        self._shared = False
         if concrete and args.unconstrained_storage is False:
             self._standard_storage: BaseArray = K(256, 256, 0)
         else:
@@ -86,16 +115,26 @@ class Storage:
         if key.symbolic is False:
             self.storage_keys_loaded.add(int(key.value))
 
+    def _detach(self) -> None:
+        """Replaces containers shared with another copy by private clones."""
+        if not self._shared:
+            return
+        self._shared = False
+        values = self.__dict__
+        values["_cow__standard_storage"] = deepcopy(values["_cow__standard_storage"])
+        values["_cow_printable_storage"] = copy(values["_cow_printable_storage"])
+        values["_cow_storage_keys_loaded"] = copy(values["_cow_storage_keys_loaded"])
+        values["_cow_keys_set"] = deepcopy(values["_cow_keys_set"])
+        values["_cow_keys_get"] = deepcopy(values["_cow_keys_get"])
+
     def __deepcopy__(self, memodict=dict()):
-        concrete = isinstance(self._standard_storage, K)
-        storage = Storage(
-            concrete=concrete, address=self.address, dynamic_loader=self.dynld
-        )
-        storage._standard_storage = deepcopy(self._standard_storage)
-        storage.printable_storage = copy(self.printable_storage)
-        storage.storage_keys_loaded = copy(self.storage_keys_loaded)
-        storage.keys_set = deepcopy(self.keys_set)
-        storage.keys_get = deepcopy(self.keys_get)
+        """
+        Copies lazily: both storages keep using the same containers until
+        one of them is accessed, see _detach.
+        """
+        storage = Storage.__new__(Storage)
+        storage.__dict__.update(self.__dict__)
+        storage._shared = self._shared = True
         return storage
 
     def __str__(self) -> str:
@@ -115,6 +154,7 @@ class Account:
         concrete_storage=False,
         dynamic_loader=None,
         nonce=0,
+        storage: Storage = None,
     ) -> None:
         """Constructor for account.
 
@@ -123,6 +163,7 @@ class Account:
         :param contract_name: The name associated with the account
         :param balances: The balance for the account
         :param concrete_storage: Interpret storage as concrete
+        :param storage: Storage of the account, created from concrete_storage if not given
         """
         self.concrete_storage = concrete_storage
         self.nonce = nonce
@@ -133,9 +174,11 @@ class Account:
             else symbol_factory.BitVecVal(int(address, 16), 256)
         )
 
-        self.storage = Storage(
-            concrete_storage, address=self.address, dynamic_loader=dynamic_loader
-        )
+        if storage is None:
+            storage = Storage(
+                concrete_storage, address=self.address, dynamic_loader=dynamic_loader
+            )
+        self.storage = storage
 
         # Metadata
         if contract_name is None:
@@ -152,6 +195,16 @@ class Account:
         self._balances = balances
         self.balance = lambda: self._balances[self.address]
 
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        # The balance lambda cannot be pickled, __setstate__ recreates it
+        del state["balance"]
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self.balance = lambda: self._balances[self.address]
+
     def __str__(self) -> str:
         return str(self.as_dict)
 
@@ -219,10 +272,10 @@ class Account:
             address=self.address,
             code=self.code,
             contract_name=self.contract_name,
-            balances=deepcopy(self._balances),
+            balances=copy(self._balances),
             concrete_storage=self.concrete_storage,
             nonce=self.nonce,
+            storage=deepcopy(self.storage),
         )
-        new_account.storage = deepcopy(self.storage)
         new_account.code = self.code
         return new_account
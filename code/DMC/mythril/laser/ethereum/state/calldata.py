@@ -2,7 +2,7 @@
 from typing import cast, Union, Tuple, List
 
 
-from typing import Any, Union
+from typing import Any, Dict, Optional, Union
 
 from z3 import Model, unsat, unknown
 from z3.z3types import Z3Exception
@@ -23,6 +23,15 @@ from mythril.laser.smt import (
 )
 
 
+def _concrete_index(index: Union[int, BitVec]) -> Optional[int]:
+    """The value of a calldata index, None if it is symbolic"""
+    if isinstance(index, int):
+        return index
+    if isinstance(index, BitVec) and not index.symbolic:
+        return index.value
+    return None
+
+
 class BaseCalldata:
     """Base calldata class This represents the calldata provided when sending a
     transaction to a contract."""
@@ -33,6 +42,8 @@ class BaseCalldata:
         :param tx_id:
         """
         self.tx_id = tx_id
+        # The words get_word_at built at concrete offsets
+        self._words: Dict[int, BitVec] = {}
 
     @property
     def calldatasize(self) -> BitVec:
@@ -45,14 +56,22 @@ class BaseCalldata:
             return symbol_factory.BitVecVal(result, 256)
         return result
 
-    def get_word_at(self, offset: int) -> Expression:
-        """Gets word at offset.
+    def get_word_at(self, offset: Union[int, BitVec]) -> Expression:
+        """Gets word at offset. The word at a concrete offset is only built once
+        per calldata, later loads share its term.
 
         :param offset:
         :return:
         """
-        parts = self[offset : offset + 32]
-        return simplify(Concat(parts))
+        concrete_offset = _concrete_index(offset)
+        if concrete_offset is None:
+            return simplify(Concat(self[offset : offset + 32]))
+        word = self._words.get(concrete_offset)
+        if word is None:
+            word = simplify(Concat(self[concrete_offset : concrete_offset + 32]))
+            self._words[concrete_offset] = word
+        # A fresh wrapper, annotating the loaded value must not annotate the cached word
+        return BitVec(word.raw, annotations=set(word.annotations))
 
     def __getitem__(self, item: Union[int, slice, BitVec]) -> Any:
         """
@@ -68,6 +87,20 @@ class BaseCalldata:
             step = 1 if item.step is None else item.step
             stop = self.size if item.stop is None else item.stop
 
+            concrete_start = _concrete_index(start)
+            concrete_stop = _concrete_index(stop)
+            if (
+                step == 1
+                and concrete_start is not None
+                and concrete_stop is not None
+                and concrete_start <= concrete_stop
+            ):
+                # The bounds are known, no need to ask the solver where the slice ends
+                return [
+                    self._load_part(symbol_factory.BitVecVal(index, 256))
+                    for index in range(concrete_start, concrete_stop)
+                ]
+
             try:
                 current_index = (
                     start
@@ -82,11 +115,7 @@ class BaseCalldata:
                     result = s.check()
                     if result in (unsat, unknown):
                         break
-                    element = self._load(current_index)
-                    if not isinstance(element, Expression):
-                        element = symbol_factory.BitVecVal(element, 8)
-
-                    parts.append(element)
+                    parts.append(self._load_part(current_index))
                     current_index = simplify(current_index + step)
 
             except Z3Exception:
@@ -95,6 +124,13 @@ class BaseCalldata:
 
         raise ValueError
 
+    def _load_part(self, index: BitVec) -> Expression:
+        """Loads the byte at index as an element of a slice"""
+        element = self._load(index)
+        if not isinstance(element, Expression):
+            element = symbol_factory.BitVecVal(element, 8)
+        return element
+
     def _load(self, item: Union[int, BitVec]) -> Any:
         """
 
@@ -1,29 +1,81 @@
 """This module contains the class used to represent state-change constraints in
 the call graph."""
+import z3
+
 from mythril.exceptions import UnsatError, SolverTimeOutException
 from mythril.laser.smt import symbol_factory, simplify, Bool
 from mythril.support.model import get_model
 from mythril.laser.ethereum.function_managers import keccak_function_manager
 from mythril.laser.smt.model import Model
 from copy import copy
-from typing import Iterable, List, Optional, Union
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+
+class ConstraintLink:
+    """An immutable link of a persistent constraint chain.
+
+    A link holds one constraint and points to the link of the constraints
+    added before it, so states forked from a common ancestor share the links
+    of their common path prefix. Every link caches the length and the hash of
+    its prefix, the conjunction of the prefix is built on first use.
+    """
+
+    __slots__ = ("constraint", "parent", "length", "hash", "_conjunction")
+
+    def __init__(self, constraint: Bool, parent: Optional["ConstraintLink"]) -> None:
+        """
+
+        :param constraint: The constraint this link adds to the chain
+        :param parent: The link of the preceding constraints, None for the first one
+        """
+        self.constraint = constraint
+        self.parent = parent
+        self.length = 1 if parent is None else parent.length + 1
+        self.hash = hash((None if parent is None else parent.hash, hash(constraint)))
+        self._conjunction: Optional[z3.BoolRef] = None
 
+    @property
+    def conjunction(self) -> z3.BoolRef:
+        """
+        :return: z3.And of the constraints up to and including this link
+        """
+        if self._conjunction is None:
+            # Build from the closest prefix that is already materialised, iteratively
+            # as the chains of long transaction sequences exceed the recursion limit
+            pending = []
+            link: Optional[ConstraintLink] = self
+            while link is not None and link._conjunction is None:
+                pending.append(link)
+                link = link.parent
+            for link in reversed(pending):
+                raw = link.constraint.raw
+                link._conjunction = (
+                    raw
+                    if link.parent is None
+                    else z3.And(link.parent._conjunction, raw)
+                )
+        return self._conjunction
 
-class Constraints(list):
+
+class Constraints:
     """This class should maintain a solver and it's constraints, This class
     tries to make the Constraints() object as a simple list of constraints with
     some background processing.
 
+    The constraints are stored as a persistent chain of ConstraintLink, so
+    copying and forking are O(1) and siblings share their common prefix. The
+    list view of the chain is materialised on demand and cached.
     """
 
-    def __init__(self, constraint_list: Optional[List[Bool]] = None) -> None:
+    def __init__(self, constraint_list: Optional[Iterable[Bool]] = None) -> None:
         """
 
         :param constraint_list: List of constraints
         """
-        constraint_list = constraint_list or []
-        constraint_list = self._get_smt_bool_list(constraint_list)
-        super(Constraints, self).__init__(constraint_list)
+        self._tail: Optional[ConstraintLink] = None
+        self._items: Tuple[Bool, ...] = ()
+        self._items_tail: Optional[ConstraintLink] = None
+        self._link(self._get_smt_bool_list(constraint_list or []))
 
     def is_possible(self, solver_timeout=None) -> bool:
         """
@@ -31,7 +83,8 @@ class Constraints(list):
         :return: True/False based on the existence of solution of constraints
         """
         try:
-            get_model(self, solver_timeout=solver_timeout)
+            # Pass a snapshot, the lru_cache of get_model keeps its arguments
+            get_model(copy(self), solver_timeout=solver_timeout)
         except SolverTimeOutException:
             # If it uses the long analysis solver timeout
             # if solver_timeout is None:
@@ -48,7 +101,7 @@ class Constraints(list):
         :return: True/False based on the existence of solution of constraints
         """
         try:
-            return get_model(self, solver_timeout=solver_timeout)
+            return get_model(copy(self), solver_timeout=solver_timeout)
         except SolverTimeOutException:
             return None
             # return Model()
@@ -65,22 +118,68 @@ class Constraints(list):
             if isinstance(constraint, Bool)
             else symbol_factory.Bool(constraint)
         )
-        super(Constraints, self).append(constraint)
+        self._tail = ConstraintLink(constraint, self._tail)
+
+    def extend(self, constraints: Iterable[Union[bool, Bool]]) -> None:
+        """
+
+        :param constraints: The constraints to be appended, they are not simplified
+        """
+        self._link(self._get_smt_bool_list(constraints))
+
+    def _link(self, constraints: Iterable[Bool]) -> None:
+        for constraint in constraints:
+            self._tail = ConstraintLink(constraint, self._tail)
+
+    def _materialise(self) -> Tuple[Bool, ...]:
+        """
+        :return: The constraints of the chain in insertion order
+        """
+        if self._items_tail is not self._tail:
+            # Only the links added since the last materialisation are walked
+            known = self._items_tail
+            known_length = 0 if known is None else known.length
+            added = []
+            link = self._tail
+            while link is not None and link.length > known_length:
+                added.append(link.constraint)
+                link = link.parent
+            if link is known:
+                self._items = self._items + tuple(reversed(added))
+            else:
+                while link is not None:
+                    added.append(link.constraint)
+                    link = link.parent
+                self._items = tuple(reversed(added))
+            self._items_tail = self._tail
+        return self._items
+
+    @property
+    def conjunction(self) -> z3.BoolRef:
+        """
+        :return: z3.And of the constraints, shared with the forks of this chain
+        """
+        if self._tail is None:
+            return z3.BoolVal(True)
+        return self._tail.conjunction
 
     @property
     def as_list(self) -> List[Bool]:
         """
         :return: returns the list of constraints
         """
-        return self[:] + [keccak_function_manager.create_conditions()]
+        return self.get_all_constraints()
 
     def __copy__(self) -> "Constraints":
         """
 
         :return: The copied constraint List
         """
-        constraint_list = super(Constraints, self).copy()
-        return Constraints(constraint_list)
+        new_constraints = Constraints.__new__(Constraints)
+        new_constraints._tail = self._tail
+        new_constraints._items = self._items
+        new_constraints._items_tail = self._items_tail
+        return new_constraints
 
     def copy(self) -> "Constraints":
         return self.__copy__()
@@ -96,15 +195,23 @@ class Constraints(list):
             new_constraints.append(copy(constraint))
         return new_constraints
 
-    def __add__(self, constraints: List[Union[bool, Bool]]) -> "Constraints":
+    def __add__(self, constraints: Iterable[Union[bool, Bool]]) -> "Constraints":
         """
 
         :param constraints:
         :return: the new list after the + operation
         """
-        constraints_list = self._get_smt_bool_list(constraints)
-        constraints_list = super(Constraints, self).__add__(constraints_list)
-        return Constraints(constraint_list=constraints_list)
+        new_constraints = copy(self)
+        new_constraints.extend(constraints)
+        return new_constraints
+
+    def __radd__(self, constraints: List[Union[bool, Bool]]) -> List[Bool]:
+        """
+
+        :param constraints:
+        :return: the list of constraints followed by those of the chain
+        """
+        return list(constraints) + list(self)
 
     def __iadd__(self, constraints: Iterable[Union[bool, Bool]]) -> "Constraints":
         """
@@ -112,10 +219,39 @@ class Constraints(list):
         :param constraints:
         :return:
         """
-        list_constraints = self._get_smt_bool_list(constraints)
-        super(Constraints, self).__iadd__(list_constraints)
+        self.extend(constraints)
         return self
 
+    def __iter__(self) -> Iterator[Bool]:
+        return iter(self._materialise())
+
+    def __len__(self) -> int:
+        return 0 if self._tail is None else self._tail.length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self._materialise()[index])
+        if index == -1 and self._tail is not None:
+            return self._tail.constraint
+        return self._materialise()[index]
+
+    def __contains__(self, constraint) -> bool:
+        return constraint in self._materialise()
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Constraints):
+            if self._tail is other._tail:
+                return True
+            if len(self) != len(other) or hash(self) != hash(other):
+                return False
+            return self._materialise() == other._materialise()
+        if isinstance(other, (list, tuple)):
+            return list(self._materialise()) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(list(self._materialise()))
+
     @staticmethod
     def _get_smt_bool_list(constraints: Iterable[Union[bool, Bool]]) -> List[Bool]:
         return [
@@ -126,7 +262,7 @@ class Constraints(list):
         ]
 
     def get_all_constraints(self):
-        return self[:] + [keccak_function_manager.create_conditions()]
+        return list(self._materialise()) + [keccak_function_manager.create_conditions()]
 
     def __hash__(self):
-        return tuple(self[:]).__hash__()
+        return hash(None) if self._tail is None else self._tail.hash
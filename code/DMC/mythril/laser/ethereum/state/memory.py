@@ -32,6 +32,8 @@ class Memory:
         """"""
         self._msize = 0
         self._memory: Dict[BitVec, Union[int, BitVec]] = {}
+        # True while _memory is shared with a copy and has to be cloned before writing
+        self._shared = False
 
     def __len__(self):
         """
@@ -42,8 +44,9 @@ class Memory:
 
     def __copy__(self):
         new_memory = Memory()
-        new_memory._memory = copy(self._memory)
+        new_memory._memory = self._memory
         new_memory._msize = self._msize
+        self._shared = new_memory._shared = True
         return new_memory
 
     def extend(self, size: int):
@@ -205,4 +208,7 @@ class Memory:
                 assert 0 <= value <= 0xFF
             if isinstance(value, BitVec):
                 assert value.size() == 8
+            if self._shared:
+                self._memory = copy(self._memory)
+                self._shared = False
             self._memory[bv_key] = cast(Union[int, BitVec], value)
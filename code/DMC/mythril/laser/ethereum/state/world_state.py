@@ -26,15 +26,23 @@ class WorldState:
         annotations: List[StateAnnotation] = None,
         constraints: Constraints = None,
         transient_storage: TransientStorage = None,
+        balances: Array = None,
+        starting_balances: Array = None,
     ) -> None:
         """Constructor for the world state. Initializes the accounts record.
 
         :param transaction_sequence:
         :param annotations:
+        :param balances: The balances array, a fresh symbolic array if not given
+        :param starting_balances: The balances before the first transaction
         """
         self._accounts: Dict[int, Account] = {}
-        self.balances = Array("balance", 256, 256)
-        self.starting_balances = deepcopy(self.balances)
+        self.balances = balances if balances is not None else Array("balance", 256, 256)
+        self.starting_balances = (
+            starting_balances
+            if starting_balances is not None
+            else deepcopy(self.balances)
+        )
         self.constraints = constraints or Constraints()
 
         self.node: Optional["Node"] = None
@@ -68,14 +76,16 @@ class WorldState:
         new_world_state = WorldState(
             transaction_sequence=self.transaction_sequence[:],
             annotations=new_annotations,
+            constraints=copy(self.constraints),
+            transient_storage=copy(self.transient_storage),
+            balances=copy(self.balances),
+            starting_balances=copy(self.starting_balances),
         )
-        new_world_state.balances = copy(self.balances)
-        new_world_state.starting_balances = copy(self.starting_balances)
-        for account in self._accounts.values():
-            new_world_state.put_account(copy(account))
+        for address, account in self._accounts.items():
+            new_account = copy(account)
+            new_account._balances = new_world_state.balances
+            new_world_state._accounts[address] = new_account
         new_world_state.node = self.node
-        new_world_state.constraints = copy(self.constraints)
-        new_world_state.transient_storage = copy(self.transient_storage)
 
         return new_world_state
 
@@ -23,6 +23,14 @@ class BasicSearchStrategy(ABC):
     def run_check(self):
         return True
 
+    def visit(self, global_state: GlobalState) -> None:
+        """Called for the states LaserEVM.execute_block executes without passing
+        them through the work list
+
+        :param global_state: The state about to be executed
+        """
+        pass
+
     def __next__(self):
         try:
             global_state = self.get_strategic_global_state()
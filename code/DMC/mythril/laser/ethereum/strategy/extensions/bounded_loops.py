@@ -2,27 +2,100 @@ from mythril.laser.ethereum.state.global_state import GlobalState
 from mythril.laser.ethereum.strategy.basic import BasicSearchStrategy
 from mythril.laser.ethereum.state.annotation import StateAnnotation
 from mythril.laser.ethereum.transaction import ContractCreationTransaction
-from typing import Dict, cast, List
-from copy import copy
+from mythril.support.persistent_map import PersistentMap
+from typing import cast, List, Optional, Tuple
 import logging
 
 
 log = logging.getLogger(__name__)
 
 
+# Rolling hash of the instruction trace of a state, modulo a Mersenne prime
+_HASH_BASE = 1000003
+_HASH_MODULUS = (1 << 61) - 1
+
+
 class JumpdestCountAnnotation(StateAnnotation):
-    """State annotation that counts the number of jumps per destination."""
+    """State annotation that counts the number of jumps per destination.
+
+    The annotation does not keep the trace of the state, only a rolling hash of
+    it and, per JUMPDEST, the positions and trace hashes of the arrivals there.
+    A loop iteration is the trace segment between two arrivals, so it is
+    compared by hash without walking the trace. The counters are persistent
+    maps, so copying the annotation into forked states is O(1) as well.
+    """
 
     def __init__(self) -> None:
-        self._reached_count: Dict[int, int] = {}
-        self.trace: List[int] = []
+        # (address before the JUMPDEST, JUMPDEST address) -> position of the last jump
+        self._reached_count: PersistentMap[int] = PersistentMap()
+        # JUMPDEST address -> (position, trace hash, earlier arrivals) of the last visit
+        self._arrivals: PersistentMap[Tuple] = PersistentMap()
+        self._position = 0
+        self._trace_hash = 0
+        # The address of the last instruction the state executed
+        self.last_address: Optional[int] = None
 
     def __copy__(self):
         result = JumpdestCountAnnotation()
-        result._reached_count = copy(self._reached_count)
-        result.trace = copy(self.trace)
+        result._reached_count = self._reached_count
+        result._arrivals = self._arrivals
+        result._position = self._position
+        result._trace_hash = self._trace_hash
+        result.last_address = self.last_address
         return result
 
+    def record(self, address: int) -> None:
+        """Appends the instruction at address to the trace
+
+        :param address: The address of the executed instruction
+        """
+        self._trace_hash = (
+            self._trace_hash * _HASH_BASE + address + 1
+        ) % _HASH_MODULUS
+        self._position += 1
+        self.last_address = address
+
+    def count_jump(self, address: int) -> int:
+        """Appends the JUMPDEST at address to the trace and counts the loop it closes
+
+        :param address: The address of the JUMPDEST
+        :return: The number of consecutive equal iterations of the loop the jump closes
+        """
+        jump = (self.last_address, address)
+        previous = self._reached_count.get(jump)
+        arrivals = self._arrivals.get(address)
+        count = 0
+        if previous is not None:
+            # Count the iterations equal to the one since the previous jump, backwards
+            size = self._position - previous
+            scale = pow(_HASH_BASE, size, _HASH_MODULUS)
+            end_hash = self._trace_hash
+            iteration = None
+            start = previous
+            count = 1
+            while arrivals is not None and start >= 0:
+                while arrivals is not None and arrivals[0] > start:
+                    arrivals = arrivals[2]
+                if arrivals is None or arrivals[0] != start:
+                    break
+                segment = (end_hash - arrivals[1] * scale) % _HASH_MODULUS
+                if iteration is None:
+                    iteration = segment
+                elif segment != iteration:
+                    break
+                count += 1
+                end_hash = arrivals[1]
+                start -= size
+        if self._position >= 2:
+            # A jump at the start of the trace does not close a loop
+            self._reached_count = self._reached_count.set(jump, self._position)
+        self._arrivals = self._arrivals.set(
+            address,
+            (self._position, self._trace_hash, self._arrivals.get(address)),
+        )
+        self.record(address)
+        return count
+
 
 class BoundedLoopsStrategy(BasicSearchStrategy):
     """Adds loop pruning to the search strategy.
@@ -45,61 +118,15 @@ class BoundedLoopsStrategy(BasicSearchStrategy):
             self, super_strategy.work_list, super_strategy.max_depth, **kwargs
         )
 
-    @staticmethod
-    def calculate_hash(i: int, j: int, trace: List[int]) -> int:
-        """
-        calculate hash(trace[i: j])
-        :param i:
-        :param j:
-        :param trace:
-        :return: hash(trace[i: j])
-        """
-        key = 0
-        size = 0
-        for itr in range(i, j):
-            key |= trace[itr] << ((itr - i) * 8)
-            size += 1
-
-        return key
+    def visit(self, global_state: GlobalState) -> None:
+        """Adds the instruction of a state that skipped the work list to its trace
 
-    @staticmethod
-    def count_key(trace: List[int], key: int, start: int, size: int) -> int:
-        """
-        Count continuous loops in the trace.
-        :param trace:
-        :param key:
-        :param size:
-        :return:
+        :param global_state: The state about to be executed
         """
-        count = 1
-        i = start
-        while i >= 0:
-            if BoundedLoopsStrategy.calculate_hash(i, i + size, trace) != key:
-                break
-            count += 1
-            i -= size
-        return count
-
-    @staticmethod
-    def get_loop_count(trace: List[int]) -> int:
-        """
-        Gets the loop count
-        :param trace: annotation trace
-        :return:
-        """
-        found = False
-        for i in range(len(trace) - 3, 0, -1):
-            if trace[i] == trace[-2] and trace[i + 1] == trace[-1]:
-                found = True
-                break
-
-        if found:
-            key = BoundedLoopsStrategy.calculate_hash(i + 1, len(trace) - 1, trace)
-            size = len(trace) - i - 2
-            count = BoundedLoopsStrategy.count_key(trace, key, i + 1, size)
-        else:
-            count = 0
-        return count
+        for annotation in global_state.get_annotations(JumpdestCountAnnotation):
+            annotation.record(global_state.get_current_instruction()["address"])
+            break
+        self.super_strategy.visit(global_state)
 
     def get_strategic_global_state(self) -> GlobalState:
         """Returns the next state
@@ -124,13 +151,11 @@ class BoundedLoopsStrategy(BasicSearchStrategy):
 
             cur_instr = state.get_current_instruction()
 
-            annotation.trace.append(cur_instr["address"])
-
             if cur_instr["opcode"].upper() != "JUMPDEST":
+                annotation.record(cur_instr["address"])
                 return state
 
-            # create unique instruction identifier
-            count = BoundedLoopsStrategy.get_loop_count(annotation.trace)
+            count = annotation.count_jump(cur_instr["address"])
             # The creation transaction gets a higher loop bound to give it a better chance of success.
             # TODO: There's probably a nicer way to do this
             if isinstance(
@@ -1,25 +1,36 @@
 """This module implements the main symbolic execution engine."""
+import io
 import logging
+import multiprocessing
+import sys
 from collections import defaultdict
+from contextlib import redirect_stdout
 from copy import copy
 from datetime import datetime, timedelta
+from functools import partial
 import random
-from typing import Callable, Dict, DefaultDict, List, Tuple, Optional
+from typing import Any, Callable, Dict, DefaultDict, FrozenSet, List, Tuple, Optional
 
 from mythril.support.opcodes import OPCODES
 from mythril.analysis.potential_issues import check_potential_issues
 from mythril.laser.execution_info import ExecutionInfo
+from mythril.disassembler.disassembly import Disassembly
 from mythril.laser.ethereum.cfg import NodeFlags, Node, Edge, JumpType
+from mythril.laser.ethereum.dispatch import DispatchEntry, DispatchTable
 from mythril.laser.ethereum.evm_exceptions import StackUnderflowException, VmException
+from mythril.laser.ethereum.exploration_filter import ExplorationFilter
+from mythril.laser.ethereum.function_budget import FunctionBudgets
+from mythril.laser.ethereum.function_managers import keccak_function_manager
 from mythril.laser.ethereum.instructions import Instruction
-from mythril.laser.ethereum.instruction_data import get_required_stack_elements
 from mythril.laser.plugin.signals import PluginSkipWorldState, PluginSkipState
+from mythril.laser.ethereum.state.calldata import SymbolicCalldata
 from mythril.laser.ethereum.state.global_state import GlobalState
 from mythril.laser.ethereum.state.world_state import WorldState
 from mythril.laser.ethereum.strategy.basic import DepthFirstSearchStrategy
 from mythril.laser.ethereum.strategy.constraint_strategy import DelayConstraintStrategy
 from abc import ABCMeta
 from mythril.laser.ethereum.time_handler import time_handler
+from mythril.laser.ethereum import work_stealing
 import time
 
 
@@ -29,13 +40,16 @@ from mythril.laser.ethereum.transaction import (
     TransactionStartSignal,
     execute_contract_creation,
     execute_message_call,
+    tx_id_manager,
 )
-from mythril.laser.smt import And, symbol_factory, simplify
+from mythril.laser.ethereum.transaction.symbolic import generate_selector_constraint
+from mythril.laser.smt import And, Bool, Not, symbol_factory, simplify
+from mythril.support import z3_pickle
+from mythril.support.model import solver_metrics
 from mythril.support.support_args import args
 from mythril.analysis.module.modules.DefiCheck3 import PreProcExpr,flag_detailed,flag_time
 from mythril.analysis.module.modules.DefiCheck3 import DefiCheck3 #,detector
-from mythril.analysis.module.modules.DefiCheck3 import not_airdrop_list,flag_airdrop
-from mythril.analysis.module.modules.DefiCheck3 import not_NFT_MB,flag_NFT_MB
+from mythril.analysis.module.modules.DefiCheck3 import exploration_categories
 
 start_exec_hooks_time = 0
 stop_exec_hooks_time = 0
@@ -44,6 +58,60 @@ func_opcode_exec_time = {} # 执行用时
 
 log = logging.getLogger(__name__)
 
+# The transaction ids of a worker process of a forked exploration start at its index
+# times this, so that the symbols of different workers never share a name
+TX_ID_STRIDE = 1000000
+
+# Opcodes that begin or end a basic block, fork or start and end transactions. They
+# are always executed by execute_state, so manage_cfg and the strategy see them.
+BLOCK_TERMINATORS = frozenset(
+    [
+        "JUMPDEST",
+        "JUMP",
+        "JUMPI",
+        "STOP",
+        "RETURN",
+        "REVERT",
+        "INVALID",
+        "ASSERT_FAIL",
+        "SELFDESTRUCT",
+        "SUICIDE",
+        "CALL",
+        "CALLCODE",
+        "DELEGATECALL",
+        "STATICCALL",
+        "CREATE",
+        "CREATE2",
+    ]
+)
+
+
+def _function_scoped(hook: Callable, function_filter: Callable[[str], bool]) -> Callable:
+    """Wraps an instruction hook to only run in the functions function_filter accepts"""
+    accepted: Dict[str, bool] = {}
+
+    def scoped_hook(global_state: GlobalState):
+        function_name = global_state.environment.active_function_name
+        if function_name not in accepted:
+            accepted[function_name] = function_filter(function_name)
+        if accepted[function_name]:
+            hook(global_state)
+
+    return scoped_hook
+
+
+def _excluding_selectors(func_hashes: List[bytes], calldata: SymbolicCalldata) -> Bool:
+    """The constraint that calldata selects none of func_hashes"""
+    return Not(generate_selector_constraint(calldata, func_hashes))
+
+
+def _record_opcode_time(func_name: str, op_code: str, elapsed: float) -> None:
+    """Adds elapsed to the execution time of op_code in func_name"""
+    # 记录每个操作码的执行时间
+    opcode_times = func_opcode_exec_time.setdefault(func_name, {})
+    opcode_times[op_code] = opcode_times.get(op_code, 0) + elapsed
+
+
 
 class SVMError(Exception):
     """An exception denoting an unexpected state in symbolic execution."""
@@ -117,6 +185,12 @@ class LaserEVM:
 
         self.pre_hooks: DefaultDict[str, List[Callable]] = defaultdict(list)
         self.post_hooks: DefaultDict[str, List[Callable]] = defaultdict(list)
+        # Hooks registered with a function_filter, see register_hooks
+        self._scoped_hooks: Dict[str, List[Tuple[str, Callable, Callable]]] = {
+            "pre": [],
+            "post": [],
+        }
+        self._function_hooks: Dict[Tuple[str, str], Dict[str, List[Callable]]] = {}
 
         self._add_world_state_hooks: List[Callable] = []
         self._execute_state_hooks: List[Callable] = []
@@ -135,12 +209,40 @@ class LaserEVM:
 
         self._transaction_end_hooks: List[Callable] = []
 
+        # name -> (start, export, merge), see register_worker_state
+        self._worker_states: Dict[
+            str, Tuple[Optional[Callable], Callable, Callable]
+        ] = {}
+        # Whether this is a worker process of a forked exploration
+        self._forked = False
+        # The later transactions have to constrain the hashes the workers created
+        self.register_worker_state(
+            "keccak",
+            keccak_function_manager.export_worker_state,
+            keccak_function_manager.merge_worker_state,
+            start=keccak_function_manager.start_worker,
+        )
+        # Decide which states a work stealing exploration may move to another worker
+        self._steal_filters: List[Callable[[GlobalState], bool]] = []
+        # Runs before exec executes each state, see _steal_work
+        self._between_states: Optional[Callable[[], None]] = None
+
         self.iprof = iprof
         self.instr_pre_hook: Dict[str, List[Callable]] = {}
         self.instr_post_hook: Dict[str, List[Callable]] = {}
         for op in OPCODES:
             self.instr_pre_hook[op] = []
             self.instr_post_hook[op] = []
+        self.exploration_filter = ExplorationFilter(
+            exploration_categories, args.exploration_allow, args.exploration_deny
+        )
+        self.function_budgets = FunctionBudgets(
+            args.function_time_budget,
+            args.function_state_budget,
+            args.function_solver_budget,
+        )
+        self._dispatch_entries: Dict[str, DispatchEntry] = {}
+        self._dispatch_tables: Dict[int, DispatchTable] = {}
         self.hook_type_map = {
             "start_execute_transactions": self._start_exec_trans_hooks,
             "stop_execute_transactions": self._stop_exec_trans_hooks,
@@ -228,6 +330,7 @@ class LaserEVM:
 
         log.info("Finished symbolic execution")
         print("Finished symbolic execution")
+        print("Function budget usage:\n{}".format(self.function_budgets))
         if self.requires_statespace:
             log.info(
                 "%d nodes, %d edges, %d total states",
@@ -271,16 +374,23 @@ class LaserEVM:
             log.info(f"Executing the sequence: {txs}")
             self._execute_transactions_incremental(address, txs=tx)
 
-    def _execute_transactions_incremental(self, address, txs=None):
+    def _execute_transactions_incremental(
+        self, address, txs=None, start=0, selector_filter=None
+    ):
         """This function executes multiple transactions incrementally on the address
 
         :param address: Address of the contract
+        :param txs: The function hashes allowed in each transaction
+        :param start: The index of the first transaction to execute
+        :param selector_filter: Constrains the calldata of the first transaction, see execute_message_call
         :return:
         """
 
-        for i in range(self.transaction_count):
+        for i in range(start, self.transaction_count):
             if len(self.open_states) == 0:
                 break
+            if i == start and self._execute_transactions_forked(address, txs, i):
+                break
             old_states_count = len(self.open_states)
             # Clear journal at every new user transaction
             for state in self.open_states:
@@ -323,13 +433,290 @@ class LaserEVM:
             for hook in self._start_sym_trans_hooks:
                 hook()
 
-            execute_message_call(self, address, func_hashes=func_hashes)
+            execute_message_call(
+                self,
+                address,
+                func_hashes=func_hashes,
+                selector_filter=selector_filter if i == start else None,
+            )
 
             for hook in self._stop_sym_trans_hooks:
                 hook()
 
         self.executed_transactions = True
 
+    def _selector_partitions(
+        self, address, txs, index: int
+    ) -> List[Tuple[Optional[List], Optional[Callable]]]:
+        """Splits the functions transaction index can call between the worker processes
+
+        :param address: Address of the contract
+        :param txs: The function hashes allowed in each transaction
+        :param index: The index of the transaction
+        :return: The txs and the selector_filter of each worker process
+        """
+        if txs:
+            func_hashes = list(txs[index])
+            count = min(args.transaction_workers, len(func_hashes))
+            return [
+                (txs[:index] + [func_hashes[k::count]] + txs[index + 1 :], None)
+                for k in range(count)
+            ]
+        # The open states can hold different code for the contract, e.g. when the
+        # constructor returned different code on different paths
+        func_hashes = list(
+            dict.fromkeys(
+                bytes.fromhex(func_hash[2:].zfill(8))
+                for world_state in self.open_states
+                for func_hash in world_state[address].code.func_hashes
+            )
+        )
+        count = min(args.transaction_workers, len(func_hashes))
+        if count <= 1:
+            return []
+        shares = [func_hashes[k::count] for k in range(count)]
+        # The first worker also takes the fallback function, it calls every selector
+        # the other workers do not take
+        others = [func_hash for share in shares[1:] for func_hash in share]
+        return [(txs, partial(_excluding_selectors, others))] + [
+            (txs, partial(generate_selector_constraint, func_hashes=share))
+            for share in shares[1:]
+        ]
+
+    def _execute_transactions_forked(self, address, txs, index: int) -> bool:
+        """Executes transaction index and the later ones in worker processes.
+
+        The workers are forked from this process, so each one starts from the open
+        states of transaction index. Each worker executes that transaction for its
+        share of the functions and the later transactions from the states it
+        reached. What the workers found is then merged back: their open states, the
+        states and budgets they used, their output, and the state registered with
+        register_worker_state.
+
+        :param address: Address of the contract
+        :param txs: The function hashes allowed in each transaction
+        :param index: The index of the transaction
+        :return: Whether the transactions were executed, otherwise they still have to be executed here
+        """
+        if (
+            args.transaction_workers <= 1
+            or self._forked
+            or self.requires_statespace
+            or "fork" not in multiprocessing.get_all_start_methods()
+        ):
+            return False
+        partitions = self._selector_partitions(address, txs, index)
+        if len(partitions) <= 1:
+            log.warning(
+                "Found fewer than two function selectors to split between {} worker processes, executing the transactions serially".format(
+                    args.transaction_workers
+                )
+            )
+            return False
+        log.info(
+            "Executing transactions {} to {} in {} worker processes".format(
+                index, self.transaction_count - 1, len(partitions)
+            )
+        )
+        context = multiprocessing.get_context("fork")
+        workers = []
+        for worker_index, (worker_txs, selector_filter) in enumerate(partitions):
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(
+                target=self._explore_partition,
+                args=(sender, worker_index, address, worker_txs, index, selector_filter),
+            )
+            process.start()
+            sender.close()
+            workers.append((process, receiver))
+        results = []
+        try:
+            for process, receiver in workers:
+                results.append(z3_pickle.loads(receiver.recv_bytes()))
+        except Exception as e:
+            log.warning(
+                "A worker process failed, executing the transactions serially: {}".format(
+                    e
+                )
+            )
+            for process, _ in workers:
+                process.terminate()
+            return False
+        finally:
+            for process, receiver in workers:
+                receiver.close()
+                process.join()
+
+        self.open_states = []
+        self._merge_worker_results(results)
+        return True
+
+    def _explore_partition(
+        self, sender, worker_index: int, address, txs, index: int, selector_filter
+    ) -> None:
+        """Runs in a worker process, see _execute_transactions_forked"""
+        self._start_worker(worker_index)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self._execute_transactions_incremental(
+                address, txs, index, selector_filter
+            )
+
+        sender.send_bytes(z3_pickle.dumps(self._worker_result(output)))
+        sender.close()
+
+    def _exec_work_stealing(self) -> bool:
+        """Explores the work list in worker processes that steal states from each other.
+
+        The workers are forked from this process and split the work list. Each one
+        explores its share with the search strategy of this LaserEVM and, once its
+        work list is empty, steals states other workers donate, see work_stealing.
+        Only the states every steal filter accepts are donated. What the workers
+        found is merged back like in _execute_transactions_forked.
+
+        :return: Whether the work list was explored, otherwise it still has to be explored here
+        """
+        if (
+            args.state_workers <= 1
+            or self._forked
+            or self.requires_statespace
+            or "fork" not in multiprocessing.get_all_start_methods()
+        ):
+            return False
+        log.info(
+            "Exploring {} states in {} worker processes".format(
+                len(self.work_list), args.state_workers
+            )
+        )
+        context = multiprocessing.get_context("fork")
+        workers = []
+        for worker_index in range(args.state_workers):
+            connection, worker_connection = context.Pipe()
+            process = context.Process(
+                target=self._steal_work,
+                args=(
+                    worker_connection,
+                    worker_index,
+                    self.work_list[worker_index :: args.state_workers],
+                ),
+            )
+            process.start()
+            worker_connection.close()
+            workers.append((process, connection))
+        connections = [connection for _, connection in workers]
+        try:
+            work_stealing.coordinate(connections)
+            results = [
+                z3_pickle.loads(connection.recv_bytes()) for connection in connections
+            ]
+        except Exception as e:
+            log.warning(
+                "A worker process failed, exploring the states serially: {}".format(e)
+            )
+            for process, _ in workers:
+                process.terminate()
+            return False
+        finally:
+            for process, connection in workers:
+                connection.close()
+                process.join()
+
+        del self.work_list[:]
+        self._merge_worker_results(results)
+        return True
+
+    def _steal_work(
+        self, connection, worker_index: int, states: List[GlobalState]
+    ) -> None:
+        """Runs in a worker process, see _exec_work_stealing"""
+        self._start_worker(worker_index)
+        worker = work_stealing.StealingWorker(connection, self._donate_states)
+        self._between_states = worker.poll
+        output = io.StringIO()
+        with redirect_stdout(output):
+            while states is not None:
+                self.work_list[:] = states
+                self.exec()
+                # Left over after a timeout, a serial run drops them as well
+                del self.work_list[:]
+                states = worker.wait_for_work()
+
+        connection.send_bytes(z3_pickle.dumps(self._worker_result(output)))
+        connection.close()
+
+    def _donate_states(self) -> List[GlobalState]:
+        """Removes the states to donate to an idle worker from the work list: the oldest
+        states the steal filters accept, at most half of the work list
+
+        :return: The donated states
+        """
+        stealable = [
+            global_state
+            for global_state in self.work_list
+            if all(steal_filter(global_state) for steal_filter in self._steal_filters)
+        ]
+        donated = stealable[: len(self.work_list) // 2]
+        donated_ids = {id(global_state) for global_state in donated}
+        self.work_list[:] = [
+            global_state
+            for global_state in self.work_list
+            if id(global_state) not in donated_ids
+        ]
+        return donated
+
+    def _start_worker(self, worker_index: int) -> None:
+        """Prepares a freshly forked worker process of a forked exploration
+
+        :param worker_index: The index of the worker process
+        """
+        self._forked = True
+        tx_id_manager.set_counter(
+            int(tx_id_manager.get_next_tx_id()) - 1 + worker_index * TX_ID_STRIDE
+        )
+        # The usage before the fork counts against the budgets of the worker as
+        # well, only what the worker adds is merged back
+        self._usage_before_fork = self.function_budgets.copy_usage()
+        func_opcode_exec_time.clear()
+        self._worker_states_before = self.total_states
+        for start, _, _ in self._worker_states.values():
+            if start is not None:
+                start()
+
+    def _worker_result(self, output: io.StringIO) -> Dict[str, Any]:
+        """What a worker process of a forked exploration found, see _merge_worker_results
+
+        :param output: The captured output of the worker process
+        :return: The result to send to the main process
+        """
+        return {
+            "output": output.getvalue(),
+            "open_states": self.open_states,
+            "total_states": self.total_states - self._worker_states_before,
+            "function_budgets": self.function_budgets.usage_since(
+                self._usage_before_fork
+            ),
+            "opcode_times": func_opcode_exec_time,
+            "worker_states": {
+                name: export() for name, (_, export, _) in self._worker_states.items()
+            },
+        }
+
+    def _merge_worker_results(self, results: List[Dict[str, Any]]) -> None:
+        """Merges the results of the worker processes of a forked exploration, in worker order
+
+        :param results: The results _worker_result returned in the workers
+        """
+        for result in results:
+            sys.stdout.write(result["output"])
+            self.open_states += result["open_states"]
+            self.total_states += result["total_states"]
+            self.function_budgets.merge(result["function_budgets"])
+            for func_name, opcode_times in result["opcode_times"].items():
+                for op_code, elapsed in opcode_times.items():
+                    _record_opcode_time(func_name, op_code, elapsed)
+            for name, worker_state in result["worker_states"].items():
+                self._worker_states[name][2](worker_state)
+
     def _check_create_termination(self) -> bool:
         if len(self.open_states) != 0:
             return (
@@ -359,8 +746,14 @@ class LaserEVM:
         global start_exec_hooks_time,stop_exec_hooks_time,check_path_time
         start_exec_hooks_time += time.time()-temp_time
         print("start_exec_hooks_time: ",start_exec_hooks_time)
+        block_opcodes: Dict[str, FrozenSet[str]] = {}
 
+        if not create and not track_gas:
+            # Leaves the work list empty if the worker processes explored it
+            self._exec_work_stealing()
         for global_state in self.strategy:
+            if self._between_states is not None:
+                self._between_states()
             if create and self._check_create_termination():
                 log.debug("Hit create timeout, returning.")
                 print("Hit create timeout, returning.")
@@ -370,38 +763,41 @@ class LaserEVM:
                 log.debug("Hit execution timeout, returning.")
                 print("Hit execution timeout, returning.")
                 return final_states + [global_state] if track_gas else None
+            Func_name = global_state.environment.active_function_name
+            if self.function_budgets.exhausted(Func_name):
+                continue
+            states_before = self.total_states
+            solver_calls_before = solver_metrics.query_count
             try:
-                Func_name = global_state.environment.active_function_name
                 Instruction_execute_start_time = time.time()
                 #添加len(self.work_list)
                 global_state.work_list_len = len(self.work_list)+1 # 加上自己
-                new_states, op_code = self.execute_state(global_state)
-                # 记录每个操作码的执行时间
-                global func_opcode_exec_time
-                if Func_name not in func_opcode_exec_time:
-                    func_opcode_exec_time[Func_name] = {}
-                    func_opcode_exec_time[Func_name][op_code] = time.time()-Instruction_execute_start_time
-                elif op_code not in func_opcode_exec_time[Func_name]:
-                    func_opcode_exec_time[Func_name][op_code] = time.time()-Instruction_execute_start_time
+                new_states = None
+                if Func_name not in block_opcodes:
+                    block_opcodes[Func_name] = self._block_opcodes(Func_name)
+                if block_opcodes[Func_name]:
+                    new_states = self.execute_block(
+                        global_state, block_opcodes[Func_name]
+                    )
+                if new_states is None:
+                    new_states, op_code = self.execute_state(global_state)
+                    _record_opcode_time(
+                        Func_name, op_code, time.time() - Instruction_execute_start_time
+                    )
                 else:
-                    func_opcode_exec_time[Func_name][op_code] += time.time()-Instruction_execute_start_time
-                
+                    op_code = None
+
             except NotImplementedError:
                 log.debug("Encountered unimplemented instruction")
                 continue
             new_states_count = len(new_states)
             # print(new_states_count)
-            if flag_airdrop: # 排除常见的非空投函数避免耗时过长
-                if Func_name not in ["fallback","constructor"]: # 必须执行的函数
-                    # if Func_name in not_airdrop_list:
-                    if any(not_airdrop in Func_name for not_airdrop in not_airdrop_list):
-                        new_states = []
-            if flag_NFT_MB:
-                if Func_name not in ["fallback","constructor"]: # 必须执行的函数
-                    if any(Func_name.startswith(keyword) for keyword in not_NFT_MB):
-                        new_states = []
-                        print("not_NFT_MB: ",Func_name)
-                    
+            if op_code == "JUMPI" and self.exploration_filter: # 排除的函数在分发器处直接丢弃，避免耗时过长
+                new_states = [
+                    state
+                    for state in new_states
+                    if not self._enters_excluded_function(state)
+                ]
                 
             temp_time = time.time()
             if self.strategy.run_check() and (
@@ -423,6 +819,12 @@ class LaserEVM:
                 final_states.append(global_state)
             self.total_states += len(new_states)
             # print("total_states: ",self.total_states)
+            self.function_budgets.charge(
+                Func_name,
+                time.time() - Instruction_execute_start_time,
+                self.total_states - states_before,
+                max(solver_metrics.query_count - solver_calls_before, 0),
+            )
 
         temp_time = time.time()
         for hook in self._stop_exec_hooks:
@@ -466,20 +868,158 @@ class LaserEVM:
             )
         return new_global_states
 
+    def _block_opcodes(self, function_name: str = "") -> FrozenSet[str]:
+        """
+        :param function_name: The active function name of the states to step through
+        :return: The opcodes execute_block steps through: no pre or post hook is
+            registered for them in function_name and they are no BLOCK_TERMINATORS.
+            Empty if block stepping is disabled or every instruction is traced.
+        """
+        if args.disable_block_stepping or flag_detailed or flag_time:
+            return frozenset()
+        pre_hooks = self._function_hook_dict("pre", function_name)
+        post_hooks = self._function_hook_dict("post", function_name)
+        return (
+            frozenset(
+                op_code
+                for op_code in OPCODES
+                if not pre_hooks.get(op_code) and not post_hooks.get(op_code)
+            )
+            - BLOCK_TERMINATORS
+        )
+
+    def _enters_excluded_function(self, state: GlobalState) -> bool:
+        """
+        :param state: A successor of a JUMPI
+        :return: Whether the JUMPI was the dispatcher entering a function the
+            exploration filter excludes, see _new_node_state
+        """
+        if isinstance(
+            state.world_state.transaction_sequence[-1], ContractCreationTransaction
+        ):
+            return False
+        code = state.environment.code
+        try:
+            address = code.instruction_list[state.mstate.pc]["address"]
+        except IndexError:
+            return False
+        return address in self.exploration_filter.excluded_entries(code)
+
+    def dispatch_table(self, code: Disassembly) -> DispatchTable:
+        """
+        :param code: The code of an environment
+        :return: The dispatch table of its current instruction list, built on first use
+        """
+        instruction_list = code.instruction_list
+        # The table keeps the instruction list alive, so its id stays unique
+        table = self._dispatch_tables.get(id(instruction_list))
+        if table is None or table.instruction_list is not instruction_list:
+            table = DispatchTable(instruction_list, self._dispatch_entry)
+            self._dispatch_tables[id(instruction_list)] = table
+        return table
+
+    def _dispatch_entry(self, op_code: str) -> DispatchEntry:
+        """
+        :param op_code: The opcode
+        :return: The DispatchEntry shared by every instruction with op_code
+        """
+        entry = self._dispatch_entries.get(op_code)
+        if entry is None:
+            entry = DispatchEntry(
+                Instruction(
+                    op_code,
+                    self.dynamic_loader,
+                    pre_hooks=self.instr_pre_hook.setdefault(op_code, []),
+                    post_hooks=self.instr_post_hook.setdefault(op_code, []),
+                ),
+                self.pre_hooks[op_code],
+                self.post_hooks[op_code],
+            )
+            self._dispatch_entries[op_code] = entry
+        return entry
+
+    def execute_block(
+        self, global_state: GlobalState, block_opcodes: FrozenSet[str]
+    ) -> Optional[List[GlobalState]]:
+        """Execute the straight-line instructions in block_opcodes starting at
+        the pc of global_state as one state transition.
+
+        Every instruction is evaluated on a copy of the state with its instruction
+        and execute_state hooks, as in execute_state. The intermediate states are
+        recorded in their node and shown to the strategy, but only the final
+        state is returned to the work list.
+
+        :param global_state: The state to start from
+        :param block_opcodes: The opcodes that can be stepped through, see _block_opcodes
+        :return: The state after the block, an empty list if a plugin skipped the path
+            or None if the instruction at the pc has to go through execute_state
+        """
+        table = self.dispatch_table(global_state.environment.code)
+        func_name = global_state.environment.active_function_name
+        first = True
+        while True:
+            try:
+                entry = table[global_state.mstate.pc]
+            except IndexError:
+                return None if first else [global_state]
+            op_code = entry.op_code
+            if (
+                op_code not in block_opcodes
+                or len(global_state.mstate.stack) < entry.required_stack_elements
+            ):
+                return None if first else [global_state]
+            if not first:
+                # Account for the intermediate state as if it had passed through the work list
+                global_state.node.states.append(global_state)
+                self.total_states += 1
+                self.strategy.visit(global_state)
+
+            start_time = time.time()
+            # The hooks see the state before its instruction, as in execute_state
+            try:
+                for hook in self._execute_state_hooks:
+                    hook(global_state)
+            except PluginSkipState:
+                return []
+            try:
+                new_global_states = entry.instruction.evaluate(global_state)
+            except (
+                VmException,
+                TransactionStartSignal,
+                TransactionEndSignal,
+                NotImplementedError,
+            ):
+                new_global_states = []
+            if len(new_global_states) != 1:
+                # The instruction only ran on a copy, execute_state handles
+                # exceptions and forks without running the hooks again
+                new_global_states, _ = self.execute_state(
+                    global_state, state_hooks=False
+                )
+                _record_opcode_time(func_name, op_code, time.time() - start_time)
+                return new_global_states
+            _record_opcode_time(func_name, op_code, time.time() - start_time)
+
+            global_state = new_global_states[0]
+            first = False
+
     def execute_state(
-        self, global_state: GlobalState
+        self, global_state: GlobalState, state_hooks: bool = True
     ) -> Tuple[List[GlobalState], Optional[str]]:
         """Execute a single instruction in global_state.
 
         :param global_state:
+        :param state_hooks: Whether to run the execute_state hooks, False if the
+            caller already ran them on global_state
         :return: A list of successor states.
         """
         # Execute hooks
         import time 
         state_hook_start_time = time.time()
         try:
-            for hook in self._execute_state_hooks:
-                hook(global_state)
+            if state_hooks:
+                for hook in self._execute_state_hooks:
+                    hook(global_state)
         except PluginSkipState:
             return [], None
         state_hook_end_time = time.time()
@@ -487,7 +1027,10 @@ class LaserEVM:
         instructions_start_time = time.time()
         instructions = global_state.environment.code.instruction_list
         try:
-            op_code = instructions[global_state.mstate.pc]["opcode"]
+            entry = self.dispatch_table(global_state.environment.code)[
+                global_state.mstate.pc
+            ]
+            op_code = entry.op_code
             
             Func_name = global_state.environment.active_function_name
             # if True:
@@ -540,7 +1083,7 @@ class LaserEVM:
         instructions_end_time = time.time()
         
         exception_start_time = time.time()
-        if len(global_state.mstate.stack) < get_required_stack_elements(op_code):
+        if len(global_state.mstate.stack) < entry.required_stack_elements:
             error_msg = (
                 "Stack Underflow Exception due to insufficient "
                 "stack elements for the address {}".format(
@@ -563,12 +1106,7 @@ class LaserEVM:
         
         instr_start_time = time.time()
         try:
-            new_global_states = Instruction(
-                op_code,
-                self.dynamic_loader,
-                pre_hooks=self.instr_pre_hook[op_code],
-                post_hooks=self.instr_post_hook[op_code],
-            ).evaluate(global_state)
+            new_global_states = entry.instruction.evaluate(global_state)
 
         except VmException as e:
             for hook in self._transaction_end_hooks:
@@ -689,9 +1227,9 @@ class LaserEVM:
             global_state.world_state.constraints
         )
         # Resume execution of the transaction initializing instruction
-        op_code = return_global_state.environment.code.instruction_list[
+        entry = self.dispatch_table(return_global_state.environment.code)[
             return_global_state.mstate.pc
-        ]["opcode"]
+        ]
 
         # Set execution result in the return_state
         return_global_state.last_return_data = return_data
@@ -711,12 +1249,7 @@ class LaserEVM:
                 )
         try:
             # Execute the post instruction handler
-            new_global_states = Instruction(
-                op_code,
-                self.dynamic_loader,
-                pre_hooks=self.instr_pre_hook[op_code],
-                post_hooks=self.instr_post_hook[op_code],
-            ).evaluate(return_global_state, True)
+            new_global_states = entry.instruction.evaluate(return_global_state, True)
         except VmException:
             new_global_states = []
         # In order to get a nice call graph we need to set the nodes here
@@ -814,11 +1347,19 @@ class LaserEVM:
 
         new_node.function_name = environment.active_function_name
 
-    def register_hooks(self, hook_type: str, hook_dict: Dict[str, List[Callable]]):
+    def register_hooks(
+        self,
+        hook_type: str,
+        hook_dict: Dict[str, List[Callable]],
+        function_filter: Optional[Callable[[str], bool]] = None,
+    ):
         """
 
         :param hook_type:
         :param hook_dict:
+        :param function_filter: If given, the hooks only run in the functions whose
+            active_function_name it accepts, other functions execute without them.
+            It has to answer the same for the same name, its answers are cached.
         """
         if hook_type == "pre":
             entrypoint = self.pre_hooks
@@ -830,7 +1371,61 @@ class LaserEVM:
             )
 
         for op_code, funcs in hook_dict.items():
-            entrypoint[op_code].extend(funcs)
+            if function_filter is None:
+                entrypoint[op_code].extend(funcs)
+            else:
+                self._scoped_hooks[hook_type].extend(
+                    (op_code, function_filter, func) for func in funcs
+                )
+        self._function_hooks.clear()
+
+    def _function_hook_dict(
+        self, hook_type: str, function_name: str
+    ) -> Dict[str, List[Callable]]:
+        """
+        :param hook_type: pre or post
+        :param function_name: The active function name of a state
+        :return: The hooks per opcode that run in function_name, the hooks without
+            function filter first
+        """
+        entrypoint = self.pre_hooks if hook_type == "pre" else self.post_hooks
+        if not self._scoped_hooks[hook_type]:
+            return entrypoint
+        hook_dict = self._function_hooks.get((hook_type, function_name))
+        if hook_dict is None:
+            hook_dict = {
+                op_code: list(funcs) for op_code, funcs in entrypoint.items() if funcs
+            }
+            for op_code, function_filter, func in self._scoped_hooks[hook_type]:
+                if function_filter(function_name):
+                    hook_dict.setdefault(op_code, []).append(func)
+            self._function_hooks[(hook_type, function_name)] = hook_dict
+        return hook_dict
+
+    def register_worker_state(
+        self,
+        name: str,
+        export: Callable[[], Any],
+        merge: Callable[[Any], None],
+        start: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """Registers state that has to be merged back from the worker processes of a
+        forked exploration, see --transaction-workers and --state-workers.
+
+        :param name: A unique name for the state
+        :param export: Runs in each worker process once it is done, returns what the worker found
+        :param merge: Runs in the main process on what each worker exported, in worker order
+        :param start: Runs in each worker process right after the fork
+        """
+        self._worker_states[name] = (start, export, merge)
+
+    def register_steal_filter(self, steal_filter: Callable[[GlobalState], bool]) -> None:
+        """Registers a filter for the states a work stealing exploration may move to
+        another worker process, see --state-workers.
+
+        :param steal_filter: Tells whether a state from the work list may be moved
+        """
+        self._steal_filters.append(steal_filter)
 
     def register_laser_hooks(self, hook_type: str, hook: Callable):
         """registers the hook with this Laser VM"""
@@ -840,8 +1435,29 @@ class LaserEVM:
         else:
             raise ValueError(f"Invalid hook type {hook_type}")
 
-    def register_instr_hooks(self, hook_type: str, opcode: str, hook: Callable):
-        """Registers instructions hooks from plugins"""
+    def register_instr_hooks(
+        self,
+        hook_type: str,
+        opcode: str,
+        hook: Callable,
+        function_filter: Optional[Callable[[str], bool]] = None,
+    ):
+        """Registers instructions hooks from plugins
+
+        :param hook_type: Type of hook pre/post
+        :param opcode: The opcode related to the hook, None for all opcodes
+        :param hook: The hook, or its factory taking the opcode if opcode is None
+        :param function_filter: If given, the hook only runs in the functions whose
+            active_function_name it accepts
+        """
+        if function_filter is not None:
+            if opcode is None:
+                return self.register_instr_hooks(
+                    hook_type,
+                    None,
+                    lambda op: _function_scoped(hook(op), function_filter),
+                )
+            hook = _function_scoped(hook, function_filter)
         if hook_type == "pre":
             if opcode is None:
                 for op in OPCODES:
@@ -895,9 +1511,12 @@ class LaserEVM:
         :param global_state:
         :return:
         """
-        if op_code not in self.pre_hooks.keys():
+        pre_hooks = self._function_hook_dict(
+            "pre", global_state.environment.active_function_name
+        )
+        if op_code not in pre_hooks.keys():
             return
-        for hook in self.pre_hooks[op_code]:
+        for hook in pre_hooks[op_code]:
             hook(global_state)
 
     def _execute_post_hook(
@@ -909,10 +1528,25 @@ class LaserEVM:
         :param global_states:
         :return:
         """
-        if op_code not in self.post_hooks.keys():
+        function_names = {
+            global_state.environment.active_function_name
+            for global_state in global_states
+        }
+        if self._scoped_hooks["post"] and len(function_names) > 1:
+            # The successors see different hooks, run them state by state
+            for global_state in list(global_states):
+                successor = [global_state]
+                self._execute_post_hook(op_code, successor)
+                if not successor:
+                    global_states.remove(global_state)
+            return
+        post_hooks = self._function_hook_dict(
+            "post", function_names.pop() if function_names else ""
+        )
+        if op_code not in post_hooks.keys():
             return
 
-        for hook in self.post_hooks[op_code]:
+        for hook in post_hooks[op_code]:
             for global_state in global_states:
                 try:
                     hook(global_state)
@@ -935,6 +1569,7 @@ class LaserEVM:
             if op_code not in self.pre_hooks.keys():
                 self.pre_hooks[op_code] = []
             self.pre_hooks[op_code].append(func)
+            self._function_hooks.clear()
             return func
 
         return hook_decorator
@@ -955,6 +1590,7 @@ class LaserEVM:
             if op_code not in self.post_hooks.keys():
                 self.post_hooks[op_code] = []
             self.post_hooks[op_code].append(func)
+            self._function_hooks.clear()
             return func
 
         return hook_decorator
@@ -1,7 +1,7 @@
 """This module contains functions setting up and executing transactions with
 symbolic values."""
 import logging
-from typing import Optional, List, Union
+from typing import Callable, Optional, List, Union
 from copy import deepcopy
 
 
@@ -17,7 +17,7 @@ from mythril.laser.ethereum.transaction.transaction_models import (
     tx_id_manager,
     BaseTransaction,
 )
-from mythril.laser.smt import symbol_factory, Or, Bool, BitVec
+from mythril.laser.smt import symbol_factory, And, Or, Bool, BitVec
 from mythril.support.support_args import args as cmd_args
 
 
@@ -103,13 +103,42 @@ def generate_function_constraints(
     return constraints
 
 
+def generate_selector_constraint(
+    calldata: SymbolicCalldata, func_hashes: List[List[int]]
+) -> Bool:
+    """
+    This will generate a constraint that holds if the function call part of calldata
+    is one of func_hashes. Unlike generate_function_constraints, all bytes of the
+    function hash have to match the same function hash.
+    :param calldata: Calldata
+    :param func_hashes: The list of function hashes
+    :return: Constraint
+    """
+    return Or(
+        *[
+            And(
+                *[
+                    calldata[i] == symbol_factory.BitVecVal(func_hash[i], 8)
+                    for i in range(FUNCTION_HASH_BYTE_LENGTH)
+                ]
+            )
+            for func_hash in func_hashes
+        ]
+    )
+
+
 def execute_message_call(
-    laser_evm, callee_address: BitVec, func_hashes: List[List[int]] = None
+    laser_evm,
+    callee_address: BitVec,
+    func_hashes: List[List[int]] = None,
+    selector_filter: Optional[Callable[[SymbolicCalldata], Bool]] = None,
 ) -> None:
     """Executes a message call transaction from all open states.
 
     :param laser_evm:
     :param callee_address:
+    :param func_hashes: The list of function hashes allowed for this transaction
+    :param selector_filter: Returns an additional constraint on the calldata of each transaction
     """
     # TODO: Resolve circular import between .transaction and ..svm to import LaserEVM here
     open_states = laser_evm.open_states[:]
@@ -147,6 +176,8 @@ def execute_message_call(
             if func_hashes
             else None
         )
+        if selector_filter is not None:
+            constraints = (constraints or []) + [selector_filter(calldata)]
         _setup_global_state_for_execution(laser_evm, transaction, constraints)
 
     laser_evm.exec()
@@ -0,0 +1,105 @@
+"""This module contains the message passing of a work stealing exploration, see
+LaserEVM._exec_work_stealing.
+
+Each worker process explores its own work list with the search strategy of the
+LaserEVM. A worker whose work list ran empty tells the main process, which then
+asks a busy worker to donate some of its states to the idle one.
+"""
+import logging
+from multiprocessing.connection import Connection, wait
+from typing import Callable, Dict, List, Optional, Set
+
+from mythril.laser.ethereum.state.global_state import GlobalState
+from mythril.support import z3_pickle
+
+log = logging.getLogger(__name__)
+
+# The main process sends STEAL and FINISH, the workers send IDLE, STATES goes both ways
+STEAL = "steal"
+STATES = "states"
+IDLE = "idle"
+FINISH = "finish"
+
+# Seconds before the main process asks the workers that had nothing to donate again
+RETRY_INTERVAL = 0.05
+
+
+class StealingWorker:
+    """The worker process side of a work stealing exploration"""
+
+    def __init__(
+        self, connection: Connection, donate: Callable[[], List[GlobalState]]
+    ) -> None:
+        """
+
+        :param connection: The connection to the main process
+        :param donate: Removes the states to donate from the local work list and returns them
+        """
+        self.connection = connection
+        self.donate = donate
+
+    def poll(self) -> None:
+        """Answers a pending steal request, runs between the states the worker executes"""
+        if self.connection.poll():
+            self._answer_steal(self.connection.recv())
+
+    def wait_for_work(self) -> Optional[List[GlobalState]]:
+        """Tells the main process that the local work list is empty and waits for states
+
+        :return: The states stolen from another worker, None once every worker is idle
+        """
+        self.connection.send((IDLE,))
+        while True:
+            message = self.connection.recv()
+            if message[0] == STATES:
+                return z3_pickle.loads(message[1])
+            if message[0] == FINISH:
+                return None
+            # A steal request sent before the main process got IDLE
+            self._answer_steal(message)
+
+    def _answer_steal(self, message) -> None:
+        assert message[0] == STEAL
+        states = self.donate()
+        self.connection.send((STATES, z3_pickle.dumps(states) if states else None))
+
+
+def coordinate(connections: List[Connection]) -> None:
+    """Passes states from busy to idle workers until every worker is idle, then tells
+    the workers to finish. Runs in the main process.
+
+    :param connections: The connections to the worker processes
+    """
+    busy: Set[int] = set(range(len(connections)))
+    idle: List[int] = []  # Idle workers no steal request was sent for
+    thieves: Dict[int, int] = {}  # Asked worker -> the idle worker it donates to
+    dry: Set[int] = set()  # Busy workers that had nothing to donate
+    while busy or thieves:
+        for victim in sorted(busy - thieves.keys() - dry):
+            if not idle:
+                break
+            thieves[victim] = idle.pop(0)
+            connections[victim].send((STEAL,))
+
+        ready = wait(connections, timeout=RETRY_INTERVAL if dry else None)
+        if not ready:
+            dry.clear()
+        for connection in ready:
+            worker = connections.index(connection)
+            message = connection.recv()
+            if message[0] == IDLE:
+                busy.discard(worker)
+                dry.discard(worker)
+                idle.append(worker)
+                continue
+            thief = thieves.pop(worker)
+            if message[1] is None:
+                if worker in busy:
+                    dry.add(worker)
+                idle.insert(0, thief)
+            else:
+                connections[thief].send(message)
+                busy.add(thief)
+    log.debug("Every worker process is idle")
+    for connection in connections:
+        connection.send((FINISH,))
@@ -45,6 +45,10 @@ class InstructionCoveragePlugin(LaserPlugin):
         self.initial_coverage = 0
         self.tx_id = 0
 
+        symbolic_vm.register_worker_state(
+            "coverage", lambda: self.coverage, self._merge_coverage
+        )
+
         @symbolic_vm.laser_hook("stop_sym_exec")
         def stop_sym_exec_hook():
             # Print results
@@ -103,6 +107,19 @@ class InstructionCoveragePlugin(LaserPlugin):
             )
             self.tx_id += 1
 
+    def _merge_coverage(self, coverage: Dict[str, Tuple[int, List[bool]]]) -> None:
+        """Merges the coverage of a worker process of a forked exploration
+        :param coverage: The coverage recorded by the worker
+        :return:
+        """
+        for code, (number_of_instructions, covered) in coverage.items():
+            if code not in self.coverage:
+                self.coverage[code] = (number_of_instructions, covered)
+                continue
+            own = self.coverage[code][1]
+            for index, is_covered in enumerate(covered):
+                own[index] = own[index] or is_covered
+
     def _get_covered_instructions(self) -> int:
         """Gets the total number of covered instructions for all accounts in
         the svm.
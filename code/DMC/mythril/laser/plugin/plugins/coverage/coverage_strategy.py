@@ -34,6 +34,12 @@ class CoverageStrategy(BasicSearchStrategy):
                 return global_state
         return self.super_strategy.get_strategic_global_state()
 
+    def visit(self, global_state: GlobalState) -> None:
+        """States on uncovered instructions are taken without the super_strategy,
+        see get_strategic_global_state"""
+        if self._is_covered(global_state):
+            self.super_strategy.visit(global_state)
+
     def _is_covered(self, global_state: GlobalState) -> bool:
         """Checks if the instruction for the given global state is already covered"""
         bytecode = global_state.environment.code.bytecode
@@ -139,6 +139,21 @@ class DependencyPruner(LaserPlugin):
             if address in self.sstores_on_path:
                 self.calls_on_path[address] = True
 
+    def _merge_dependencies(self, dependencies) -> None:
+        """Merges the dependency map a worker process of a forked exploration built up.
+
+        :param dependencies: The calls, sloads, sstores and globally accessed locations of the worker
+        """
+        calls_on_path, sloads_on_path, sstores_on_path, storage_accessed = dependencies
+        for address, locations in sloads_on_path.items():
+            for location in locations:
+                self.update_sloads([address], location)
+        for address, locations in sstores_on_path.items():
+            for location in locations:
+                self.update_sstores([address], location)
+        self.calls_on_path.update(calls_on_path)
+        self.storage_accessed_global |= storage_accessed
+
     def wanna_execute(self, address: int, annotation: DependencyAnnotation) -> bool:
         """Decide whether the basic block starting at 'address' should be executed.
 
@@ -201,6 +216,17 @@ class DependencyPruner(LaserPlugin):
         """
         self._reset()
 
+        symbolic_vm.register_worker_state(
+            "dependency_pruner",
+            lambda: (
+                self.calls_on_path,
+                self.sloads_on_path,
+                self.sstores_on_path,
+                self.storage_accessed_global,
+            ),
+            self._merge_dependencies,
+        )
+
         @symbolic_vm.laser_hook("start_sym_trans")
         def start_sym_trans_hook():
             self.iteration += 1
@@ -46,6 +46,8 @@ class BitVec(Expression[z3.BitVecRef]):
 
         :return:
         """
+        if isinstance(self.raw, z3.BitVecNumRef):
+            return False
         self.simplify()
         return not isinstance(self.raw, z3.BitVecNumRef)
 
@@ -51,9 +51,10 @@ class Model:
         :param model_completion: Use the default value if the model has no interpretation of the given expression
         :return: The evaluated expression
         """
-        for internal_model in self.raw:
-            is_last_model = self.raw.index(internal_model) == len(self.raw) - 1
-            is_relevant_model = expression.decl() in list(internal_model.decls())
-            if is_relevant_model or is_last_model:
-                return internal_model.eval(expression, model_completion)
-        return None
+        if not self.raw:
+            return None
+        # The internal models assign disjoint sets of variables, so each of them
+        # substitutes its part and only the last one completes the rest
+        for internal_model in self.raw[:-1]:
+            expression = internal_model.eval(expression)
+        return self.raw[-1].eval(expression, model_completion)
@@ -3,9 +3,14 @@ import z3
 from mythril.laser.smt.model import Model
 from mythril.laser.smt.bool import Bool
 from mythril.laser.smt.solver.solver_statistics import stat_smt_query
+from mythril.support.support_utils import LRUCache, free_decl_names
 
 from typing import Set, Tuple, Dict, List, cast
 
+# Free declaration names per constraint, keyed by AST id. The entry keeps the
+# constraint alive, so the id cannot be reused while it is cached.
+_decl_names_cache = LRUCache(size=2**16)
+
 
 def _get_expr_variables(expression: z3.ExprRef) -> List[z3.ExprRef]:
     """
@@ -22,6 +27,59 @@ def _get_expr_variables(expression: z3.ExprRef) -> List[z3.ExprRef]:
     return result
 
 
+def _constraint_decl_names(constraint: z3.ExprRef) -> Set[str]:
+    cached = _decl_names_cache.get(constraint.get_id())
+    if cached != -1:
+        return cached[1]
+    names = free_decl_names(constraint)
+    _decl_names_cache.put(constraint.get_id(), (constraint, names))
+    return names
+
+
+def slice_constraints(constraints: List[Bool]) -> List[List[Bool]]:
+    """
+    Splits constraints into independent slices, two constraints share a slice
+    if they are connected through the constants, functions or arrays they use.
+    Unlike DependenceMap this also links constraints through uninterpreted
+    functions such as keccak, whose interpretations have to agree.
+    :param constraints: The constraints to slice
+    :return: The slices, ordered by their first constraint
+    """
+    parent: Dict[str, str] = {}
+
+    def find(name: str) -> str:
+        root = name
+        while parent[root] != root:
+            root = parent[root]
+        while parent[name] != root:
+            parent[name], name = root, parent[name]
+        return root
+
+    constraint_names = []
+    for constraint in constraints:
+        names = _constraint_decl_names(constraint.raw)
+        constraint_names.append(names)
+        root = None
+        for name in names:
+            parent.setdefault(name, name)
+            if root is None:
+                root = find(name)
+            else:
+                parent[find(name)] = root
+
+    slices: Dict[str, List[Bool]] = {}
+    ground: List[Bool] = []
+    for constraint, names in zip(constraints, constraint_names):
+        if names:
+            slices.setdefault(find(next(iter(names))), []).append(constraint)
+        else:
+            ground.append(constraint)
+    result = list(slices.values())
+    if ground:
+        result.insert(0, ground)
+    return result
+
+
 class DependenceBucket:
     """Bucket object to contain a set of conditions that are dependent on each other"""
 
@@ -103,14 +103,21 @@ class BaseSolver(Generic[T]):
 class Solver(BaseSolver[z3.Solver]):
     """An SMT solver object."""
 
-    def __init__(self) -> None:
-        """"""
-        super().__init__(z3.Solver())
+    def __init__(self, ctx: z3.Context = None) -> None:
+        """
+
+        :param ctx: The z3 context to solve in, defaults to the main context
+        """
+        super().__init__(z3.Solver(ctx=ctx))
 
     def reset(self) -> None:
         """Reset this solver."""
         self.raw.reset()
 
+    def push(self) -> None:
+        """Open a new scope, constraints added after it are removed by pop."""
+        self.raw.push()
+
     def pop(self, num: int) -> None:
         """Pop num constraints from this solver.
 
@@ -122,9 +129,12 @@ class Solver(BaseSolver[z3.Solver]):
 class Optimize(BaseSolver[z3.Optimize]):
     """An optimizing smt solver."""
 
-    def __init__(self) -> None:
-        """Create a new optimizing solver instance."""
-        super().__init__(z3.Optimize())
+    def __init__(self, ctx: z3.Context = None) -> None:
+        """Create a new optimizing solver instance.
+
+        :param ctx: The z3 context to solve in, defaults to the main context
+        """
+        super().__init__(z3.Optimize(ctx=ctx))
 
     def minimize(self, element: Expression[z3.ExprRef]) -> None:
         """In solving this solver will try to minimize the passed expression.
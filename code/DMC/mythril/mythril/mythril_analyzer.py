@@ -8,15 +8,19 @@ from argparse import Namespace
 
 from . import MythrilDisassembler
 from mythril.support.source_support import Source
-from mythril.support.loader import DynLoader
+from mythril.support.loader import DynLoader, storage_slots
 from mythril.support.support_args import args
 from mythril.analysis.symbolic import SymExecWrapper
 from mythril.analysis.callgraph import generate_graph
+from mythril.analysis.module import ModuleLoader
+from mythril.analysis.module.modules.DefiCheck3 import DefiCheck3
 from mythril.analysis.traceexplore import get_serializable_statespace
 from mythril.analysis.security import fire_lasers, retrieve_callback_issues
 from mythril.analysis.report import Report, Issue
 from mythril.ethereum.evmcontract import EVMContract
 from mythril.laser.smt import SolverStatistics
+from mythril.support.model import model_cache, slice_cache, solver_metrics
+from mythril.support.result_cache import ResultCache, detector_version, result_key
 from mythril.support.start_time import StartTime
 from mythril.exceptions import DetectorNotFoundError
 from mythril.laser.execution_info import ExecutionInfo
@@ -47,9 +51,17 @@ class MythrilAnalyzer:
         :param address: Address of the contract
         """
         self.eth = disassembler.eth
+        self.onchain_cache = disassembler.onchain_cache
         self.contracts: List[EVMContract] = disassembler.contracts or []
         self.enable_online_lookup = disassembler.enable_online_lookup
         self.use_onchain_data = not cmd_args.no_onchain_data
+        # One loader per run, so all on-chain data is read at the same block
+        self.dynloader = DynLoader(
+            self.eth,
+            active=self.use_onchain_data,
+            block=disassembler.block,
+            cache_dir=self.onchain_cache,
+        )
         self.strategy = strategy
         self.address = address
         self.max_depth = cmd_args.max_depth
@@ -65,15 +77,27 @@ class MythrilAnalyzer:
         args.pruning_factor = cmd_args.pruning_factor
         args.solver_timeout = cmd_args.solver_timeout
         args.parallel_solving = cmd_args.parallel_solving
+        args.incremental_solving = cmd_args.incremental_solving
         args.unconstrained_storage = cmd_args.unconstrained_storage
         args.call_depth_limit = cmd_args.call_depth_limit
         args.disable_iprof = cmd_args.disable_iprof
+        args.disable_block_stepping = cmd_args.disable_block_stepping
+        args.exploration_allow = cmd_args.explore_allow or {}
+        args.exploration_deny = cmd_args.explore_deny or {}
+        args.function_time_budget = cmd_args.function_timeout
+        args.function_state_budget = cmd_args.function_max_states
+        args.function_solver_budget = cmd_args.function_max_solver_calls
+        args.transaction_workers = cmd_args.transaction_workers
+        args.state_workers = cmd_args.state_workers
         args.solver_log = cmd_args.solver_log
         args.transaction_sequences = cmd_args.transaction_sequences
         args.disable_coverage_strategy = cmd_args.disable_coverage_strategy
         args.disable_mutation_pruner = cmd_args.disable_mutation_pruner
         args.enable_summaries = cmd_args.enable_summaries
         args.enable_state_merge = cmd_args.enable_state_merging
+        self.result_cache = (
+            ResultCache(cmd_args.result_cache) if cmd_args.result_cache else None
+        )
 
         if args.pruning_factor is None:
             if self.execution_timeout > LARGE_TIME:
@@ -81,6 +105,15 @@ class MythrilAnalyzer:
             else:
                 args.pruning_factor = 0
 
+    def _dynloader(self, contract: EVMContract) -> DynLoader:
+        """
+        :param contract: The contract to analyse
+        :return: The dynamic loader of the run, prefetching the constant storage slots
+        """
+        if self.address is not None:
+            self.dynloader.prefetch(self.address, storage_slots(contract.disassembly))
+        return self.dynloader
+
     def dump_statespace(self, contract: EVMContract = None) -> str:
         """
         Returns serializable statespace of the contract
@@ -91,7 +124,7 @@ class MythrilAnalyzer:
             contract or self.contracts[0],
             self.address,
             self.strategy,
-            dynloader=DynLoader(self.eth, active=self.use_onchain_data),
+            dynloader=self._dynloader(contract or self.contracts[0]),
             max_depth=self.max_depth,
             execution_timeout=self.execution_timeout,
             create_timeout=self.create_timeout,
@@ -122,7 +155,7 @@ class MythrilAnalyzer:
             contract or self.contracts[0],
             self.address,
             self.strategy,
-            dynloader=DynLoader(self.eth, active=self.use_onchain_data),
+            dynloader=self._dynloader(contract or self.contracts[0]),
             max_depth=self.max_depth,
             execution_timeout=self.execution_timeout,
             transaction_count=transaction_count,
@@ -133,6 +166,67 @@ class MythrilAnalyzer:
         )
         return generate_graph(sym, physics=enable_physics, phrackify=phrackify)
 
+    def _result_key(
+        self,
+        contract: EVMContract,
+        modules: Optional[List[str]],
+        transaction_count: Optional[int],
+    ) -> str:
+        """
+        :param contract: The Contract on which the analysis should be done
+        :param modules: The analysis modules which should be executed
+        :param transaction_count: The amount of transactions to be executed
+        :return: Key of the analysis results in the result cache
+        """
+        options = {
+            "address": self.address,
+            "strategy": self.strategy,
+            "use_onchain_data": self.use_onchain_data,
+            "max_depth": self.max_depth,
+            "execution_timeout": self.execution_timeout,
+            "loop_bound": self.loop_bound,
+            "create_timeout": self.create_timeout,
+            "disable_dependency_pruning": self.disable_dependency_pruning,
+            "custom_modules_directory": self.custom_modules_directory,
+            "modules": sorted(modules) if modules else None,
+            "transaction_count": transaction_count,
+            "args": {
+                name: getattr(args, name)
+                for name in (
+                    "pruning_factor",
+                    "solver_timeout",
+                    "unconstrained_storage",
+                    "call_depth_limit",
+                    "transaction_sequences",
+                    "use_integer_module",
+                    "disable_coverage_strategy",
+                    "disable_mutation_pruner",
+                    "incremental_txs",
+                    "enable_summaries",
+                    "enable_state_merge",
+                    "exploration_allow",
+                    "exploration_deny",
+                    "function_time_budget",
+                    "function_state_budget",
+                    "function_solver_budget",
+                )
+            },
+        }
+        if self.address is not None and self.use_onchain_data and self.eth:
+            # The analysis of a deployed contract depends on the chain state it reads
+            options["chain"] = {
+                "rpc": "{}:{}".format(self.eth.host, self.eth.port),
+                "block": self.dynloader.block,
+            }
+        # The DefiCheck post-processing in retrieve_callback_issues runs for every analysis
+        detectors = ModuleLoader().get_detection_modules(white_list=modules) + [
+            DefiCheck3()
+        ]
+        code_hash = "{}:{}".format(
+            contract.creation_bytecode_hash, contract.bytecode_hash
+        )
+        return result_key(code_hash, options, detector_version(detectors))
+
     def fire_lasers(
         self,
         modules: Optional[List[str]] = None,
@@ -149,12 +243,26 @@ class MythrilAnalyzer:
         execution_info: Optional[List[ExecutionInfo]] = None
         for contract in self.contracts:
             StartTime()  # Reinitialize start time for new contracts
+            cache_key = None
+            if self.result_cache is not None:
+                cache_key = self._result_key(contract, modules, transaction_count)
+                cached = self.result_cache.get(cache_key)
+                if cached is not None:
+                    log.info("Using cached results for {}".format(contract.name))
+                    DefiCheck3.function_dict.update(cached["function_dict"])
+                    print("\nfunction_dict: ")
+                    for Func_name, func_type in cached["function_dict"].items():
+                        print("Func_name: ", Func_name, "  func_type: ", func_type)
+                    for issue in cached["issues"]:
+                        issue.add_code_info(contract)
+                    all_issues += cached["issues"]
+                    continue
             try:
                 sym = SymExecWrapper(
                     contract,
                     self.address,
                     self.strategy,
-                    dynloader=DynLoader(self.eth, active=self.use_onchain_data),
+                    dynloader=self._dynloader(contract),
                     max_depth=self.max_depth,
                     execution_timeout=self.execution_timeout,
                     loop_bound=self.loop_bound,
@@ -167,6 +275,14 @@ class MythrilAnalyzer:
                 )
                 issues = fire_lasers(sym, modules)
                 execution_info = sym.execution_info
+                if cache_key is not None:
+                    self.result_cache.put(
+                        cache_key,
+                        {
+                            "issues": issues,
+                            "function_dict": dict(DefiCheck3.function_dict),
+                        },
+                    )
             except DetectorNotFoundError as e:
                 # Bubble up
                 raise e
@@ -185,6 +301,11 @@ class MythrilAnalyzer:
 
             all_issues += issues
             log.info("Solver statistics: \n{}".format(str(SolverStatistics())))
+            log.info("Solver executor: \n{}".format(str(solver_metrics)))
+            log.info("{}".format(str(model_cache)))
+            log.info("{}".format(str(slice_cache)))
+            if self.result_cache is not None:
+                log.info("{}".format(str(self.result_cache)))
 
         source_data = Source()
         source_data.get_source_from_contracts_list(self.contracts)
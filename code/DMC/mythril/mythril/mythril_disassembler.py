@@ -20,6 +20,7 @@ from mythril.exceptions import CriticalError, CompilerError, NoContractFoundErro
 from mythril.support import signatures
 from mythril.support.support_utils import rzpad
 from mythril.support.support_args import args
+from mythril.support.loader import DynLoader
 from mythril.ethereum.evmcontract import EVMContract
 from mythril.ethereum.interface.rpc.exceptions import ConnectionError
 from mythril.solidity.soliditycontract import (
@@ -55,12 +56,17 @@ class MythrilDisassembler:
         solc_settings_json: str = None,
         enable_online_lookup: bool = False,
         solc_args=None,
+        onchain_cache: Optional[str] = None,
     ) -> None:
         args.solc_args = solc_args
         self.solc_version = solc_version
         self.solc_binary = self._init_solc_binary(solc_version)
         self.solc_settings_json = solc_settings_json
         self.eth = eth
+        # Directory of the on-disk cache of on-chain data, see DynLoader
+        self.onchain_cache = onchain_cache
+        # The block number on-chain data is read at, set by the first read
+        self.block: Optional[int] = None
         self.enable_online_lookup = enable_online_lookup
         self.sigs = signatures.SignatureDB(enable_online_lookup=enable_online_lookup)
         self.contracts: List[EVMContract] = []
@@ -146,7 +152,9 @@ class MythrilDisassembler:
             )
 
         try:
-            code = self.eth.eth_getCode(address)
+            loader = DynLoader(self.eth, block=self.block, cache_dir=self.onchain_cache)
+            code = loader.read_code(address)
+            self.block = loader.block
         except FileNotFoundError as e:
             raise CriticalError("IPC error: " + str(e))
         except ConnectionError:
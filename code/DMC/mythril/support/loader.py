@@ -1,30 +1,204 @@
 """This module contains the dynamic loader logic to get on-chain storage data
 and dependencies."""
 from mythril.disassembler.disassembly import Disassembly
+import functools
+import json
 import logging
+import os
 import re
-import functools
+import tempfile
 from mythril.ethereum.interface.rpc.client import EthJsonRpc
-from typing import Optional
+from typing import Any, Dict, List, Optional, Set, Union
 
+# Most RPC providers limit the number of calls in one batch request
+MAX_BATCH_SIZE = 100
 LRU_CACHE_SIZE = 4096
 
 log = logging.getLogger(__name__)
 
 
+def storage_slots(disassembly: Disassembly) -> Set[int]:
+    """Collects the storage slots the code reads at constant indices.
+
+    Constants are followed through PUSH, DUP and SWAP instructions, any other
+    instruction forgets the stack.
+
+    :param disassembly: The code of the account
+    :return: The constant slots of the SLOAD instructions
+    """
+    slots = set()
+    stack: List[Optional[int]] = []
+    for instruction in disassembly.instruction_list:
+        opcode = instruction["opcode"]
+        if opcode.startswith("PUSH"):
+            try:
+                stack.append(int(instruction["argument"], 16))
+            except (KeyError, TypeError, ValueError):
+                # A PUSH cut off by the end of the code
+                stack.append(None)
+        elif opcode.startswith("DUP"):
+            depth = int(opcode[3:])
+            stack.append(stack[-depth] if len(stack) >= depth else None)
+        elif opcode.startswith("SWAP"):
+            depth = int(opcode[4:])
+            if len(stack) > depth:
+                stack[-1], stack[-depth - 1] = stack[-depth - 1], stack[-1]
+            else:
+                stack = []
+        elif opcode == "SLOAD" and stack:
+            if stack[-1] is not None:
+                slots.add(stack[-1])
+            stack[-1] = None
+        else:
+            stack = []
+    return slots
+
+
+class OnChainCache:
+    """
+    The code, balance and storage of accounts stored under
+    <directory>/<address>/<block>.json. Entries are written to a temporary
+    file and renamed into place, so concurrent analyses sharing a directory
+    never read a partial entry.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, address: str, block: int) -> str:
+        return os.path.join(self.directory, address, "{}.json".format(block))
+
+    def load(self, address: str, block: int) -> Dict[str, Any]:
+        """
+        :param address: The normalized account address
+        :param block: The block number
+        :return: The cached data of the account at the block
+        """
+        try:
+            with open(self._path(address, block)) as entry:
+                return json.load(entry)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            log.warning(
+                "Ignoring unreadable on-chain cache entry {}: {}".format(address, e)
+            )
+            return {}
+
+    def store(self, address: str, block: int, account: Dict[str, Any]) -> None:
+        """
+        :param address: The normalized account address
+        :param block: The block number
+        :param account: The data of the account at the block
+        """
+        path = self._path(address, block)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as entry:
+                json.dump(account, entry)
+            os.replace(temp_path, path)
+        except Exception as e:
+            log.warning(
+                "Could not store on-chain cache entry {}: {}".format(address, e)
+            )
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def traced_slots(self, address: str) -> Set[int]:
+        """
+        :param address: The normalized account address
+        :return: The storage slots analyses read from the account at any block
+        """
+        slots: Set[int] = set()
+        try:
+            names = os.listdir(os.path.join(self.directory, address))
+        except FileNotFoundError:
+            return slots
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, address, name)) as entry:
+                    storage = json.load(entry).get("storage", {})
+                slots.update(int(slot, 16) for slot in storage)
+            except Exception:
+                continue
+        return slots
+
+
 class DynLoader:
-    """The dynamic loader class."""
+    """The dynamic loader class.
 
-    def __init__(self, eth: Optional[EthJsonRpc], active=True):
+    Everything read from the chain is remembered per account. Storage slots
+    are fetched in batch requests: a miss also fetches the slots queued by
+    prefetch(), the slots the account code reads at constant indices and, with
+    a cache directory, the slots earlier analyses read from the account. With a
+    cache directory, a repeated analysis at the same block makes no network
+    calls.
+
+    All data is read at one block number. Without an explicit block, the
+    latest block number is requested once, before the first read.
+    """
+
+    def __init__(
+        self,
+        eth: Optional[EthJsonRpc],
+        active=True,
+        block: Optional[int] = None,
+        cache_dir: Optional[str] = None,
+    ):
         """
 
         :param eth:
         :param active:
+        :param block: The block number the on-chain data is read at, the latest by default
+        :param cache_dir: Directory of the on-disk cache, keyed by account and block
         """
         self.eth = eth
         self.active = active
+        self._block = block
+        self.cache = OnChainCache(cache_dir) if cache_dir else None
+        self._accounts: Dict[str, Dict[str, Any]] = {}
+        self._prefetch: Dict[str, Set[int]] = {}
+
+    @property
+    def block(self) -> int:
+        """
+        :return: The block number the on-chain data is read at
+        """
+        if self._block is None:
+            self._block = self.eth.eth_blockNumber()
+        return self._block
+
+    def _account(self, address: str) -> Dict[str, Any]:
+        """
+        :param address: The normalized account address
+        :return: The data of the account read so far
+        """
+        account = self._accounts.get(address)
+        if account is None:
+            account = self.cache.load(address, self.block) if self.cache else {}
+            account.setdefault("storage", {})
+            self._accounts[address] = account
+            if self.cache:
+                self.prefetch(address, self.cache.traced_slots(address))
+            if "code" in account:
+                self.prefetch(address, storage_slots(Disassembly(account["code"])))
+        return account
+
+    def _store(self, address: str) -> None:
+        if self.cache:
+            self.cache.store(address, self.block, self._accounts[address])
+
+    def prefetch(self, address: str, slots) -> None:
+        """Queues storage slots to fetch with the next storage miss of the account.
+
+        :param address:
+        :param slots:
+        """
+        self._prefetch.setdefault(_normalize(address), set()).update(slots)
 
-    @functools.lru_cache(LRU_CACHE_SIZE)
     def read_storage(self, contract_address: str, index: int) -> str:
         """
 
@@ -37,14 +211,25 @@ class DynLoader:
         if not self.eth:
             raise ValueError("Cannot load from the storage when eth is None")
 
-        value = self.eth.eth_getStorageAt(
-            contract_address, position=index, block="latest"
-        )
+        address = _normalize(contract_address)
+        storage = self._account(address)["storage"]
+        if hex(index) not in storage:
+            slots = self._prefetch.pop(address, set())
+            slots.add(index)
+            slots = sorted(slot for slot in slots if hex(slot) not in storage)
+            for start in range(0, len(slots), MAX_BATCH_SIZE):
+                batch = slots[start : start + MAX_BATCH_SIZE]
+                values = self.eth.eth_getStorageAtBatch(
+                    address, positions=batch, block=self.block
+                )
+                storage.update(zip(map(hex, batch), values))
+            self._store(address)
+
+        value = storage[hex(index)]
         if value.startswith("0x"):
             value = "0x0000000000000000000000000000000000000000000000000000000000000000"
         return value
 
-    @functools.lru_cache(LRU_CACHE_SIZE)
     def read_balance(self, address: str) -> str:
         """
 
@@ -58,7 +243,25 @@ class DynLoader:
                 "Cannot load from the chain when eth is None, please use rpc, or specify infura-id"
             )
 
-        return self.eth.eth_getBalance(address)
+        normalized = _normalize(address)
+        account = self._account(normalized)
+        if "balance" not in account:
+            account["balance"] = self.eth.eth_getBalance(address, block=self.block)
+            self._store(normalized)
+        return account["balance"]
+
+    def read_code(self, address: str) -> str:
+        """
+        :param address: The account address, 0x followed by 40 hex digits
+        :return: The code of the account as returned by eth_getCode
+        """
+        normalized = _normalize(address)
+        account = self._account(normalized)
+        if "code" not in account:
+            account["code"] = self.eth.eth_getCode(address, self.block)
+            self.prefetch(normalized, storage_slots(Disassembly(account["code"])))
+            self._store(normalized)
+        return account["code"]
 
     @functools.lru_cache(LRU_CACHE_SIZE)
     def dynld(self, dependency_address: str) -> Optional[Disassembly]:
@@ -94,9 +297,19 @@ class DynLoader:
 
         log.debug("Dependency address: %s", dependency_address)
 
-        code = self.eth.eth_getCode(dependency_address)
+        code = self.read_code(dependency_address)
 
         if code.startswith("0x"):
             return None
         else:
             return Disassembly(code)
+
+
+def _normalize(address: Union[int, str]) -> str:
+    """
+    :param address: An account address as int or hex string
+    :return: The address as 0x followed by 40 lower case hex digits
+    """
+    if isinstance(address, str):
+        address = int(address, 16)
+    return "0x{:040x}".format(address)
@@ -1,26 +1,32 @@
-from mythril.support.support_utils import ModelCache
+from mythril.support.support_utils import LRUCache, ModelCache
 from mythril.support.support_args import args
-from mythril.laser.smt import Optimize, simplify, And
+from mythril.laser.smt import Optimize, Solver, simplify, And
+from mythril.laser.smt.model import Model
+from mythril.laser.smt.solver.independence_solver import slice_constraints
 from mythril.laser.ethereum.time_handler import time_handler
 from mythril.exceptions import UnsatError, SolverTimeOutException
 
+import atexit
 import logging
 import os
-import signal
 import sys
 import threading
+import z3
 
-from collections import OrderedDict
-from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures import wait
 from functools import lru_cache
-from multiprocessing.pool import ThreadPool
-from multiprocessing import TimeoutError
 from pathlib import Path
+from queue import Empty, Queue
 from time import time
-from z3 import sat, unknown, is_true
+from typing import List, Optional
+from z3 import sat, unsat, unknown
 
 log = logging.getLogger(__name__)
 
+# Seconds a query may overrun its solver timeout before it is interrupted
+INTERRUPT_GRACE = 1.0
 
 model_cache = ModelCache()
 
@@ -30,6 +36,7 @@ def solver_worker(
     minimize=(),
     maximize=(),
     solver_timeout=None,
+    ctx=None,
 ):
     """
     Returns a model based on given constraints as a tuple
@@ -37,9 +44,10 @@ def solver_worker(
     :param minimize: Tuple of minimization conditions
     :param maximize: Tuple of maximization conditions
     :param solver_timeout: The timeout for solver
+    :param ctx: The z3 context the constraints live in, defaults to the main context
     :return:
     """
-    s = Optimize()
+    s = Optimize(ctx)
     s.set_timeout(solver_timeout)
 
     for constraint in constraints:
@@ -65,6 +73,456 @@ def solver_worker(
     return result, s
 
 
+class SolverMetrics:
+    """Latency and outcome counters for the queries run by the solver executor"""
+
+    # Upper bounds (in seconds) of the latency histogram buckets
+    BUCKETS = (0.01, 0.1, 1, 10)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.query_count = 0
+        self.sat_count = 0
+        self.unsat_count = 0
+        self.unknown_count = 0
+        self.interrupt_count = 0
+        self.solver_time = 0.0
+        self.max_latency = 0.0
+        self.histogram = [0] * (len(self.BUCKETS) + 1)
+
+    def record(self, result, latency: float, interrupted: bool = False) -> None:
+        """Records the outcome and latency of a single query"""
+        with self._lock:
+            self.query_count += 1
+            if result == sat:
+                self.sat_count += 1
+            elif result == unsat:
+                self.unsat_count += 1
+            else:
+                self.unknown_count += 1
+            if interrupted:
+                self.interrupt_count += 1
+            self.solver_time += latency
+            self.max_latency = max(self.max_latency, latency)
+            bucket = 0
+            while bucket < len(self.BUCKETS) and latency > self.BUCKETS[bucket]:
+                bucket += 1
+            self.histogram[bucket] += 1
+
+    def __repr__(self):
+        mean = self.solver_time / self.query_count if self.query_count else 0
+        bounds = ["<={}s".format(bound) for bound in self.BUCKETS] + [
+            ">{}s".format(self.BUCKETS[-1])
+        ]
+        return (
+            "Queries: {} (sat {}, unsat {}, unknown {}, interrupted {})\n"
+            "Latency: total {:.3f}s, mean {:.4f}s, max {:.3f}s\n"
+            "Histogram: {}".format(
+                self.query_count,
+                self.sat_count,
+                self.unsat_count,
+                self.unknown_count,
+                self.interrupt_count,
+                self.solver_time,
+                mean,
+                self.max_latency,
+                ", ".join(
+                    "{} {}".format(bound, count)
+                    for bound, count in zip(bounds, self.histogram)
+                ),
+            )
+        )
+
+
+solver_metrics = SolverMetrics()
+
+
+def _translate(expression, ctx):
+    """Copies a mythril expression into the z3 context ctx"""
+    return type(expression)(expression.raw.translate(ctx))
+
+
+class IncrementalSolver:
+    """
+    Solver kept alive across queries in one context, holding the constraints
+    of the last query with one scope per constraint.
+
+    Path constraints of sibling states share a long prefix, so a query only
+    pops the scopes past the common prefix and pushes its own suffix.
+    """
+
+    def __init__(self, ctx):
+        """
+        :param ctx: The z3 context the solver lives in
+        """
+        self.ctx = ctx
+        self.reset()
+
+    def reset(self) -> None:
+        self.solver = Solver(self.ctx)
+        # Main context constraints, one per scope of the solver
+        self.trail: List = []
+
+    def prepare(self, constraints):
+        """
+        Diffs constraints against the trail, translating only the new suffix
+        :param constraints: List of constraints in the main context
+        :return: The number of scopes to pop and the translated suffix
+        """
+        common = 0
+        for asserted, constraint in zip(self.trail, constraints):
+            if asserted.raw.get_id() != constraint.raw.get_id():
+                break
+            common += 1
+        pops = len(self.trail) - common
+        del self.trail[common:]
+        suffix = constraints[common:]
+        self.trail.extend(suffix)
+        return pops, [_translate(c, self.ctx) for c in suffix]
+
+    def check(self, pops, suffix, solver_timeout):
+        """
+        Applies a prepared diff and checks the resulting constraints
+        :return: The check result and the solver
+        """
+        if pops:
+            self.solver.pop(pops)
+        for constraint in suffix:
+            self.solver.push()
+            self.solver.add(constraint)
+        self.solver.set_timeout(solver_timeout)
+        if args.solver_log:
+            Path(args.solver_log).mkdir(parents=True, exist_ok=True)
+            with open(
+                args.solver_log + f"/{abs(hash(tuple(self.trail)))}.smt2", "w"
+            ) as f:
+                f.write(self.solver.sexpr())
+        return self.solver.check(), self.solver
+
+
+class SolverExecutor:
+    """
+    Persistent pool of solver threads shared by all get_model queries.
+
+    Every query leases a private z3 context for the time it runs, so queries
+    can run concurrently and a timeout interrupt only cancels the query it
+    belongs to. Interrupting the main context instead would also break every
+    model created in it before, including the ones held by the model cache.
+    """
+
+    def __init__(self, workers: int = 1):
+        """
+        :param workers: The number of solver threads
+        """
+        self.workers = max(workers, 1)
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="solver"
+        )
+        self._all_contexts = [z3.Context() for _ in range(self.workers)]
+        self._contexts: Queue = Queue()
+        for ctx in self._all_contexts:
+            self._contexts.put(ctx)
+        self._incremental = {ctx: IncrementalSolver(ctx) for ctx in self._all_contexts}
+
+    def solve(self, constraints, minimize=(), maximize=(), solver_timeout=None):
+        """
+        Solves the constraints on a pool thread
+        :param constraints: List of constraints
+        :param minimize: Tuple of minimization conditions
+        :param maximize: Tuple of maximization conditions
+        :param solver_timeout: The solver timeout in milliseconds
+        :return: The check result and, if it is sat, the model in the main context
+        """
+        return self.solve_all([(constraints, minimize, maximize, solver_timeout)])[0]
+
+    def solve_all(self, queries, deadline: Optional[float] = None):
+        """
+        Solves independent queries concurrently, as many at a time as there are
+        contexts free
+        :param queries: List of (constraints, minimize, maximize, solver_timeout) tuples
+        :param deadline: Time by which all queries have to finish, the queries
+            not started by then are unknown
+        :return: The check result and model of each query, see solve
+        """
+        results: List = []
+        while len(results) < len(queries):
+            timeout_cap = None
+            if deadline is not None:
+                timeout_cap = int((deadline - time()) * 1000)
+                if timeout_cap <= 0:
+                    return results + [(unknown, None)] * (len(queries) - len(results))
+            # Waiting for a second context while holding one could deadlock with
+            # another caller, so only the first lease blocks
+            contexts = [self._contexts.get()]
+            while len(contexts) < len(queries) - len(results):
+                try:
+                    contexts.append(self._contexts.get_nowait())
+                except Empty:
+                    break
+            wave = queries[len(results) : len(results) + len(contexts)]
+            try:
+                results += self._solve_wave(contexts, wave, timeout_cap)
+            finally:
+                for ctx in contexts:
+                    self._contexts.put(ctx)
+        return results
+
+    def _solve_wave(self, contexts, wave, timeout_cap: Optional[int]):
+        jobs: List = []
+        results: List = []
+        try:
+            for ctx, (constraints, minimize, maximize, solver_timeout) in zip(
+                contexts, wave
+            ):
+                if timeout_cap is not None:
+                    solver_timeout = min(solver_timeout, timeout_cap)
+                jobs.append(
+                    self._submit(ctx, constraints, minimize, maximize, solver_timeout)
+                )
+            for ctx, job in zip(contexts, jobs):
+                results.append(self._collect(ctx, *job))
+        finally:
+            # A context goes back only once its query stopped
+            for ctx, job in list(zip(contexts, jobs))[len(results) :]:
+                ctx.interrupt()
+                wait([job[0]])
+            # The futures hold the solvers of their contexts, which must not be
+            # freed on this thread while the next query uses the context
+            job = None
+            jobs.clear()
+        return results
+
+    def _submit(self, ctx, constraints, minimize, maximize, solver_timeout):
+        begin = time()
+        # Translating touches the main context, so it stays on the calling thread
+        incremental = None
+        if args.incremental_solving and len(minimize) + len(maximize) == 0:
+            incremental = self._incremental[ctx]
+            pops, suffix = incremental.prepare(constraints)
+            future = self._pool.submit(incremental.check, pops, suffix, solver_timeout)
+        else:
+            constraints = [_translate(c, ctx) for c in constraints]
+            minimize = [_translate(e, ctx) for e in minimize]
+            maximize = [_translate(e, ctx) for e in maximize]
+            future = self._pool.submit(
+                solver_worker, constraints, minimize, maximize, solver_timeout, ctx
+            )
+        return future, incremental, begin, solver_timeout
+
+    def _collect(self, ctx, future, incremental, begin, solver_timeout):
+        interrupted = False
+        s = None
+        try:
+            try:
+                # The queries of a wave run at the same time, so the deadline
+                # counts from the submission of this one
+                remaining = begin + solver_timeout / 1000 + INTERRUPT_GRACE - time()
+                result, s = future.result(max(remaining, 0))
+            except FutureTimeoutError:
+                # z3 overran its own timeout, cancel the query instead of abandoning the thread
+                interrupted = True
+                ctx.interrupt()
+                result, s = future.result()
+                # result = sat # 超时时，返回sat
+        except Exception:
+            log.warning("Encountered an exception while solving expression using z3")
+            result = unknown
+        if incremental is not None and (interrupted or result == unknown):
+            # Do not build on a solver whose last check was cancelled or failed
+            incremental.reset()
+
+        model = None
+        if result == sat:
+            model = Model([raw.translate(z3.main_ctx()) for raw in s.model().raw])
+
+        latency = time() - begin
+        solver_metrics.record(result, latency, interrupted)
+        log.debug("Solver query finished with %s in %.4fs", result, latency)
+        return result, model
+
+    def shutdown(self) -> None:
+        """Interrupts running queries and stops the pool threads"""
+        for ctx in self._all_contexts:
+            ctx.interrupt()
+        # This is to prevent any segmentation faults from being displayed from z3
+        with open(os.devnull, "w") as dev_null_fd:
+            sys.stdout, sys.stderr = dev_null_fd, dev_null_fd
+            try:
+                self._pool.shutdown(wait=True)
+            finally:
+                sys.stdout, sys.stderr = sys.__stdout__, sys.__stderr__
+
+
+_executor_lock = threading.Lock()
+_solver_executor = None
+
+
+def solver_worker_count() -> int:
+    """Returns the number of solver threads requested through --parallel-solving"""
+    if args.parallel_solving is True:
+        return os.cpu_count() or 1
+    return max(int(args.parallel_solving or 0), 1)
+
+
+def solver_executor() -> SolverExecutor:
+    """Returns the shared solver executor, rebuilding it if the worker count changed"""
+    global _solver_executor
+    workers = solver_worker_count()
+    with _executor_lock:
+        if _solver_executor is None or _solver_executor.workers != workers:
+            if _solver_executor is not None:
+                _solver_executor.shutdown()
+            _solver_executor = SolverExecutor(workers)
+        return _solver_executor
+
+
+@atexit.register
+def _shutdown_solver_executor() -> None:
+    if _solver_executor is not None:
+        _solver_executor.shutdown()
+
+
+def _forget_solver_executor() -> None:
+    # Forked children do not inherit the solver threads; rebuild on first use
+    global _executor_lock, _solver_executor
+    _executor_lock = threading.Lock()
+    _solver_executor = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_solver_executor)
+
+
+class SliceCache:
+    """
+    Check results of independent constraint slices, shared across states.
+
+    A slice is keyed by the AST ids of its constraints. The entry keeps the
+    constraints alive, so the ids cannot be reused while it is cached.
+    """
+
+    def __init__(self, size: int = 2**12):
+        self.cache = LRUCache(size=size)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(constraints) -> frozenset:
+        return frozenset(constraint.raw.get_id() for constraint in constraints)
+
+    def get(self, constraints):
+        """
+        :return: The cached check result and model of the slice, or None
+        """
+        entry = self.cache.get(self._key(constraints))
+        if entry == -1:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1:]
+
+    def put(self, constraints, result, model) -> None:
+        self.cache.put(self._key(constraints), (tuple(constraints), result, model))
+
+    def __repr__(self):
+        return "Slice cache hits: {} \nSlice cache misses: {}".format(
+            self.hits, self.misses
+        )
+
+
+slice_cache = SliceCache()
+
+
+def solve_slices(constraints, solver_timeout):
+    """
+    Solves the independent slices of constraints, reusing cached slice results
+    :param constraints: List of constraints
+    :param solver_timeout: The solver timeout in milliseconds, shared by all slices
+    :return: The check result and, if it is sat, the combined model
+    """
+    slices = slice_constraints(constraints)
+    models: List = [None] * len(slices)
+    pending = []
+    for index, constraint_slice in enumerate(slices):
+        cached = slice_cache.get(constraint_slice)
+        if cached is None:
+            pending.append(index)
+        elif cached[0] == unsat:
+            return unsat, None
+        else:
+            models[index] = cached[1]
+
+    # The slices are independent, so they are solved together, the newest
+    # constraints first as their slice is the likeliest to be unsat
+    pending.reverse()
+    outcomes = solver_executor().solve_all(
+        [(slices[index], (), (), solver_timeout) for index in pending],
+        deadline=time() + solver_timeout / 1000,
+    )
+    found_unknown = False
+    for index, (result, model) in zip(pending, outcomes):
+        if result == unknown:
+            found_unknown = True
+            continue
+        slice_cache.put(slices[index], result, model)
+        if result == unsat:
+            return unsat, None
+        models[index] = model
+    if found_unknown:
+        return unknown, None
+
+    if len(models) == 1:
+        return sat, models[0]
+    return sat, Model([raw for model in models for raw in model.raw])
+
+
+def get_models(queries, solver_timeout=None):
+    """
+    Solves independent queries together, so that they run in parallel with
+    --parallel-solving
+    :param queries: List of (constraints, minimize) tuples
+    :param solver_timeout: The solver timeout of each query
+    :return: For each query its model, or the UnsatError or
+    SolverTimeOutException it raised
+    """
+    solver_timeout = solver_timeout or args.solver_timeout
+    solver_timeout = min(solver_timeout, time_handler.time_remaining())
+    outcomes: List = [None] * len(queries)
+    pending = []
+    for index, (constraints, minimize) in enumerate(queries):
+        if solver_timeout <= 0:
+            outcomes[index] = SolverTimeOutException()
+        elif any(
+            isinstance(constraint, bool) and not constraint
+            for constraint in constraints
+        ):
+            outcomes[index] = UnsatError()
+        else:
+            if isinstance(constraints, tuple) is False:
+                constraints = constraints.get_all_constraints()
+            constraints = [
+                constraint
+                for constraint in constraints
+                if isinstance(constraint, bool) is False
+            ]
+            pending.append((index, (constraints, minimize, (), solver_timeout)))
+
+    results = solver_executor().solve_all([query for _, query in pending])
+    for (index, _), (result, model) in zip(pending, results):
+        if result == sat:
+            model_cache.put(model, 1)
+            outcomes[index] = model
+        elif result == unknown:
+            log.debug("Timeout/Error encountered while solving expression using z3")
+            outcomes[index] = SolverTimeOutException()
+        else:
+            outcomes[index] = UnsatError()
+    return outcomes
+
+
 @lru_cache(maxsize=2**23)
 def get_model(
     constraints,
@@ -74,7 +532,7 @@ def get_model(
 ):
     """
     Returns a model based on given constraints as a tuple
-    :param constraints: Tuple of constraints
+    :param constraints: Tuple of constraints or a Constraints chain
     :param minimize: Tuple of minimization conditions
     :param maximize: Tuple of maximization conditions
     :param solver_timeout: The solver timeout
@@ -89,7 +547,10 @@ def get_model(
         if isinstance(constraint, bool) and not constraint:
             raise UnsatError
 
+    conjunction = None
     if isinstance(constraints, tuple) is False:
+        # A constraint chain keeps the conjunction of its prefixes across forks
+        conjunction = constraints.conjunction
         constraints = constraints.get_all_constraints()
     constraints = [
         constraint
@@ -98,33 +559,25 @@ def get_model(
     ]
 
     if len(maximize) + len(minimize) == 0:
-        ret_model = model_cache.check_quick_sat(simplify(And(*constraints)).raw)
+        if conjunction is not None:
+            # The last constraint is the keccak condition appended by get_all_constraints
+            query = z3.simplify(z3.And(conjunction, constraints[-1].raw))
+        else:
+            query = simplify(And(*constraints)).raw
+        ret_model = model_cache.check_quick_sat(query)
         if ret_model:
             return ret_model
-    pool = ThreadPool(1)
-    try:
-        thread_result = pool.apply_async(
-            solver_worker, args=(constraints, minimize, maximize, solver_timeout)
+
+    if len(maximize) + len(minimize) == 0 and not args.incremental_solving:
+        result, model = solve_slices(constraints, solver_timeout)
+    else:
+        result, model = solver_executor().solve(
+            constraints, minimize, maximize, solver_timeout
         )
-        try:
-            result, s = thread_result.get(solver_timeout)
-        except TimeoutError:
-            result = unknown
-            # result = sat # 超时时，返回sat
-        except Exception:
-            log.warning("Encountered an exception while solving expression using z3")
-            result = unknown
-    finally:
-        # This is to prevent any segmentation faults from being displayed from z3
-        sys.stdout = open(os.devnull, "w")
-        sys.stderr = open(os.devnull, "w")
-        pool.terminate()
-        sys.stdout = sys.__stdout__
-        sys.stderr = sys.__stderr__
 
     if result == sat:
-        model_cache.model_cache.put(s.model(), 1)
-        return s.model()
+        model_cache.put(model, 1)
+        return model
     elif result == unknown:
         log.debug("Timeout/Error encountered while solving expression using z3")
         raise SolverTimeOutException
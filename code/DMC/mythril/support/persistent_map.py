@@ -0,0 +1,99 @@
+"""This module contains an immutable hash map whose updates share structure.
+
+PersistentMap is a hash array mapped trie: the hash of a key picks one of 32
+children on every level, 5 bits at a time. set() copies only the nodes on the
+path to the key, so a map is copied in O(1) by sharing it, and states forked
+from a common ancestor share everything they did not change since.
+"""
+
+from typing import Any, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+_BITS = 5
+_WIDTH = 1 << _BITS
+_MASK = _WIDTH - 1
+_HASH_MASK = (1 << 64) - 1
+
+_MISSING = object()
+
+
+class _Leaf:
+    """The entries of the keys with one hash, more than one only on full hash collisions"""
+
+    __slots__ = ("hash", "entries")
+
+    def __init__(self, key_hash: int, entries: Tuple[Tuple[Hashable, Any], ...]) -> None:
+        self.hash = key_hash
+        self.entries = entries
+
+
+def _set(node, key_hash: int, key: Hashable, value: Any, shift: int) -> Tuple[Any, bool]:
+    """
+    :return: The new node and whether the key was added
+    """
+    if node is None:
+        return _Leaf(key_hash, ((key, value),)), True
+    if isinstance(node, _Leaf):
+        if node.hash == key_hash:
+            entries = tuple(entry for entry in node.entries if entry[0] != key)
+            added = len(entries) == len(node.entries)
+            return _Leaf(key_hash, entries + ((key, value),)), added
+        # Two hashes in one slot, move the leaf one level down
+        children = [None] * _WIDTH
+        children[(node.hash >> shift) & _MASK] = node
+        node = tuple(children)
+    index = (key_hash >> shift) & _MASK
+    child, added = _set(node[index], key_hash, key, value, shift + _BITS)
+    return node[:index] + (child,) + node[index + 1 :], added
+
+
+class PersistentMap(Generic[V]):
+    """An immutable mapping, set() returns a new map and leaves this one unchanged"""
+
+    __slots__ = ("_root", "_size")
+
+    def __init__(self, _root=None, _size: int = 0) -> None:
+        self._root = _root
+        self._size = _size
+
+    def get(self, key: Hashable, default: Optional[V] = None) -> Optional[V]:
+        """
+        :param key: The key to look up
+        :param default: Returned if the key is missing
+        :return: The value of the key
+        """
+        key_hash = hash(key) & _HASH_MASK
+        node = self._root
+        shift = 0
+        while node is not None:
+            if isinstance(node, _Leaf):
+                if node.hash == key_hash:
+                    for entry_key, value in node.entries:
+                        if entry_key == key:
+                            return value
+                return default
+            node = node[(key_hash >> shift) & _MASK]
+            shift += _BITS
+        return default
+
+    def set(self, key: Hashable, value: V) -> "PersistentMap[V]":
+        """
+        :param key: The key to set
+        :param value: The value of the key
+        :return: A map with the key set to value
+        """
+        root, added = _set(self._root, hash(key) & _HASH_MASK, key, value, 0)
+        return PersistentMap(root, self._size + added)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __getitem__(self, key: Hashable) -> V:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __len__(self) -> int:
+        return self._size
@@ -0,0 +1,103 @@
+"""This module contains a content-addressed on-disk cache of analysis results."""
+
+import hashlib
+import inspect
+import json
+import logging
+import os
+import pickle
+import tempfile
+from typing import Any, Dict, Iterable, Optional
+
+from mythril.__version__ import __version__
+
+log = logging.getLogger(__name__)
+
+# Bump when the layout of the cached entries changes
+CACHE_FORMAT = 1
+
+
+def detector_version(modules: Iterable[Any]) -> str:
+    """Fingerprints the given detection modules.
+
+    Module configuration such as the DefiCheck flags lives in the module
+    sources, so any edit to a detector invalidates the results it produced.
+
+    :param modules: The detection module instances taking part in the analysis
+    :return: Hex digest over the mythril version and the module sources
+    """
+    digest = hashlib.sha256(__version__.encode())
+    for path in sorted({inspect.getsourcefile(type(module)) for module in modules}):
+        digest.update(path.encode())
+        with open(path, "rb") as source:
+            digest.update(source.read())
+    return digest.hexdigest()
+
+
+def result_key(code_hash: str, options: Dict[str, Any], version: str) -> str:
+    """
+    :param code_hash: Hash of the analysed bytecode
+    :param options: Analysis options that influence the results, JSON serializable
+    :param version: The detector version, see detector_version()
+    :return: The cache key of the analysis
+    """
+    payload = json.dumps(
+        [CACHE_FORMAT, code_hash, options, version], sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Pickled analysis results stored under <directory>/<key[:2]>/<key>.pickle.
+    Entries are written to a temporary file and renamed into place, so
+    concurrent analyses sharing a directory never read a partial entry.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ".pickle")
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        :param key: The cache key
+        :return: The cached value or None
+        """
+        try:
+            with open(self._path(key), "rb") as entry:
+                value = pickle.load(entry)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            log.warning("Ignoring unreadable result cache entry {}: {}".format(key, e))
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """
+        :param key: The cache key
+        :param value: The picklable value to store
+        """
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as entry:
+                pickle.dump(value, entry)
+            os.replace(temp_path, path)
+        except Exception as e:
+            log.warning("Could not store result cache entry {}: {}".format(key, e))
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def __repr__(self):
+        return "Result cache at {}: {} hits, {} misses".format(
+            self.directory, self.hits, self.misses
+        )
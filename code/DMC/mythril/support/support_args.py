@@ -1,4 +1,4 @@
-from typing import List
+from typing import Dict, List, Optional
 from mythril.support.support_utils import Singleton
 
 
@@ -13,8 +13,17 @@ class Args(object, metaclass=Singleton):
         self.pruning_factor = None
         self.unconstrained_storage = False
         self.parallel_solving = False
+        self.incremental_solving = False
         self.call_depth_limit = 3
         self.disable_iprof = False
+        self.disable_block_stepping = False
+        self.exploration_allow: Dict[str, List[str]] = {}
+        self.exploration_deny: Dict[str, List[str]] = {}
+        self.function_time_budget: Optional[float] = None
+        self.function_state_budget: Optional[int] = None
+        self.function_solver_budget: Optional[int] = None
+        self.transaction_workers = 0
+        self.state_workers = 0
         self.solver_log = None
         self.transaction_sequences: List[List[str]] = None
         self.use_integer_module = True
@@ -1,11 +1,18 @@
 """This module contains utility functions for the Mythril support package."""
 
 from collections import OrderedDict
-from copy import deepcopy
 from eth_hash.auto import keccak
 from functools import lru_cache
-from typing import Dict
-from z3 import is_true, simplify, And
+from typing import Dict, Set
+from z3 import (
+    Z3_OP_UNINTERPRETED,
+    is_app,
+    is_false,
+    is_quantifier,
+    is_true,
+    simplify,
+    And,
+)
 import logging
 
 log = logging.getLogger(__name__)
@@ -53,21 +60,104 @@ class LRUCache:
         self.lru_cache[key] = value
 
 
+def free_decl_names(expression) -> Set[str]:
+    """Returns the names of the uninterpreted constants and functions in expression"""
+    names: Set[str] = set()
+    seen = set()
+    stack = [expression]
+    while stack:
+        current = stack.pop()
+        if current.get_id() in seen:
+            continue
+        seen.add(current.get_id())
+        if is_quantifier(current):
+            stack.append(current.body())
+            continue
+        if not is_app(current):
+            continue
+        if current.decl().kind() == Z3_OP_UNINTERPRETED:
+            names.add(current.decl().name())
+        stack.extend(current.children())
+    return names
+
+
 class ModelCache:
+    """
+    LRU cache of satisfying models, used to answer satisfiability queries
+    without the solver.
+
+    Models are indexed by the names of the variables they assign. A query is
+    evaluated against the cached models in LRU order: models that assign the
+    query's variables are evaluated in place, and a model that assigns none
+    of them is equivalent to model completion alone, so only one such model
+    is ever evaluated per query.
+    """
+
     def __init__(self):
         self.model_cache = LRUCache(size=100)
+        self._decl_index: Dict[str, Set] = {}
+        self._model_decls: Dict = {}
+        self.hits = 0
+        self.misses = 0
 
-    @lru_cache(maxsize=2**10)
     def check_quick_sat(self, constraints) -> bool:
+        query_decls = free_decl_names(constraints)
+        coverage: Dict = {}
+        for name in query_decls:
+            for model in self._decl_index.get(name, ()):
+                coverage[model] = coverage.get(model, 0) + 1
+
+        completion_checked = False
         for model in reversed(self.model_cache.lru_cache.keys()):
-            model_copy = deepcopy(model)
-            if is_true(model_copy.eval(constraints, model_completion=True)):
+            if model not in coverage:
+                if completion_checked:
+                    continue
+                completion_checked = True
+            if self._satisfies(model, constraints):
                 self.model_cache.put(model, self.model_cache.get(model) + 1)
+                self.hits += 1
                 return model
+        self.misses += 1
         return False
 
+    def _satisfies(self, model, constraints) -> bool:
+        result = model.eval(constraints)
+        if is_true(result):
+            return True
+        if result is None or is_false(result):
+            return False
+        # Some variables are left open. Model completion adds their default values
+        # to the model, the values any later completion would choose as well, so
+        # it runs on the cached model and only the index has to learn them
+        result = model.eval(constraints, model_completion=True)
+        self._index(model)
+        return is_true(result)
+
     def put(self, key, value):
+        lru_cache = self.model_cache.lru_cache
+        if key not in lru_cache and len(lru_cache) >= self.model_cache.size:
+            self._unindex(next(iter(lru_cache)))
         self.model_cache.put(key, value)
+        if key not in self._model_decls:
+            self._index(key)
+
+    def _index(self, model) -> None:
+        names = {decl.name() for decl in model.decls()}
+        self._model_decls[model] = names
+        for name in names:
+            self._decl_index.setdefault(name, set()).add(model)
+
+    def _unindex(self, model) -> None:
+        for name in self._model_decls.pop(model, ()):
+            models = self._decl_index[name]
+            models.discard(model)
+            if not models:
+                del self._decl_index[name]
+
+    def __repr__(self):
+        return "Model cache hits: {} \nModel cache misses: {}".format(
+            self.hits, self.misses
+        )
 
 
 @lru_cache(maxsize=2**10)
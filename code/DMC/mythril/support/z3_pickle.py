@@ -0,0 +1,110 @@
+"""This module pickles objects that hold z3 expressions, such as global states.
+
+z3 objects cannot be pickled themselves. The pickler below keeps them out of
+the pickle stream and writes all of them in one SMT-LIB2 script instead, so
+subterms shared between expressions are written once. Unpickling parses the
+script in the main context, where z3 hash-conses the parsed terms, so they are
+the same ASTs a process building the same expressions would get.
+"""
+
+import io
+import pickle
+from typing import Any, Dict, List, Tuple
+
+import z3
+
+
+def _sort_key(sort: z3.SortRef) -> Tuple:
+    if sort.kind() == z3.Z3_BV_SORT:
+        return ("bv", sort.size())
+    if sort.kind() == z3.Z3_BOOL_SORT:
+        return ("bool",)
+    if sort.kind() == z3.Z3_ARRAY_SORT:
+        return ("array", _sort_key(sort.domain()), _sort_key(sort.range()))
+    raise pickle.PicklingError("Cannot pickle z3 sort {}".format(sort))
+
+
+def _sort(key: Tuple) -> z3.SortRef:
+    if key[0] == "bv":
+        return z3.BitVecSort(key[1])
+    if key[0] == "bool":
+        return z3.BoolSort()
+    return z3.ArraySort(_sort(key[1]), _sort(key[2]))
+
+
+class _Pickler(pickle.Pickler):
+    def __init__(self, file) -> None:
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.expressions: List[z3.ExprRef] = []
+        self._indexes: Dict[int, int] = {}
+
+    def persistent_id(self, obj) -> Any:
+        if isinstance(obj, z3.ExprRef):
+            if obj.ctx != z3.main_ctx():
+                obj = obj.translate(z3.main_ctx())
+            # The ids are unique while self.expressions keeps the expressions alive
+            index = self._indexes.get(obj.get_id())
+            if index is None:
+                index = self._indexes[obj.get_id()] = len(self.expressions)
+                self.expressions.append(obj)
+            return ("expr", index)
+        if isinstance(obj, z3.FuncDeclRef):
+            return (
+                "decl",
+                obj.name(),
+                tuple(_sort_key(obj.domain(i)) for i in range(obj.arity())),
+                _sort_key(obj.range()),
+            )
+        if isinstance(obj, z3.SortRef):
+            return ("sort", _sort_key(obj))
+        if isinstance(obj, z3.AstRef):
+            raise pickle.PicklingError("Cannot pickle z3 object {}".format(type(obj)))
+        return None
+
+
+class _Unpickler(pickle.Unpickler):
+    def __init__(self, file, expressions: List[z3.ExprRef]) -> None:
+        super().__init__(file)
+        self.expressions = expressions
+
+    def persistent_load(self, pid) -> Any:
+        if pid[0] == "expr":
+            return self.expressions[pid[1]]
+        if pid[0] == "decl":
+            return z3.Function(pid[1], *[_sort(key) for key in pid[2]], _sort(pid[3]))
+        if pid[0] == "sort":
+            return _sort(pid[1])
+        raise pickle.UnpicklingError("Unknown persistent id {}".format(pid))
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    :param obj: The object to pickle, the z3 expressions in it may be of any context
+    :return: The pickled object
+    """
+    stream = io.BytesIO()
+    pickler = _Pickler(stream)
+    pickler.dump(obj)
+    script = ""
+    if pickler.expressions:
+        # Any expression can be asserted as e == e, whatever its sort. A single
+        # assertion lets the script share subterms between all of them.
+        solver = z3.Solver()
+        solver.add(z3.And([expression == expression for expression in pickler.expressions]))
+        script = solver.sexpr()
+    return pickle.dumps((stream.getvalue(), script), pickle.HIGHEST_PROTOCOL)
+
+
+def loads(data: bytes) -> Any:
+    """
+    :param data: An object pickled with dumps()
+    :return: The object, its z3 expressions are in the main context
+    """
+    stream, script = pickle.loads(data)
+    expressions = []
+    if script:
+        conjunction = z3.parse_smt2_string(script)[0]
+        expressions = [
+            conjunction.arg(i).arg(0) for i in range(conjunction.num_args())
+        ]
+    return _Unpickler(io.BytesIO(stream), expressions).load()
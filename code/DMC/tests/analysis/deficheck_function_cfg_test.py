@@ -0,0 +1,121 @@
+from types import SimpleNamespace
+
+from mythril.analysis.module.modules.DefiCheck3 import Node, NodeStore, NodeType
+from mythril.laser.ethereum.state.constraints import Constraints
+from mythril.laser.ethereum.time_handler import time_handler
+from mythril.laser.smt import symbol_factory
+
+
+def _node(uid, opcode, offset=0, parent=None, exit_uid=None):
+    node_type = (
+        NodeType.ENTRY_OR_EXIT_POINT if opcode == "" else NodeType.CONTROL_FLOW
+    )
+    return SimpleNamespace(
+        uid=uid,
+        opcode=opcode,
+        offset=offset,
+        function_name="airdrop(address[])",
+        tx_id=1,
+        node_type=node_type,
+        symbol_vars=[],
+        successors=[] if exit_uid is None else [exit_uid],
+        predecessors_list=[[] if parent is None else [parent]],
+        cfg_uid_info=[uid * 10],
+    )
+
+
+def _store():
+    # entry -> JUMPI -> (JUMPDEST@7 -> JUMPI)x3 -> JUMP -> exit, the first JUMPI also leaves the function
+    nodes = [_node(0, ""), _node(1, ""), _node(2, "JUMPI", offset=5, parent=0, exit_uid=1)]
+    parent = 2
+    for uid in range(3, 9, 2):
+        nodes.append(_node(uid, "JUMPDEST", offset=7, parent=parent))
+        nodes.append(_node(uid + 1, "JUMPI", offset=9, parent=uid))
+        parent = uid + 1
+    nodes.append(_node(9, "JUMP", offset=12, parent=parent, exit_uid=1))
+    store = NodeStore()
+    for node in nodes:
+        for parent in node.predecessors_list[0]:
+            store[parent].successors.append(node.uid)
+        store[node.uid] = node
+    return store
+
+
+def test_paths_and_loops_come_from_the_dominator_tree():
+    # Arrange
+    store = _store()
+
+    # Act
+    cfg = Node.function_cfg(store, "airdrop(address[])")
+
+    # Assert
+    assert cfg.paths == {2: [0, 2], 9: [0, 2, 3, 4, 5, 6, 7, 8, 9]}
+    assert cfg.idom[3] == 2 and cfg.idom[9] == 8 and 0 not in cfg.idom
+    assert not cfg.has_loop(2)
+    assert cfg.loops[9] == {7: [3, 5, 7]}
+    assert cfg.loop_range(9) == (3, 7)
+    assert cfg.loop_body(9) == [3, 4, 5, 6, 7]
+    # A JUMPI right before a JUMPDEST shares the basic block info of its branch
+    assert cfg.block_paths[1] == [0, 30, 50, 70, 90]
+
+
+def test_function_cfg_is_built_again_after_the_graph_changes():
+    # Arrange
+    store = _store()
+    first = Node.function_cfg(store, "airdrop(address[])")
+
+    # Act
+    cached = Node.function_cfg(store, "airdrop(address[])")
+    store[8].successors.append(10)
+    store[10] = _node(10, "JUMPDEST", offset=7, parent=8, exit_uid=1)
+    rebuilt = Node.function_cfg(store, "airdrop(address[])")
+
+    # Assert
+    assert cached is first
+    assert rebuilt is not first
+    assert rebuilt.loops[10] == {7: [3, 5, 7, 10]}
+
+
+def _business_node(uid, opcode, constraints):
+    sender = symbol_factory.BitVecSym("sender", 256)
+    state = SimpleNamespace(
+        function_name="airdrop(address[])",
+        contract_name="Token",
+        bytecode="",
+        sender=sender,
+        address=uid,
+        gas_used=(0, 0),
+        constraints=None
+        if constraints is None
+        else Constraints([sender == symbol_factory.BitVecVal(5, 256)]),
+    )
+    return SimpleNamespace(
+        uid=uid,
+        opcode=opcode,
+        offset=uid,
+        function_name="airdrop(address[])",
+        tx_id=1,
+        node_type=NodeType.UNKNOWN,
+        symbol_vars=[],
+        state=state,
+        call_func_signature=None,
+    )
+
+
+def test_airdrop_paths_ending_in_a_log_node_are_checked():
+    # Arrange
+    store = _store()
+    # A CALL restricted to one sender, the path ends in a LOG node without constraints
+    store[20] = _business_node(20, "CALL", constraints=True)
+    store[21] = _business_node(21, "LOG1", constraints=None)
+    func_name = "airdrop(address[])"
+    cfg = Node.function_cfg(store, func_name)
+    time_handler.start_execution(100)
+
+    # Act
+    issues = Node.detect_airdrop_correctness(
+        store, [func_name], {func_name: cfg.paths}, {func_name: [[20], [20, 21]]}
+    )
+
+    # Assert
+    assert issues == []
@@ -0,0 +1,75 @@
+import z3
+
+from mythril.analysis.module.modules import DefiCheck3 as deficheck
+from mythril.analysis.module.modules.DefiCheck3 import filter_symbol_var, is_address_mask
+from mythril.laser.ethereum.state.calldata import SymbolicCalldata
+from mythril.laser.smt import BitVec, symbol_factory
+
+
+def test_address_mask_forms_are_filtered():
+    # Arrange
+    folded = symbol_factory.BitVecVal(2 ** 160 - 1, 256)
+    subtracted = BitVec(z3.BitVecVal(2 ** 160, 256) - z3.BitVecVal(1, 256))
+    added = BitVec(z3.BitVecVal(2 ** 160, 256) + z3.BitVecVal(2 ** 256 - 1, 256))
+
+    # Act
+    results = [filter_symbol_var(var) for var in (folded, subtracted, added)]
+
+    # Assert
+    assert results == ["", "", ""]
+
+
+def test_other_terms_keep_their_expression():
+    # Arrange
+    word = SymbolicCalldata(1).get_word_at(4)
+    other_mask = symbol_factory.BitVecVal(2 ** 160, 256)
+
+    # Act
+    word_expr = filter_symbol_var(word)
+    mask_expr = filter_symbol_var(other_mask)
+
+    # Assert
+    assert word_expr == str(word.raw)
+    assert mask_expr == str(other_mask.raw)
+    assert not is_address_mask(word.raw)
+
+
+def test_large_terms_keep_their_expression():
+    # Arrange
+    calldata = SymbolicCalldata(1)
+    total = calldata.get_word_at(4)
+    for offset in range(36, 132, 32):
+        total = total + calldata.get_word_at(offset)
+
+    # Act
+    result = filter_symbol_var(total)
+
+    # Assert
+    assert result == str(total.raw)
+
+
+def test_terms_are_not_limited_by_size(monkeypatch):
+    # Arrange
+    calldata = SymbolicCalldata(1)
+    words = [calldata.get_word_at(4 + 32 * i).raw for i in range(20)]
+    packed = BitVec(z3.Concat(*words))
+    monkeypatch.setattr(deficheck, "mask_filter_timeout", 60)
+
+    # Act
+    result = filter_symbol_var(packed)
+
+    # Assert
+    # Over 5000 syntax tree nodes, only the printing time counts
+    assert result == str(packed.raw)
+
+
+def test_terms_printing_past_the_time_limit_are_skipped(monkeypatch):
+    # Arrange
+    word = SymbolicCalldata(1).get_word_at(4)
+    monkeypatch.setattr(deficheck, "mask_filter_timeout", 0)
+
+    # Act
+    result = filter_symbol_var(word)
+
+    # Assert
+    assert result == ""
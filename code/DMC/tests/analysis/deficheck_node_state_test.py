@@ -0,0 +1,70 @@
+from copy import copy
+
+from mythril.analysis.module.modules.DefiCheck3 import NodeState, ret_issues
+from mythril.disassembler.disassembly import Disassembly
+from mythril.laser.ethereum.call import SymbolicCalldata
+from mythril.laser.ethereum.cfg import Node
+from mythril.laser.ethereum.state.account import Account
+from mythril.laser.ethereum.state.environment import Environment
+from mythril.laser.ethereum.state.global_state import GlobalState
+from mythril.laser.ethereum.state.machine_state import MachineState
+from mythril.laser.ethereum.state.world_state import WorldState
+from mythril.laser.smt import symbol_factory
+
+
+def get_global_state():
+    active_account = Account(
+        "0x0", code=Disassembly("5b600160020100"), contract_name="Token"
+    )
+    environment = Environment(
+        active_account,
+        symbol_factory.BitVecSym("sender", 256),
+        SymbolicCalldata("2"),
+        None,
+        None,
+        None,
+        None,
+    )
+    environment.active_function_name = "transfer(address,uint256)"
+    world_state = WorldState()
+    world_state.put_account(active_account)
+    global_state = GlobalState(
+        world_state, environment, Node("Token"), MachineState(gas_limit=8000000)
+    )
+    # The basic block starts at the JUMPDEST, the node is created at the ADD
+    global_state.node.states.append(copy(global_state))
+    global_state.world_state.constraints.append(
+        symbol_factory.BitVecSym("x", 256) > 1
+    )
+    global_state.mstate.pc = 3
+    return global_state
+
+
+def test_node_state_keeps_what_the_handlers_use():
+    # Arrange
+    global_state = get_global_state()
+
+    # Act
+    node_state = NodeState(global_state)
+    without_constraints = NodeState(global_state, keep_constraints=False)
+
+    # Assert
+    assert not hasattr(node_state, "__dict__")
+    assert node_state.address == 5
+    assert node_state.block_start == (0, "JUMPDEST")
+    assert node_state.constraints is global_state.world_state.constraints
+    assert without_constraints.constraints is None
+
+
+def test_issues_are_reported_from_the_node_state():
+    # Arrange
+    node_state = NodeState(get_global_state())
+
+    # Act
+    issue = ret_issues(node_state, description_tail="tail")
+
+    # Assert
+    assert issue.contract == "Token"
+    assert issue.function == "transfer(address,uint256)"
+    assert issue.address == 5
+    assert issue.description_head == "transfer(address,uint256)"
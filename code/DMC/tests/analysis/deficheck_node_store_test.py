@@ -0,0 +1,186 @@
+from types import SimpleNamespace
+
+from mythril.analysis.module.modules.DefiCheck3 import Node, NodeStore, NodeType
+from mythril.laser.smt import symbol_factory
+
+
+def _node(uid, opcode, offset=0, function_name="f()", tx_id=1, target=None):
+    node_type = (
+        NodeType.ENTRY_OR_EXIT_POINT if opcode == "" else NodeType.CONTROL_FLOW
+    )
+    symbol_vars = [] if target is None else [target]
+    return SimpleNamespace(
+        uid=uid,
+        opcode=opcode,
+        offset=offset,
+        function_name=function_name,
+        tx_id=tx_id,
+        node_type=node_type,
+        symbol_vars=symbol_vars,
+    )
+
+
+def _store(*nodes):
+    store = NodeStore()
+    for node in nodes:
+        store[node.uid] = node
+    return store
+
+
+def test_latest_filters_function_tx_and_uid():
+    # Arrange
+    store = _store(
+        _node(0, ""),
+        _node(1, "JUMPDEST", offset=10),
+        _node(2, "JUMPDEST", offset=20, function_name="g()"),
+        _node(3, "JUMPDEST", offset=30, tx_id=2),
+        _node(4, "JUMPDEST", offset=40),
+        _node(5, "JUMPDEST", offset=50),
+    )
+
+    # Act
+    uids = list(store.latest("f()", 1, "JUMPDEST", 5))
+
+    # Assert
+    assert uids == [4, 1]
+
+
+def test_at_offset_and_global_opcode_index():
+    # Arrange
+    store = _store(
+        _node(0, "JUMPDEST", offset=10),
+        _node(1, "JUMPDEST", offset=12),
+        _node(2, "JUMPDEST", offset=10, function_name="g()"),
+        _node(3, "JUMPDEST", offset=10),
+    )
+
+    # Act
+    at_offset = list(store.at_offset("f()", 1, "JUMPDEST", 10, 4))
+    everywhere = list(store.with_opcode("JUMPDEST", 3))
+
+    # Assert
+    assert at_offset == [3, 0]
+    assert everywhere == [2, 1, 0]
+
+
+def test_jumps_to_uses_concrete_targets_and_jumpi_fallthrough():
+    # Arrange
+    symbolic = symbol_factory.BitVecSym("target", 256)
+    store = _store(
+        _node(0, "JUMP", offset=5, target=symbol_factory.BitVecVal(40, 256)),
+        _node(1, "JUMPI", offset=39, target=symbol_factory.BitVecVal(80, 256)),
+        _node(2, "JUMP", offset=60, target=symbolic),
+        _node(3, "JUMPI", offset=70, target=symbol_factory.BitVecVal(40, 256)),
+    )
+
+    # Act
+    to_40 = list(store.jumps_to("f()", 1, 40, 4))
+    to_80 = list(store.jumps_to("f()", 1, 80, 4))
+    to_61 = list(store.jumps_to("f()", 1, 61, 4))
+
+    # Assert
+    assert to_40 == [3, 1, 0]
+    assert to_80 == [1]
+    assert to_61 == []
+
+
+def test_entry_uid_is_first_entry_and_clear_resets_indexes():
+    # Arrange
+    store = _store(_node(0, ""), _node(1, ""), _node(2, "JUMPDEST"))
+
+    # Act
+    entry = store.entry_uid("f()")
+    store.clear()
+
+    # Assert
+    assert entry == 0
+    assert store.entry_uid("f()") is None
+    assert list(store.with_opcode("JUMPDEST", 3)) == []
+
+
+def test_entry_exit_registry():
+    # Arrange
+    store = _store(_node(0, ""), _node(1, ""), _node(2, "", function_name="g()"))
+
+    # Act
+    f_pair = store.entry_exit("f()")
+    g_pair = store.entry_exit("g()")
+    missing = store.entry_exit("h()")
+
+    # Assert
+    assert f_pair == (0, 1)
+    assert g_pair == (2, -1)
+    assert missing == (-1, -1)
+
+
+def test_deleted_entry_nodes_are_skipped():
+    # Arrange
+    store = _store(_node(0, ""), _node(1, ""), _node(2, ""), _node(3, "JUMPDEST"))
+
+    # Act
+    store[0].node_type = NodeType.DELETED
+
+    # Assert
+    assert store.entry_uid("f()") == 1
+    assert store.entry_exit("f()") == (1, 2)
+
+
+def test_pending_post_node_returns_oldest_flagged_node():
+    # Arrange
+    nodes = [_node(uid, "AND") for uid in range(4)]
+    for node, post_flag in zip(nodes, [False, True, True, False]):
+        node.post_flag = post_flag
+    store = _store(*nodes)
+
+    # Act
+    first = store.pending_post_node()
+    first.post_flag = False
+    second = store.pending_post_node()
+    second.post_flag = False
+    third = store.pending_post_node()
+
+    # Assert
+    assert first.uid == 1
+    assert second.uid == 2
+    assert third is None
+
+
+def test_function_uids_include_entry_nodes_in_order():
+    # Arrange
+    store = _store(
+        _node(0, ""),
+        _node(1, "", function_name="g()"),
+        _node(2, "JUMPDEST"),
+        _node(3, "JUMPDEST", function_name="g()"),
+    )
+
+    # Act
+    f_uids = store.function_uids("f()")
+    missing = store.function_uids("h()")
+
+    # Assert
+    assert f_uids == [0, 2]
+    assert missing == []
+
+
+def test_provenance_queries_are_remembered_until_the_graph_changes():
+    # Arrange
+    entry = _node(0, "")
+    calldata = _node(1, "CALLDATALOAD")
+    sha3 = _node(2, "SHA3")
+    for node, predecessors_list in ((entry, [[]]), (calldata, [[0]]), (sha3, [[1]])):
+        node.predecessors_list = predecessors_list
+    store = _store(entry, calldata, sha3)
+    first = Node.find_start_node_ids(store, [2], ret_SHA3_count=True)
+    first[0].append(99)
+
+    # Act
+    second = Node.find_start_node_ids(store, [2], ret_SHA3_count=True)
+    cached = len(store._provenance)
+    store[3] = _node(3, "SLOAD")
+    after_insert = len(store._provenance)
+
+    # Assert
+    assert second == ([1], [2])
+    assert cached == 1
+    assert after_insert == 0
@@ -0,0 +1,45 @@
+import os
+
+from mythril.analysis.module.modules import DefiCheck3 as deficheck
+from mythril.analysis.module.modules.DefiCheck3 import DefiCheck3, FunctionType, NodeStore
+
+FUNC_NAMES = ["constructor", "approve(address,uint256)", "transfer(address,uint256)", "fallback"]
+
+
+class _Detector(DefiCheck3):
+    def check_func_type(self, Func_name, nodes, flag_detailed=False):
+        print("checked", Func_name)
+        return FunctionType.UNKNOWN, {Func_name: os.getpid()}
+
+
+def _run(capsys):
+    results = list(_Detector().iter_func_types(FUNC_NAMES, NodeStore()))
+    return results, capsys.readouterr().out
+
+
+def test_parallel_types_are_merged_in_function_order(monkeypatch, capsys):
+    # Arrange
+    monkeypatch.setattr(deficheck, "post_analysis_workers", 0)
+    sequential, sequential_out = _run(capsys)
+    monkeypatch.setattr(deficheck, "post_analysis_workers", 2)
+
+    # Act
+    parallel, parallel_out = _run(capsys)
+
+    # Assert
+    assert [name for name, _, _ in parallel] == FUNC_NAMES
+    assert parallel_out == sequential_out
+    assert all(identity_dict[name] != os.getpid() for name, _, identity_dict in parallel)
+    assert all(identity_dict[name] == os.getpid() for name, _, identity_dict in sequential)
+
+
+def test_single_function_stays_in_process(monkeypatch, capsys):
+    # Arrange
+    monkeypatch.setattr(deficheck, "post_analysis_workers", 4)
+
+    # Act
+    results = list(_Detector().iter_func_types(FUNC_NAMES[:1], NodeStore()))
+
+    # Assert
+    assert results == [("constructor", FunctionType.UNKNOWN, {"constructor": os.getpid()})]
+    assert capsys.readouterr().out == "checked constructor\n"
@@ -0,0 +1,128 @@
+import pytest
+import z3
+
+from mythril.analysis.module.modules.DefiCheck3 import (
+    Node,
+    Role,
+    check_roles,
+    identity_extract,
+    symbol_var_key,
+    symbol_var_preprocess,
+)
+from mythril.laser.ethereum.state.calldata import SymbolicCalldata
+from mythril.laser.smt import BitVec, Concat, Extract, simplify, symbol_factory
+
+keccak256_512 = z3.Function("keccak256_512", z3.BitVecSort(512), z3.BitVecSort(256))
+ROLES = [Role.SENDER, Role.PARAM1, Role.PARAM2, Role.PARAM3, Role.PARAM]
+
+
+def _calldata_word(offset, tx_id=1):
+    return SymbolicCalldata(tx_id).get_word_at(offset)
+
+
+def _sender(tx_id=1):
+    return symbol_factory.BitVecSym("sender_{}".format(tx_id), 256)
+
+
+def _mapping_slot(key, slot):
+    # keccak256(key . slot) as built by the keccak function manager
+    data = Concat(symbol_factory.BitVecVal(0, 96), Extract(159, 0, key), slot).raw
+    return BitVec(keccak256_512(z3.simplify(data)))
+
+
+def _string_expr(var):
+    return Node.get_last_bracket_content(symbol_var_preprocess(var))
+
+
+def test_calldata_word_key():
+    # Arrange
+    word = _calldata_word(36)
+
+    # Act
+    key = symbol_var_key(word)
+
+    # Assert
+    assert key == ("calldata", "1", 36, 67, None)
+    assert check_roles(key, Role.PARAM2)
+    assert check_roles(key, Role.PARAM)
+    assert not check_roles(key, Role.PARAM1)
+    assert not check_roles(key, Role.SENDER)
+
+
+def test_key_is_memoized_by_ast():
+    # Arrange
+    word = _calldata_word(4)
+
+    # Act
+    first = symbol_var_key(word)
+    second = symbol_var_key(simplify(word))
+
+    # Assert
+    assert first is second
+
+
+def test_mapping_slot_identity():
+    # Arrange
+    balances_slot = simplify(_mapping_slot(_sender(), symbol_factory.BitVecVal(5, 256)))
+    allowance_slot = simplify(
+        _mapping_slot(_calldata_word(4), _mapping_slot(_sender(), symbol_factory.BitVecVal(6, 256)))
+    )
+
+    # Act
+    balances_identity = identity_extract(symbol_var_key(balances_slot))
+    allowance_identity = identity_extract(symbol_var_key(allowance_slot))
+
+    # Assert
+    assert balances_identity == "5"
+    assert allowance_identity == "6"
+    assert identity_extract(symbol_var_key(symbol_factory.BitVecVal(3, 256))) == "3"
+    assert identity_extract(symbol_var_key(_sender())) == -1
+
+
+def test_storage_read_resolves_stored_value():
+    # Arrange
+    storage = z3.K(z3.BitVecSort(256), z3.BitVecVal(0, 256))
+    slot = simplify(_mapping_slot(_sender(), symbol_factory.BitVecVal(5, 256))).raw
+    storage = z3.Store(storage, slot, _calldata_word(36).raw)
+    read = z3.Select(storage, slot)
+    unknown = z3.Select(storage, _calldata_word(4).raw)
+
+    # Act
+    read_key = symbol_var_key(read)
+    unknown_key = symbol_var_key(unknown)
+
+    # Assert
+    assert read_key == ("calldata", "1", 36, 67, None)
+    assert unknown_key == ("load", ("calldata", "1", 4, 35, None))
+
+
+@pytest.mark.parametrize(
+    "var",
+    [
+        _calldata_word(4),
+        _calldata_word(68, tx_id=2),
+        _sender(),
+        _sender() * _calldata_word(36) + _calldata_word(4),
+        (_calldata_word(4) & _calldata_word(36)) + _sender(),
+        simplify(_mapping_slot(_calldata_word(4), symbol_factory.BitVecVal(5, 256))),
+        simplify(
+            _mapping_slot(_sender(), _mapping_slot(_calldata_word(4), symbol_factory.BitVecVal(6, 256)))
+        ),
+        symbol_factory.BitVecVal(7, 256),
+        # Words at a symbolic offset, only a calldata offset makes a parameter
+        SymbolicCalldata(1).get_word_at(_calldata_word(4) + 4),
+        SymbolicCalldata(1).get_word_at(symbol_factory.BitVecSym("x", 256) + 4),
+        SymbolicCalldata(1).get_word_at(_sender() + 4),
+    ],
+)
+def test_key_matches_string_pipeline(var):
+    # Arrange
+    expr = _string_expr(var)
+
+    # Act
+    key = symbol_var_key(var)
+
+    # Assert
+    for role in ROLES:
+        assert bool(check_roles(key, role)) == bool(check_roles(expr, role))
+    assert str(identity_extract(key)) == str(identity_extract(expr))
@@ -0,0 +1,132 @@
+from types import SimpleNamespace
+
+import pytest
+
+from mythril.laser.ethereum.cfg import NodeFlags
+from mythril.analysis.module.modules.DefiCheck3 import (
+    DefiCheck3,
+    FunctionType,
+    Node,
+    NodeStore,
+    NodeType,
+)
+
+
+def _node(uid, opcode, function_name="f()", successors=(), predecessors_list=([],)):
+    return SimpleNamespace(
+        uid=uid,
+        opcode=opcode,
+        offset=uid,
+        function_name=function_name,
+        tx_id=1,
+        node_type=NodeType.ENTRY_OR_EXIT_POINT if opcode == "" else NodeType.DATA_FLOW,
+        symbol_vars=[],
+        post_flag=False,
+        successors=list(successors),
+        predecessors_list=[list(predecessors) for predecessors in predecessors_list],
+        cfg_uid_info=[],
+    )
+
+
+@pytest.fixture
+def detector(monkeypatch):
+    nodes = NodeStore()
+    for node in (
+        _node(0, "", successors=[2]),
+        _node(1, "", predecessors_list=[[2]]),
+        _node(2, "SSTORE", successors=[1], predecessors_list=[[0], [0]]),
+    ):
+        nodes[node.uid] = node
+    monkeypatch.setattr(DefiCheck3, "nodes", nodes)
+    monkeypatch.setattr(DefiCheck3, "function_dict", {"f()": FunctionType.UNKNOWN})
+    monkeypatch.setattr(DefiCheck3, "identity_dict", {})
+    monkeypatch.setattr(DefiCheck3, "func_opcode_time", {})
+    monkeypatch.setattr(Node, "count", 3)
+    return DefiCheck3()
+
+
+def test_export_records_new_nodes_and_changes_of_existing_ones(detector):
+    # Arrange
+    detector.start_worker()
+    detector.nodes[3] = _node(3, "SLOAD", successors=[2])
+    Node.count = 4
+    detector.nodes[2].predecessors_list[1].append(3)
+    detector.nodes[0].successors = [3]
+
+    # Act
+    state = detector.export_worker_state()
+
+    # Assert
+    assert state["base"] == 3
+    assert [node.uid for node in state["nodes"]] == [3]
+    assert state["changes"] == {
+        0: (("replace", [3]), [None], None),
+        2: (None, [None, ("append", [3])], None),
+    }
+
+
+def test_merge_renumbers_worker_nodes_and_folds_entry_and_exit(detector):
+    # Arrange
+    state = dict(
+        module=([], set()),
+        base=3,
+        nodes=[
+            _node(3, "", function_name="g()", successors=[5]),
+            _node(4, "", function_name="g()", predecessors_list=[[5]]),
+            _node(5, "SLOAD", function_name="g()", successors=[4], predecessors_list=[[3], []]),
+            # The entry and exit of f() in the worker, f() already has them here
+            _node(6, "", successors=[8]),
+            _node(7, "", predecessors_list=[[8]]),
+            _node(8, "JUMPDEST", successors=[7], predecessors_list=[[6]]),
+        ],
+        completed=[],
+        changes={2: (("append", [8]), [None, None], None)},
+        function_dict={"f()": FunctionType.ERC20_TRANSFER, "g()": FunctionType.UNKNOWN},
+        identity_dict={},
+        func_opcode_time={"g()": {"SLOAD": 0.5}},
+    )
+
+    # Act
+    detector.merge_worker_state(state)
+
+    # Assert
+    nodes = detector.nodes
+    assert sorted(nodes) == list(range(7)) and Node.count == 7
+    assert nodes.entry_exit("g()") == (3, 4)
+    assert nodes[0].successors == [2, 6]
+    assert nodes[1].predecessors_list == [[2, 6]]
+    assert nodes[2].successors == [1, 6]
+    assert nodes[6].successors == [1] and nodes[6].predecessors_list == [[0]]
+    assert DefiCheck3.function_dict == {
+        "f()": FunctionType.ERC20_TRANSFER,
+        "g()": FunctionType.UNKNOWN,
+    }
+    assert DefiCheck3.func_opcode_time == {"g()": {"SLOAD": 0.5}}
+
+
+def _global_state(function_name, address, start_addr, flags=NodeFlags(), depth=1):
+    return SimpleNamespace(
+        environment=SimpleNamespace(active_function_name=function_name),
+        transaction_stack=[None] * depth,
+        node=SimpleNamespace(start_addr=start_addr, flags=flags),
+        get_current_instruction=lambda: {"address": address},
+    )
+
+
+@pytest.mark.parametrize(
+    "global_state, expected",
+    [
+        (_global_state("fallback", 0, 0), True),
+        (_global_state("transfer(address,uint256)", 90, 90, NodeFlags.FUNC_ENTRY), True),
+        (_global_state("transfer(address,uint256)", 95, 90, NodeFlags.FUNC_ENTRY), False),
+        (_global_state("transfer(address,uint256)", 120, 120), False),
+        (_global_state("transfer(address,uint256)", 0, 0, depth=2), False),
+        (_global_state("name()", 95, 90), True),
+    ],
+)
+def test_only_states_without_path_nodes_are_stealable(detector, global_state, expected):
+    # Act
+    stealable = detector.stealable(global_state)
+
+    # Assert
+    assert stealable is expected
@@ -0,0 +1,150 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from mythril.ethereum.interface.rpc.client import EthJsonRpc
+from mythril.support.loader import DynLoader
+
+ADDRESS = "0x" + "ab" * 20
+# PUSH1 0 SLOAD PUSH1 1 SLOAD
+CODE = "0x600054600154"
+LATEST_BLOCK = 0x20
+
+
+class StubRpcHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append(request)
+        if isinstance(request, list):
+            # Answer batches in reverse, clients have to match the ids
+            response = [self._result(call) for call in reversed(request)]
+        else:
+            response = self._result(request)
+        body = json.dumps(response).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    @staticmethod
+    def _result(call):
+        results = {
+            "eth_blockNumber": lambda params: hex(LATEST_BLOCK),
+            "eth_getCode": lambda params: CODE,
+            "eth_getBalance": lambda params: "0x10",
+            "eth_getStorageAt": lambda params: "0x{:064x}".format(
+                int(params[1], 16) + 1
+            ),
+        }
+        return {
+            "jsonrpc": "2.0",
+            "id": call["id"],
+            "result": results[call["method"]](call["params"]),
+        }
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def rpc():
+    server = HTTPServer(("127.0.0.1", 0), StubRpcHandler)
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = EthJsonRpc("127.0.0.1", server.server_address[1])
+    yield client, server.requests
+    client.close()
+    server.shutdown()
+    server.server_close()
+
+
+def test_batch_results_come_in_the_order_of_the_calls(rpc):
+    # Arrange
+    client, requests = rpc
+
+    # Act
+    values = client.eth_getStorageAtBatch(ADDRESS, [3, 1, 2])
+
+    # Assert
+    assert [int(value, 16) for value in values] == [4, 2, 3]
+    assert len(requests) == 1
+
+
+def test_a_storage_miss_fetches_the_constant_slots_of_the_code(rpc, tmp_path):
+    # Arrange
+    client, requests = rpc
+    loader = DynLoader(client, cache_dir=str(tmp_path))
+    loader.read_code(ADDRESS)
+
+    # Act
+    loader.read_storage(ADDRESS.upper().replace("0X", "0x"), 5)
+    loader.read_storage(ADDRESS, 1)
+
+    # Assert
+    assert len(requests) == 3
+    assert [call["params"][1] for call in requests[2]] == ["0x0", "0x1", "0x5"]
+
+
+def test_repeated_analyses_read_the_disk_cache(rpc, tmp_path):
+    # Arrange
+    client, requests = rpc
+    loader = DynLoader(client, cache_dir=str(tmp_path))
+    loader.read_code(ADDRESS)
+    loader.read_storage(ADDRESS, 7)
+    loader.read_balance(ADDRESS)
+    requests.clear()
+
+    # Act
+    repeated = DynLoader(client, cache_dir=str(tmp_path))
+    repeated.dynld(ADDRESS)
+    repeated.read_storage(ADDRESS, 7)
+    balance = repeated.read_balance(ADDRESS)
+    other_block = DynLoader(client, block=9, cache_dir=str(tmp_path))
+    other_block.read_storage(ADDRESS, 1)
+
+    # Assert
+    assert balance == 16
+    # At the same block only the block number is requested, the other block
+    # is fetched with the slots read at the first one
+    assert len(requests) == 2
+    assert requests[0]["method"] == "eth_blockNumber"
+    assert [call["params"][1:] for call in requests[1]] == [
+        ["0x0", "0x9"],
+        ["0x1", "0x9"],
+        ["0x7", "0x9"],
+    ]
+
+
+def test_all_reads_use_the_latest_block_of_the_first_read(rpc, tmp_path):
+    # Arrange
+    client, requests = rpc
+    loader = DynLoader(client, cache_dir=str(tmp_path))
+
+    # Act
+    loader.read_code(ADDRESS)
+    loader.read_balance(ADDRESS)
+    loader.read_storage(ADDRESS, 7)
+
+    # Assert
+    assert [request["method"] for request in requests[:1]] == ["eth_blockNumber"]
+    calls = [requests[1], requests[2]] + requests[3]
+    assert all(call["params"][-1] == hex(LATEST_BLOCK) for call in calls)
+    assert (tmp_path / ADDRESS / "{}.json".format(LATEST_BLOCK)).exists()
+
+
+def test_dependencies_are_disassembled_once(rpc):
+    # Arrange
+    client, requests = rpc
+    loader = DynLoader(client, block=9)
+
+    # Act
+    first = loader.dynld(ADDRESS)
+    second = loader.dynld(ADDRESS)
+
+    # Assert
+    assert first is second
+    assert len(requests) == 1
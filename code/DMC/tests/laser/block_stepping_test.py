@@ -0,0 +1,113 @@
+from mythril.disassembler.disassembly import Disassembly
+from mythril.laser.ethereum.call import SymbolicCalldata
+from mythril.laser.ethereum.cfg import Node
+from mythril.laser.ethereum.state.account import Account
+from mythril.laser.ethereum.state.annotation import StateAnnotation
+from mythril.laser.ethereum.state.environment import Environment
+from mythril.laser.ethereum.state.global_state import GlobalState
+from mythril.laser.ethereum.state.machine_state import MachineState
+from mythril.laser.ethereum.state.world_state import WorldState
+from mythril.laser.ethereum.strategy.extensions.bounded_loops import (
+    BoundedLoopsStrategy,
+    JumpdestCountAnnotation,
+)
+from mythril.laser.ethereum.svm import LaserEVM
+from mythril.laser.ethereum.transaction.transaction_models import MessageCallTransaction
+
+# PUSH1 1, PUSH1 2, ADD, DUP1, STOP
+CODE = "600160020180" + "00"
+
+
+def get_global_state():
+    active_account = Account("0x0", code=Disassembly(CODE))
+    environment = Environment(
+        active_account, None, SymbolicCalldata("2"), None, None, None, None
+    )
+    world_state = WorldState()
+    world_state.put_account(active_account)
+    state = GlobalState(
+        world_state, environment, Node("MAIN"), MachineState(gas_limit=8000000)
+    )
+    state.transaction_stack.append(
+        (MessageCallTransaction(world_state=world_state, gas_limit=8000000), None)
+    )
+    return state
+
+
+def test_block_runs_to_terminator():
+    # Arrange
+    laser = LaserEVM()
+    state = get_global_state()
+
+    # Act
+    new_states = laser.execute_block(state, laser._block_opcodes())
+
+    # Assert
+    assert len(new_states) == 1
+    assert new_states[0].get_current_instruction()["opcode"] == "STOP"
+    assert [value.value for value in new_states[0].mstate.stack] == [3, 3]
+    assert len(state.node.states) == laser.total_states == 3
+    assert state.mstate.pc == 0
+
+
+def test_block_stops_at_hooked_instruction():
+    # Arrange
+    laser = LaserEVM()
+    laser.register_hooks("pre", {"ADD": [lambda global_state: None]})
+    state = get_global_state()
+
+    # Act
+    new_states = laser.execute_block(state, laser._block_opcodes())
+    unsteppable = laser.execute_block(new_states[0], laser._block_opcodes())
+
+    # Assert
+    assert new_states[0].get_current_instruction()["opcode"] == "ADD"
+    assert unsteppable is None
+
+
+class EntryAnnotation(StateAnnotation):
+    pass
+
+
+def test_state_hooks_change_the_stepped_state():
+    # Arrange
+    laser = LaserEVM()
+    visited = []
+
+    def annotate_entry(global_state):
+        # Like the summary plugin, which annotates the state at pc 0
+        visited.append(global_state.get_current_instruction()["address"])
+        if global_state.mstate.pc == 0:
+            global_state.annotate(EntryAnnotation())
+
+    laser.register_laser_hooks("execute_state", annotate_entry)
+    state = get_global_state()
+
+    # Act
+    new_states = laser.execute_block(state, laser._block_opcodes())
+
+    # Assert
+    assert visited == [0, 2, 4, 5]
+    assert len(list(new_states[0].get_annotations(EntryAnnotation))) == 1
+
+
+def test_strategy_sees_intermediate_states():
+    # Arrange
+    laser = LaserEVM()
+    laser.extend_strategy(BoundedLoopsStrategy, loop_bound=3)
+    state = get_global_state()
+    state.annotate(JumpdestCountAnnotation())
+    stepped = JumpdestCountAnnotation()
+    # The strategy records the first instruction when it hands out the state
+    for address in (2, 4, 5):
+        stepped.record(address)
+
+    # Act
+    new_states = laser.execute_block(state, laser._block_opcodes())
+
+    # Assert
+    annotation = list(new_states[0].get_annotations(JumpdestCountAnnotation))[0]
+    # Every later instruction of the block is in the trace, once and in order
+    assert annotation._position == stepped._position == 3
+    assert annotation._trace_hash == stepped._trace_hash
+    assert annotation.last_address == 5
@@ -0,0 +1,59 @@
+from mythril.disassembler.disassembly import Disassembly
+from mythril.laser.ethereum.svm import LaserEVM
+
+# PUSH1 1, PUSH1 2, ADD, DUP1, STOP
+CODE = "600160020180" + "00"
+
+
+def test_table_is_built_once_per_instruction_list():
+    # Arrange
+    laser = LaserEVM()
+    code = Disassembly(CODE)
+
+    # Act
+    first = laser.dispatch_table(code)
+    second = laser.dispatch_table(code)
+
+    # Assert
+    assert first is second
+    assert [entry.op_code for entry in first.entries] == [
+        "PUSH1",
+        "PUSH1",
+        "ADD",
+        "DUP1",
+        "STOP",
+    ]
+    assert first[0] is first[1]
+    assert first[2].required_stack_elements == 2
+
+
+def test_table_follows_reassigned_bytecode():
+    # Arrange
+    laser = LaserEVM()
+    code = Disassembly(CODE)
+    before = laser.dispatch_table(code)
+
+    # Act
+    code.assign_bytecode("6001" + "00")
+    after = laser.dispatch_table(code)
+
+    # Assert
+    assert after is not before
+    assert [entry.op_code for entry in after.entries] == ["PUSH1", "STOP"]
+
+
+def test_entries_see_hooks_registered_later():
+    # Arrange
+    laser = LaserEVM()
+    table = laser.dispatch_table(Disassembly(CODE))
+
+    def hook(global_state):
+        pass
+
+    # Act
+    laser.register_hooks("pre", {"ADD": [hook]})
+    laser.register_instr_hooks("post", "ADD", hook)
+
+    # Assert
+    assert table[2].pre_hooks == [hook]
+    assert table[2].instruction.post_hook == [hook]
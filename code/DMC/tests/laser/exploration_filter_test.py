@@ -0,0 +1,109 @@
+from mythril.disassembler.disassembly import Disassembly
+from mythril.laser.ethereum.call import SymbolicCalldata
+from mythril.laser.ethereum.cfg import Node
+from mythril.laser.ethereum.exploration_filter import ExplorationFilter, FunctionCategory
+from mythril.laser.ethereum.state.account import Account
+from mythril.laser.ethereum.state.environment import Environment
+from mythril.laser.ethereum.state.global_state import GlobalState
+from mythril.laser.ethereum.state.machine_state import MachineState
+from mythril.laser.ethereum.state.world_state import WorldState
+from mythril.laser.ethereum.svm import LaserEVM
+from mythril.laser.ethereum.transaction.transaction_models import MessageCallTransaction
+from tests import TESTDATA_INPUTS
+
+# Dispatches 0x27e235e3 to address 81 and 0x412664ae to address 158
+METACOIN = (TESTDATA_INPUTS / "metacoin.sol.o").read_text().strip()
+
+
+def get_global_state(code, address):
+    active_account = Account("0x0", code=code)
+    environment = Environment(
+        active_account, None, SymbolicCalldata("2"), None, None, None, None
+    )
+    world_state = WorldState()
+    world_state.put_account(active_account)
+    world_state.transaction_sequence.append(
+        MessageCallTransaction(world_state=world_state, gas_limit=8000000)
+    )
+    state = GlobalState(
+        world_state, environment, Node("MAIN"), MachineState(gas_limit=8000000)
+    )
+    state.mstate.pc = [
+        instruction["address"] for instruction in code.instruction_list
+    ].index(address)
+    return state
+
+
+def test_allow_patterns_override_deny_patterns():
+    # Arrange
+    exploration_filter = ExplorationFilter(
+        [FunctionCategory("Airdrop", ["transfer"])],
+        allow={"Airdrop": ["transferOwnership"]},
+        deny={"Airdrop": ["approve"]},
+    )
+
+    # Act
+    results = [
+        exploration_filter.excluded(function_name)
+        for function_name in (
+            "transferFrom(address,address,uint256)",
+            "approve(address,uint256)",
+            "transferOwnership(address)",
+            "airdrop(address[])",
+        )
+    ]
+
+    # Assert
+    assert results == [True, True, False, False]
+
+
+def test_prefix_categories_and_always_explored_functions():
+    # Arrange
+    exploration_filter = ExplorationFilter(
+        [
+            FunctionCategory("NFTMint", ["is", "fallback"], match="prefix"),
+            FunctionCategory("Swap", ["swap"], enabled=False),
+        ]
+    )
+
+    # Act
+    results = [
+        exploration_filter.excluded(function_name)
+        for function_name in ("isOwner()", "distribute()", "fallback", "swap()")
+    ]
+
+    # Assert
+    assert results == [True, False, False, False]
+    assert not ExplorationFilter([FunctionCategory("Swap", ["swap"], enabled=False)])
+
+
+def test_excluded_entries_are_resolved_from_the_dispatcher():
+    # Arrange
+    exploration_filter = ExplorationFilter(
+        [FunctionCategory("Airdrop", [])], deny={"Airdrop": ["0x412664ae"]}
+    )
+    code = Disassembly(METACOIN)
+
+    # Act
+    entries = exploration_filter.excluded_entries(code)
+
+    # Assert
+    assert entries == frozenset([158])
+    assert exploration_filter.excluded_entries(code) is entries
+
+
+def test_dispatcher_successors_into_excluded_functions_are_dropped():
+    # Arrange
+    laser = LaserEVM()
+    laser.exploration_filter = ExplorationFilter(
+        [FunctionCategory("Airdrop", [])], deny={"Airdrop": ["0x412664ae"]}
+    )
+    code = Disassembly(METACOIN)
+
+    # Act
+    excluded = laser._enters_excluded_function(get_global_state(code, 158))
+    explored = laser._enters_excluded_function(get_global_state(code, 81))
+
+    # Assert
+    assert excluded is True
+    assert explored is False
@@ -0,0 +1,101 @@
+from copy import deepcopy
+from datetime import datetime
+
+from mythril.disassembler.disassembly import Disassembly
+from mythril.laser.ethereum.call import SymbolicCalldata
+from mythril.laser.ethereum.cfg import Node
+from mythril.laser.ethereum.function_budget import FunctionBudgets
+from mythril.laser.ethereum.state.account import Account
+from mythril.laser.ethereum.state.environment import Environment
+from mythril.laser.ethereum.state.global_state import GlobalState
+from mythril.laser.ethereum.state.machine_state import MachineState
+from mythril.laser.ethereum.state.world_state import WorldState
+from mythril.laser.ethereum.svm import LaserEVM
+from mythril.laser.ethereum.time_handler import time_handler
+from mythril.laser.ethereum.transaction.transaction_models import MessageCallTransaction
+
+
+def get_global_state(function_name):
+    # PUSH1 1, PUSH1 2, ADD, STOP
+    active_account = Account("0x0", code=Disassembly("600160020100"))
+    environment = Environment(
+        active_account, None, SymbolicCalldata("2"), None, None, None, None
+    )
+    environment.active_function_name = function_name
+    world_state = WorldState()
+    world_state.put_account(active_account)
+    state = GlobalState(
+        world_state, environment, Node("MAIN"), MachineState(gas_limit=8000000)
+    )
+    state.transaction_stack.append(
+        (MessageCallTransaction(world_state=world_state, gas_limit=8000000), None)
+    )
+    return state
+
+
+def test_function_stops_at_its_state_budget():
+    # Arrange
+    budgets = FunctionBudgets(state_budget=3)
+
+    # Act
+    budgets.charge("transfer(address,uint256)", 0.1, 2, 0)
+    within_budget = budgets.exhausted("transfer(address,uint256)")
+    budgets.charge("transfer(address,uint256)", 0.1, 1, 0)
+
+    # Assert
+    assert within_budget is False
+    assert budgets.exhausted("transfer(address,uint256)")
+    assert budgets.usage["transfer(address,uint256)"].exhausted == "states"
+    assert not budgets.exhausted("approve(address,uint256)")
+
+
+def test_dispatcher_has_no_budget():
+    # Arrange
+    budgets = FunctionBudgets(time_budget=1, solver_budget=1)
+
+    # Act
+    budgets.charge("fallback", 5, 100, 100)
+
+    # Assert
+    assert not budgets.exhausted("fallback")
+    assert "fallback" in repr(budgets)
+
+
+def test_workers_start_from_the_usage_before_the_fork():
+    # Arrange
+    budgets = FunctionBudgets(state_budget=3)
+    budgets.charge("transfer(address,uint256)", 1, 2, 0)
+    worker = deepcopy(budgets)
+    before = worker.copy_usage()
+
+    # Act
+    worker.charge("transfer(address,uint256)", 1, 1, 0)
+    worker.charge("approve(address,uint256)", 1, 1, 0)
+    budgets.merge(worker.usage_since(before))
+
+    # Assert
+    assert worker.exhausted("transfer(address,uint256)")
+    assert budgets.usage["transfer(address,uint256)"].states == 3
+    assert budgets.exhausted("transfer(address,uint256)")
+    assert budgets.usage["approve(address,uint256)"].states == 1
+    assert not budgets.exhausted("approve(address,uint256)")
+
+
+def test_exec_charges_and_drops_states_per_function():
+    # Arrange
+    time_handler.start_execution(100)
+    laser = LaserEVM()
+    laser.time = datetime.now()
+    laser.function_budgets = FunctionBudgets(state_budget=1)
+    laser.work_list.append(get_global_state("transfer(address,uint256)"))
+
+    # Act
+    laser.exec()
+    charged = laser.function_budgets.usage["transfer(address,uint256)"].states
+    laser.work_list.append(get_global_state("transfer(address,uint256)"))
+    laser.exec()
+
+    # Assert
+    assert charged >= 1
+    assert laser.function_budgets.exhausted("transfer(address,uint256)")
+    assert laser.function_budgets.usage["transfer(address,uint256)"].states == charged
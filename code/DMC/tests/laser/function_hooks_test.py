@@ -0,0 +1,113 @@
+from mythril.analysis.module.modules.DefiCheck3 import DefiCheck3
+from mythril.disassembler.disassembly import Disassembly
+from mythril.laser.ethereum.call import SymbolicCalldata
+from mythril.laser.ethereum.cfg import Node
+from mythril.laser.ethereum.state.account import Account
+from mythril.laser.ethereum.state.environment import Environment
+from mythril.laser.ethereum.state.global_state import GlobalState
+from mythril.laser.ethereum.state.machine_state import MachineState
+from mythril.laser.ethereum.state.world_state import WorldState
+from mythril.laser.ethereum.svm import LaserEVM
+
+
+def get_global_state(function_name):
+    active_account = Account("0x0", code=Disassembly("600160020100"))
+    environment = Environment(
+        active_account, None, SymbolicCalldata("2"), None, None, None, None
+    )
+    environment.active_function_name = function_name
+    world_state = WorldState()
+    world_state.put_account(active_account)
+    return GlobalState(
+        world_state, environment, Node("MAIN"), MachineState(gas_limit=8000000)
+    )
+
+
+def test_scoped_pre_hooks_only_run_in_accepted_functions():
+    # Arrange
+    laser = LaserEVM()
+    seen = []
+    laser.register_hooks(
+        "pre",
+        {"ADD": [lambda global_state: seen.append("scoped")]},
+        function_filter=lambda function_name: function_name == "transfer()",
+    )
+    laser.register_hooks("pre", {"ADD": [lambda global_state: seen.append("all")]})
+
+    # Act
+    laser._execute_pre_hook("ADD", get_global_state("transfer()"))
+    laser._execute_pre_hook("ADD", get_global_state("balanceOf(address)"))
+
+    # Assert
+    assert seen == ["all", "scoped", "all"]
+
+
+def test_excluded_functions_step_through_hooked_opcodes():
+    # Arrange
+    laser = LaserEVM()
+    laser.register_hooks(
+        "pre",
+        {"ADD": [lambda global_state: None]},
+        function_filter=lambda function_name: function_name == "transfer()",
+    )
+
+    # Act
+    accepted = laser._block_opcodes("transfer()")
+    excluded = laser._block_opcodes("balanceOf(address)")
+
+    # Assert
+    assert "ADD" not in accepted
+    assert "ADD" in excluded
+
+
+def test_post_hooks_follow_the_function_of_each_successor():
+    # Arrange
+    laser = LaserEVM()
+    seen = []
+    laser.register_hooks(
+        "post",
+        {"ADD": [lambda global_state: seen.append(global_state)]},
+        function_filter=lambda function_name: function_name == "transfer()",
+    )
+    accepted = get_global_state("transfer()")
+    excluded = get_global_state("balanceOf(address)")
+
+    # Act
+    laser._execute_post_hook("ADD", [excluded, accepted])
+
+    # Assert
+    assert seen == [accepted]
+
+
+def test_scoped_instruction_hooks():
+    # Arrange
+    laser = LaserEVM()
+    seen = []
+    laser.register_instr_hooks(
+        "pre",
+        "ADD",
+        lambda global_state: seen.append(global_state),
+        function_filter=lambda function_name: function_name == "transfer()",
+    )
+    accepted = get_global_state("transfer()")
+
+    # Act
+    for hook in laser.instr_pre_hook["ADD"]:
+        hook(accepted)
+        hook(get_global_state("balanceOf(address)"))
+
+    # Assert
+    assert seen == [accepted]
+
+
+def test_deficheck_skips_view_functions():
+    # Arrange
+    module = DefiCheck3()
+
+    # Act
+    view = module.function_filter("balanceOf(address)")
+    transfer = module.function_filter("transfer(address,uint256)")
+
+    # Assert
+    assert view is False
+    assert transfer is True
@@ -3,8 +3,9 @@ from mythril.laser.smt.solver.independence_solver import (
     DependenceBucket,
     DependenceMap,
     IndependenceSolver,
+    slice_constraints,
 )
-from mythril.laser.smt import symbol_factory
+from mythril.laser.smt import Bool, symbol_factory
 
 import z3
 
@@ -143,3 +144,43 @@ def test_independence_solver_sat():
 
     # Assert
     assert z3.sat == result
+
+
+def _slice_indices(slices, conditions):
+    positions = {id(condition): index for index, condition in enumerate(conditions)}
+    return [[positions[id(c)] for c in constraint_slice] for constraint_slice in slices]
+
+
+def test_slice_constraints_links_through_functions():
+    # Arrange
+    x = symbol_factory.BitVecSym("x", 256)
+    y = symbol_factory.BitVecSym("y", 256)
+    a = symbol_factory.BitVecSym("a", 256)
+    f = z3.Function("f", z3.BitVecSort(256), z3.BitVecSort(256))
+    conditions = [
+        x > y,
+        Bool(f(x.raw) == 1),
+        a == symbol_factory.BitVecVal(2, 256),
+        Bool(f(a.raw) == 3),
+        Bool(z3.BoolVal(True)),
+    ]
+
+    # Act
+    slices = slice_constraints(conditions)
+
+    # Assert
+    assert _slice_indices(slices, conditions) == [[4], [0, 1, 2, 3]]
+
+
+def test_slice_constraints_keeps_independent_slices_apart():
+    # Arrange
+    x = symbol_factory.BitVecSym("x", 256)
+    y = symbol_factory.BitVecSym("y", 256)
+    a = symbol_factory.BitVecSym("a", 256)
+    conditions = [x > y, a == symbol_factory.BitVecVal(2, 256), y == x]
+
+    # Act
+    slices = slice_constraints(conditions)
+
+    # Assert
+    assert _slice_indices(slices, conditions) == [[0, 2], [1]]
@@ -0,0 +1,80 @@
+import z3
+
+from mythril.laser.smt import Solver, symbol_factory
+from mythril.support.support_utils import ModelCache, free_decl_names
+
+
+def _model(*constraints):
+    solver = Solver()
+    solver.add(*constraints)
+    assert solver.check() == z3.sat
+    return solver.model()
+
+
+def test_free_decl_names():
+    # Arrange
+    x = symbol_factory.BitVecSym("cache_x", 256)
+    y = symbol_factory.BitVecSym("cache_y", 256)
+    f = z3.Function("cache_f", z3.BitVecSort(256), z3.BitVecSort(256))
+
+    # Act
+    names = free_decl_names(z3.And(f(x.raw) == y.raw, x.raw > 1))
+
+    # Assert
+    assert names == {"cache_x", "cache_y", "cache_f"}
+
+
+def test_quick_sat_returns_covering_model():
+    # Arrange
+    x = symbol_factory.BitVecSym("cache_x", 256)
+    y = symbol_factory.BitVecSym("cache_y", 256)
+    cache = ModelCache()
+    x_model = _model(x == symbol_factory.BitVecVal(5, 256))
+    y_model = _model(y == symbol_factory.BitVecVal(6, 256))
+    cache.put(x_model, 1)
+    cache.put(y_model, 1)
+
+    # Act
+    hit = cache.check_quick_sat((x == symbol_factory.BitVecVal(5, 256)).raw)
+    miss = cache.check_quick_sat((x == symbol_factory.BitVecVal(7, 256)).raw)
+
+    # Assert
+    assert hit is x_model
+    assert miss is False
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_quick_sat_completes_unassigned_variables():
+    # Arrange
+    x = symbol_factory.BitVecSym("cache_x", 256)
+    z = symbol_factory.BitVecSym("cache_z", 256)
+    cache = ModelCache()
+    model = _model(x == symbol_factory.BitVecVal(5, 256))
+    cache.put(model, 1)
+
+    # Act
+    result = cache.check_quick_sat(z3.And(x.raw == 5, z.raw == 0))
+
+    # Assert
+    assert result is model
+    # The completed model assigns the default value and is found by that variable
+    assert model.eval(z.raw).as_long() == 0
+    assert model in cache._decl_index["cache_z"]
+
+
+def test_evicted_models_leave_the_index():
+    # Arrange
+    x = symbol_factory.BitVecSym("cache_x", 256)
+    cache = ModelCache()
+    cache.model_cache.size = 1
+    first = _model(x == symbol_factory.BitVecVal(1, 256))
+    second = _model(x == symbol_factory.BitVecVal(2, 256))
+
+    # Act
+    cache.put(first, 1)
+    cache.put(second, 1)
+
+    # Assert
+    assert cache.check_quick_sat((x == symbol_factory.BitVecVal(1, 256)).raw) is False
+    assert cache.check_quick_sat((x == symbol_factory.BitVecVal(2, 256)).raw) is second
@@ -1,4 +1,5 @@
 from mythril.laser.smt import Solver, symbol_factory
+from mythril.laser.smt.model import Model
 import z3
 
 
@@ -54,3 +55,22 @@ def test_as_long():
     # Assert
     assert z3.sat == result
     assert 2 == x_concrete
+
+
+def test_eval_combines_independent_models():
+    # Arrange
+    x = symbol_factory.BitVecSym("x", 256)
+    y = symbol_factory.BitVecSym("y", 256)
+    x_solver = Solver()
+    x_solver.add(x == symbol_factory.BitVecVal(2, 256))
+    x_solver.check()
+    y_solver = Solver()
+    y_solver.add(y == symbol_factory.BitVecVal(3, 256))
+    y_solver.check()
+    model = Model(x_solver.model().raw + y_solver.model().raw)
+
+    # Act
+    total = model.eval((x + y).raw, model_completion=True)
+
+    # Assert
+    assert total.as_long() == 5
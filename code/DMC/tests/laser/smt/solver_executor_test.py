@@ -0,0 +1,231 @@
+import threading
+import time
+
+import pytest
+import z3
+
+from mythril.exceptions import UnsatError
+from mythril.laser.ethereum.time_handler import time_handler
+from mythril.laser.smt import symbol_factory
+from mythril.support import model as model_module
+from mythril.support.model import (
+    IncrementalSolver,
+    SolverExecutor,
+    get_model,
+    get_models,
+    slice_cache,
+    solve_slices,
+    solver_metrics,
+)
+from mythril.support.support_args import args
+
+
+@pytest.fixture
+def parallel_solving():
+    previous = args.parallel_solving
+    time_handler.start_execution(100)
+    yield
+    args.parallel_solving = previous
+    get_model.cache_clear()
+
+
+def test_executor_is_reused_across_queries(parallel_solving):
+    # Arrange
+    args.parallel_solving = 0
+    x = symbol_factory.BitVecSym("executor_reuse_x", 256)
+
+    # Act
+    first = model_module.solver_executor()
+    get_model((x == symbol_factory.BitVecVal(3, 256),))
+    get_model((x == symbol_factory.BitVecVal(4, 256),))
+    second = model_module.solver_executor()
+
+    # Assert
+    assert first is second
+    assert first.workers == 1
+
+
+def test_executor_is_rebuilt_for_new_worker_count(parallel_solving):
+    # Arrange
+    args.parallel_solving = 0
+    single = model_module.solver_executor()
+
+    # Act
+    args.parallel_solving = 2
+    parallel = model_module.solver_executor()
+
+    # Assert
+    assert parallel is not single
+    assert parallel.workers == 2
+
+
+def test_parallel_worker_returns_model_in_main_context():
+    # Arrange
+    executor = SolverExecutor(workers=2)
+    x = symbol_factory.BitVecSym("executor_parallel_x", 256)
+    constraints = [x == symbol_factory.BitVecVal(7, 256)]
+
+    # Act
+    result, model = executor.solve(constraints, solver_timeout=10000)
+    executor.shutdown()
+
+    # Assert
+    assert result == z3.sat
+    assert model.eval(x.raw).as_long() == 7
+
+
+def test_metrics_record_every_query(parallel_solving):
+    # Arrange
+    args.parallel_solving = 0
+    x = symbol_factory.BitVecSym("executor_metrics_x", 256)
+    before = solver_metrics.query_count
+
+    # Act
+    with pytest.raises(UnsatError):
+        get_model(
+            (
+                x == symbol_factory.BitVecVal(1, 256),
+                x == symbol_factory.BitVecVal(2, 256),
+            )
+        )
+
+    # Assert
+    assert solver_metrics.query_count == before + 1
+    assert solver_metrics.unsat_count >= 1
+    assert sum(solver_metrics.histogram) == solver_metrics.query_count
+
+
+def test_incremental_solver_reuses_shared_prefix():
+    # Arrange
+    ctx = z3.Context()
+    solver = IncrementalSolver(ctx)
+    x = symbol_factory.BitVecSym("executor_incremental_x", 256)
+    prefix = [x > symbol_factory.BitVecVal(5, 256)]
+    taken = prefix + [x == symbol_factory.BitVecVal(6, 256)]
+    not_taken = prefix + [x == symbol_factory.BitVecVal(4, 256)]
+
+    # Act
+    first = solver.check(*solver.prepare(taken), 10000)[0]
+    pops, suffix = solver.prepare(not_taken)
+    second = solver.check(pops, suffix, 10000)[0]
+
+    # Assert
+    assert first == z3.sat
+    assert (pops, len(suffix)) == (1, 1)
+    assert second == z3.unsat
+    assert solver.trail == not_taken
+
+
+def test_incremental_mode_answers_like_optimize(parallel_solving):
+    # Arrange
+    args.parallel_solving = 0
+    executor = SolverExecutor(workers=1)
+    x = symbol_factory.BitVecSym("executor_mode_x", 256)
+    constraints = [
+        x > symbol_factory.BitVecVal(5, 256),
+        x < symbol_factory.BitVecVal(7, 256),
+    ]
+
+    # Act
+    args.incremental_solving = True
+    try:
+        result, model = executor.solve(constraints, solver_timeout=10000)
+    finally:
+        args.incremental_solving = False
+    optimize_result, _ = executor.solve(constraints, solver_timeout=10000)
+    executor.shutdown()
+
+    # Assert
+    assert result == optimize_result == z3.sat
+    assert model.eval(x.raw).as_long() == 6
+
+
+def test_unchanged_slices_are_not_solved_again(parallel_solving):
+    # Arrange
+    args.parallel_solving = 0
+    x = symbol_factory.BitVecSym("executor_slice_x", 256)
+    a = symbol_factory.BitVecSym("executor_slice_a", 256)
+    prefix = [a == symbol_factory.BitVecVal(9, 256)]
+    first = prefix + [x == symbol_factory.BitVecVal(1, 256)]
+    second = prefix + [x == symbol_factory.BitVecVal(2, 256)]
+
+    # Act
+    solve_slices(first, 10000)
+    queries = solver_metrics.query_count
+    hits = slice_cache.hits
+    result, model = solve_slices(second, 10000)
+
+    # Assert
+    assert result == z3.sat
+    assert solver_metrics.query_count == queries + 1
+    assert slice_cache.hits == hits + 1
+    assert model.eval((a + x).raw).as_long() == 11
+
+
+def test_queries_of_a_batch_run_concurrently(monkeypatch):
+    # Arrange
+    executor = SolverExecutor(workers=2)
+    both_running = threading.Barrier(2, timeout=5)
+    solve = model_module.solver_worker
+
+    def solver_worker(*query):
+        both_running.wait()
+        return solve(*query)
+
+    monkeypatch.setattr(model_module, "solver_worker", solver_worker)
+    x = symbol_factory.BitVecSym("executor_batch_x", 256)
+    queries = [
+        ([x == symbol_factory.BitVecVal(value, 256)], (), (), 10000)
+        for value in (1, 2)
+    ]
+
+    # Act
+    outcomes = executor.solve_all(queries)
+    executor.shutdown()
+
+    # Assert
+    assert [result for result, _ in outcomes] == [z3.sat, z3.sat]
+    assert [model.eval(x.raw).as_long() for _, model in outcomes] == [1, 2]
+
+
+def test_queries_past_the_deadline_are_unknown():
+    # Arrange
+    executor = SolverExecutor(workers=1)
+    x = symbol_factory.BitVecSym("executor_deadline_x", 256)
+
+    # Act
+    outcomes = executor.solve_all(
+        [([x == symbol_factory.BitVecVal(1, 256)], (), (), 10000)],
+        deadline=time.time() - 1,
+    )
+    executor.shutdown()
+
+    # Assert
+    assert outcomes == [(z3.unknown, None)]
+
+
+def test_batched_models_keep_the_order_of_the_queries(parallel_solving):
+    # Arrange
+    args.parallel_solving = 2
+    x = symbol_factory.BitVecSym("executor_models_x", 256)
+    queries = [
+        ((x == symbol_factory.BitVecVal(3, 256),), ()),
+        ((x == symbol_factory.BitVecVal(3, 256), False), ()),
+        (
+            (
+                x == symbol_factory.BitVecVal(1, 256),
+                x == symbol_factory.BitVecVal(2, 256),
+            ),
+            (),
+        ),
+        ((x > symbol_factory.BitVecVal(4, 256),), (x,)),
+    ]
+
+    # Act
+    outcomes = get_models(queries)
+
+    # Assert
+    assert outcomes[0].eval(x.raw).as_long() == 3
+    assert isinstance(outcomes[1], UnsatError)
+    assert isinstance(outcomes[2], UnsatError)
+    assert outcomes[3].eval(x.raw).as_long() == 5
@@ -1,6 +1,6 @@
 import pytest
 from mythril.laser.ethereum.state.calldata import ConcreteCalldata, SymbolicCalldata
-from mythril.laser.smt import Solver, symbol_factory
+from mythril.laser.smt import Concat, Solver, simplify, symbol_factory
 from z3 import sat, unsat
 from z3.z3types import Z3Exception
 from mock import MagicMock
@@ -89,3 +89,39 @@ def test_symbolic_calldata_equal_indices():
 
     # Assert
     assert unsat == s.check()
+
+
+def test_symbolic_calldata_words_are_interned():
+    # Arrange
+    calldata = SymbolicCalldata(2)
+    offset = symbol_factory.BitVecVal(4, 256)
+    expected = Concat(
+        [calldata[symbol_factory.BitVecVal(i, 256)] for i in range(4, 36)]
+    )
+
+    # Act
+    word = calldata.get_word_at(offset)
+    word.annotate("annotation")
+    again = calldata.get_word_at(4)
+
+    # Assert
+    assert again.raw.eq(word.raw)
+    assert again.annotations == set()
+    assert simplify(expected == word).is_true
+    assert list(calldata._words) == [4]
+
+
+def test_concrete_slices_match_the_solver_bounded_slices():
+    # Arrange
+    calldata = SymbolicCalldata(2)
+    start = symbol_factory.BitVecSym("start", 256)
+
+    # Act
+    concrete = calldata[4:8]
+    symbolic = calldata[start : start + 4]
+
+    # Assert
+    assert len(concrete) == len(symbolic) == 4
+    assert [str(part) for part in concrete] == [
+        str(calldata[symbol_factory.BitVecVal(i, 256)]) for i in range(4, 8)
+    ]
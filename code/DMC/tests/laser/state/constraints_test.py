@@ -0,0 +1,75 @@
+from copy import copy, deepcopy
+
+import z3
+
+from mythril.laser.ethereum.state.constraints import Constraints
+from mythril.laser.smt import symbol_factory
+
+x = symbol_factory.BitVecSym("constraints_x", 256)
+
+
+def _constraint(value):
+    return x != symbol_factory.BitVecVal(value, 256)
+
+
+def test_forks_share_prefix_and_stay_independent():
+    # Arrange
+    parent = Constraints([_constraint(1), _constraint(2)])
+
+    # Act
+    left = copy(parent)
+    right = parent + [_constraint(4)]
+    left.append(_constraint(3))
+
+    # Assert
+    assert len(parent) == 2 and len(left) == 3 and len(right) == 3
+    assert left._tail.parent is parent._tail
+    assert right._tail.parent is parent._tail
+    assert list(parent) == parent[:2] == [parent[0], parent[1]]
+    assert left[-1] is not right[-1]
+
+
+def test_equal_chains_hash_alike():
+    # Arrange
+    first = _constraint(1)
+    second = _constraint(2)
+
+    # Act
+    built = Constraints([first])
+    built += [second]
+    listed = Constraints([first, second])
+
+    # Assert
+    assert built == listed
+    assert hash(built) == hash(listed)
+    assert built != Constraints([second, first])
+    assert built == [first, second]
+
+
+def test_conjunction_is_shared_by_forks():
+    # Arrange
+    parent = Constraints([_constraint(1), _constraint(2)])
+    child = copy(parent)
+    child.append(_constraint(3))
+
+    # Act
+    conjunction = child.conjunction
+
+    # Assert
+    assert parent._tail._conjunction is not None
+    assert z3.simplify(z3.And(conjunction, (x == 1).raw)).eq(z3.BoolVal(False))
+    assert Constraints().conjunction.eq(z3.BoolVal(True))
+
+
+def test_long_chains_copy_without_recursion():
+    # Arrange
+    constraints = Constraints([_constraint(i) for i in range(5000)])
+
+    # Act
+    copied = deepcopy(constraints)
+    conjunction = constraints.conjunction
+
+    # Assert
+    assert len(copied) == 5000
+    assert z3.is_and(conjunction)
+    assert copied[0] is not constraints[0]
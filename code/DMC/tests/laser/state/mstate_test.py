@@ -1,4 +1,5 @@
 import pytest
+from copy import copy
 from eth._utils.numeric import ceil32
 from mythril.laser.smt import simplify, symbol_factory, Concat, Extract
 
@@ -126,6 +127,24 @@ def test_memory_write():
     assert simplify(b == mem[12])
 
 
+def test_memory_copy_on_write():
+    # Arrange
+    mem = Memory()
+    mem.extend(64)
+    mem.write_word_at(0, 1)
+    mem_copy = copy(mem)
+
+    # Act
+    mem_copy.write_word_at(0, 2)
+    mem.write_word_at(32, 3)
+
+    # Assert
+    assert mem.get_word_at(0) == 1
+    assert mem_copy.get_word_at(0) == 2
+    assert mem_copy.get_word_at(32) == 0
+    assert mem.get_word_at(32) == 3
+
+
 def test_memory_symbolic():
     # Arrange
     mem = Memory()
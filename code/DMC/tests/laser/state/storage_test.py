@@ -1,4 +1,6 @@
 import pytest
+from copy import deepcopy
+
 from mythril.laser.smt import symbol_factory
 from mythril.laser.ethereum.state.account import Storage
 from mythril.laser.smt import Expression
@@ -58,3 +60,35 @@ def test_storage_change_item():
 
     # Assert
     assert storage[BVV(1, 256)] == BVV(14, 256)
+
+
+def test_storage_copies_are_independent():
+    # Arrange
+    storage = Storage()
+    storage[BVV(1, 256)] = BVV(12, 256)
+    storage_copy = deepcopy(storage)
+
+    # Act
+    storage_copy[BVV(1, 256)] = BVV(14, 256)
+    storage[BVV(2, 256)] = BVV(15, 256)
+
+    # Assert
+    assert storage[BVV(1, 256)] == BVV(12, 256)
+    assert storage_copy[BVV(1, 256)] == BVV(14, 256)
+    assert BVV(2, 256) not in storage_copy.keys_set
+    assert BVV(2, 256) in storage.keys_set
+
+
+def test_storage_copy_shares_containers_until_accessed():
+    # Arrange
+    storage = Storage()
+    storage[BVV(1, 256)] = BVV(12, 256)
+
+    # Act
+    storage_copy = deepcopy(storage)
+    shared = storage_copy.__dict__["_cow_keys_set"] is storage.__dict__["_cow_keys_set"]
+    storage_copy[BVV(1, 256)]
+
+    # Assert
+    assert shared
+    assert storage_copy.__dict__["_cow_keys_set"] is not storage.__dict__["_cow_keys_set"]
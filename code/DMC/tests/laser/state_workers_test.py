@@ -0,0 +1,96 @@
+import z3
+
+from mythril.disassembler.disassembly import Disassembly
+from mythril.laser.ethereum.function_managers import KeccakFunctionManager
+from mythril.laser.ethereum.svm import LaserEVM
+from mythril.laser.ethereum.state.account import Account
+from mythril.laser.ethereum.state.world_state import WorldState
+from mythril.laser.smt import Solver, symbol_factory
+from mythril.support import z3_pickle
+from mythril.support.support_args import args
+from tests import TESTDATA_INPUTS
+
+METACOIN = (TESTDATA_INPUTS / "metacoin.sol.o").read_text().strip()
+
+
+def _sym_exec(monkeypatch, state_workers, merged=None):
+    monkeypatch.setattr(args, "state_workers", state_workers)
+    monkeypatch.setattr(args, "pruning_factor", 1)
+    world_state = WorldState()
+    world_state.put_account(
+        Account("0x0901d12ebe1b195e5aa8748e62bd7734ae19b51f", Disassembly(METACOIN))
+    )
+    laser = LaserEVM(
+        requires_statespace=False, execution_timeout=600, transaction_count=2
+    )
+    if merged is not None:
+        executed = []
+        laser.register_laser_hooks(
+            "execute_state",
+            lambda global_state: executed.append(global_state.mstate.pc),
+        )
+        laser.register_worker_state(
+            "executed",
+            lambda: len(executed),
+            merged.append,
+            start=executed.clear,
+        )
+    laser.sym_exec(
+        world_state=world_state,
+        target_address=0x0901D12EBE1B195E5AA8748E62BD7734AE19B51F,
+    )
+    return laser
+
+
+def test_stealing_workers_reach_the_open_states_of_a_serial_run(monkeypatch):
+    # Arrange
+    serial = _sym_exec(monkeypatch, 0)
+    merged = []
+
+    # Act
+    stealing = _sym_exec(monkeypatch, 2, merged)
+
+    # Assert
+    assert len(stealing.open_states) == len(serial.open_states)
+    assert stealing.total_states == serial.total_states
+    # Two message calls, each explored by two workers
+    assert len(merged) == 4
+
+
+def test_donated_states_pass_the_steal_filters():
+    # Arrange
+    laser = LaserEVM(requires_statespace=False)
+    laser.work_list += list(range(6))
+    laser.register_steal_filter(lambda global_state: global_state % 2 == 1)
+
+    # Act
+    donated = laser._donate_states()
+
+    # Assert
+    assert donated == [1, 3, 5]
+    assert laser.work_list == [0, 2, 4]
+
+
+def test_hashes_of_a_worker_are_constrained_after_the_merge():
+    # Arrange
+    a = symbol_factory.BitVecSym("a", 256)
+    b = symbol_factory.BitVecSym("b", 256)
+    main = KeccakFunctionManager()
+    main.create_keccak(a)
+    worker = KeccakFunctionManager()
+    worker.create_keccak(a)
+    worker.start_worker()
+    worker.create_keccak(b)
+    worker.create_keccak(symbol_factory.BitVecVal(5, 256))
+    state = z3_pickle.loads(z3_pickle.dumps(worker.export_worker_state()))
+
+    # Act
+    main.merge_worker_state(state)
+
+    # Assert
+    assert len(main.symbolic_inputs[256]) == 2
+    assert len(main.concrete_hashes) == 1
+    solver = Solver()
+    solver.add(main.create_conditions())
+    solver.add(main.create_keccak(a) == main.create_keccak(b), a != b)
+    assert solver.check() == z3.unsat
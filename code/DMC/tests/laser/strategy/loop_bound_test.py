@@ -1,20 +1,56 @@
+from copy import copy
+
 import pytest
 from mythril.laser.ethereum.strategy.extensions.bounded_loops import (
-    BoundedLoopsStrategy,
+    JumpdestCountAnnotation,
 )
 
+TRACES = [
+    ([6, 7, 7, 7], 3),
+    ([6, 8, 6, 7, 6, 7, 6, 7, 6, 7], 4),
+    ([6, 6, 6, 6], 4),
+    ([6, 7, 8] * 10, 10),
+    ([7, 9, 10] + list(range(1, 100)) * 100, 100),
+    ([7, 10, 15], 0),
+    ([7] * 100, 100),
+]
 
-@pytest.mark.parametrize(
-    "trace, count",
-    [
-        ([6, 7, 7, 7], 3),
-        ([6, 8, 6, 7, 6, 7, 6, 7, 6, 7], 4),
-        ([6, 6, 6, 6], 4),
-        ([6, 7, 8] * 10, 10),
-        ([7, 9, 10] + list(range(1, 100)) * 100, 100),
-        ([7, 10, 15], 0),
-        ([7] * 100, 100),
-    ],
-)
-def test_loop_count(trace, count):
-    assert count == BoundedLoopsStrategy.get_loop_count(trace)
+
+@pytest.mark.parametrize("trace, count", TRACES)
+def test_annotation_counts_like_the_trace(trace, count):
+    # Arrange
+    annotation = JumpdestCountAnnotation()
+    for address in trace[:-1]:
+        if address == trace[-1]:
+            annotation.count_jump(address)
+        else:
+            annotation.record(address)
+
+    # Act
+    result = annotation.count_jump(trace[-1])
+
+    # Assert
+    assert result == count
+
+
+def test_forked_annotations_count_independently():
+    # Arrange
+    annotation = JumpdestCountAnnotation()
+    annotation.record(6)
+    annotation.count_jump(7)
+    annotation.record(8)
+    annotation.record(6)
+    annotation.count_jump(7)
+    forked = copy(annotation)
+
+    # Act
+    forked.record(8)
+    forked.record(6)
+    repeated = forked.count_jump(7)
+    annotation.record(9)
+    annotation.record(6)
+    changed = annotation.count_jump(7)
+
+    # Assert
+    assert repeated == 3
+    assert changed == 2
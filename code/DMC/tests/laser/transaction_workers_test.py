@@ -0,0 +1,116 @@
+from mythril.disassembler.disassembly import Disassembly
+from mythril.laser.ethereum.svm import LaserEVM, TX_ID_STRIDE
+from mythril.laser.ethereum.state.account import Account
+from mythril.laser.ethereum.state.world_state import WorldState
+from mythril.laser.smt import symbol_factory
+from mythril.support.support_args import args
+from tests import TESTDATA_INPUTS
+
+METACOIN = (TESTDATA_INPUTS / "metacoin.sol.o").read_text().strip()
+
+
+def _sym_exec(monkeypatch, transaction_workers, merged=None):
+    monkeypatch.setattr(args, "transaction_workers", transaction_workers)
+    monkeypatch.setattr(args, "pruning_factor", 1)
+    world_state = WorldState()
+    world_state.put_account(
+        Account("0x0901d12ebe1b195e5aa8748e62bd7734ae19b51f", Disassembly(METACOIN))
+    )
+    laser = LaserEVM(
+        requires_statespace=False, execution_timeout=600, transaction_count=1
+    )
+    if merged is not None:
+        executed = []
+        laser.register_laser_hooks(
+            "execute_state",
+            lambda global_state: executed.append(global_state.mstate.pc),
+        )
+        laser.register_worker_state(
+            "executed",
+            lambda: len(executed),
+            merged.append,
+            start=executed.clear,
+        )
+    laser.sym_exec(
+        world_state=world_state,
+        target_address=0x0901D12EBE1B195E5AA8748E62BD7734AE19B51F,
+    )
+    return laser
+
+
+def _tx_ids(laser):
+    return sorted(
+        int(world_state.transaction_sequence[-1].id) for world_state in laser.open_states
+    )
+
+
+def test_workers_reach_the_open_states_of_a_serial_run(monkeypatch):
+    # Arrange
+    serial = _sym_exec(monkeypatch, 0)
+    merged = []
+
+    # Act
+    forked = _sym_exec(monkeypatch, 2, merged)
+
+    # Assert
+    assert len(forked.open_states) == len(serial.open_states)
+    assert len(merged) == 2 and all(count > 0 for count in merged)
+    assert _tx_ids(forked)[0] < TX_ID_STRIDE < _tx_ids(forked)[-1]
+
+
+def test_workers_need_a_statespace_free_run(monkeypatch):
+    # Arrange
+    monkeypatch.setattr(args, "transaction_workers", 2)
+    laser = LaserEVM(requires_statespace=True)
+
+    # Act
+    forked = laser._execute_transactions_forked(None, None, 0)
+
+    # Assert
+    assert forked is False
+
+
+def _world_state(code):
+    world_state = WorldState()
+    world_state.put_account(
+        Account("0x0901d12ebe1b195e5aa8748e62bd7734ae19b51f", code)
+    )
+    return world_state
+
+
+def test_functions_are_split_over_the_code_of_every_open_state(monkeypatch):
+    # Arrange
+    monkeypatch.setattr(args, "transaction_workers", 2)
+    laser = LaserEVM(requires_statespace=False)
+    laser.open_states = [
+        _world_state(Disassembly("00")),
+        _world_state(Disassembly(METACOIN)),
+    ]
+
+    # Act
+    partitions = laser._selector_partitions(
+        symbol_factory.BitVecVal(0x0901D12EBE1B195E5AA8748E62BD7734AE19B51F, 256),
+        None,
+        0,
+    )
+
+    # Assert
+    assert len(partitions) == 2
+
+
+def test_workers_without_functions_to_split_warn(monkeypatch, caplog):
+    # Arrange
+    monkeypatch.setattr(args, "transaction_workers", 2)
+    laser = LaserEVM(requires_statespace=False)
+    laser.open_states = [_world_state(Disassembly("00"))]
+
+    # Act
+    forked = laser._execute_transactions_forked(
+        symbol_factory.BitVecVal(0x0901D12EBE1B195E5AA8748E62BD7734AE19B51F, 256),
+        None,
+        0,
+    )
+
+    # Assert
+    assert forked is False
+    assert "serially" in caplog.text
@@ -1,29 +1,13 @@
 from pathlib import Path
+from mythril.ethereum.interface.rpc.client import EthJsonRpc
 from mythril.mythril import MythrilDisassembler, MythrilAnalyzer
 from mythril.analysis.report import Issue
 from mock import patch, PropertyMock
 from types import SimpleNamespace
 
 
-@patch("mythril.analysis.report.Issue.add_code_info", return_value=None)
-@patch(
-    "mythril.mythril.mythril_analyzer.fire_lasers",
-    return_value=[Issue("", "", "234", "101", "title", "0x02445")],
-)
-@patch("mythril.mythril.mythril_analyzer.SymExecWrapper")
-def test_fire_lasers(mock_sym, mock_fire_lasers, mock_code_info):
-    type(mock_sym.return_value).execution_info = PropertyMock(return_value=[])
-    disassembler = MythrilDisassembler(eth=None, solc_version="v0.5.0")
-    disassembler.load_from_solidity(
-        [
-            str(
-                (
-                    Path(__file__).parent.parent / "testdata/input_contracts/origin.sol"
-                ).absolute()
-            )
-        ]
-    )
-    args = SimpleNamespace(
+def _cmd_args(**overrides):
+    options = dict(
         execution_timeout=5,
         max_depth=30,
         solver_timeout=10000,
@@ -34,9 +18,19 @@ def test_fire_lasers(mock_sym, mock_fire_lasers, mock_code_info):
         custom_modules_directory=None,
         pruning_factor=0,
         parallel_solving=True,
+        incremental_solving=False,
+        result_cache=None,
         unconstrained_storage=True,
         call_depth_limit=3,
         disable_iprof=True,
+        disable_block_stepping=False,
+        explore_allow=None,
+        explore_deny=None,
+        function_timeout=None,
+        function_max_states=None,
+        function_max_solver_calls=None,
+        transaction_workers=0,
+        state_workers=0,
         solver_log=None,
         transaction_sequences=None,
         disable_coverage_strategy=False,
@@ -44,6 +38,29 @@ def test_fire_lasers(mock_sym, mock_fire_lasers, mock_code_info):
         enable_summaries=False,
         enable_state_merging=False,
     )
+    options.update(overrides)
+    return SimpleNamespace(**options)
+
+
+@patch("mythril.analysis.report.Issue.add_code_info", return_value=None)
+@patch(
+    "mythril.mythril.mythril_analyzer.fire_lasers",
+    return_value=[Issue("", "", "234", "101", "title", "0x02445")],
+)
+@patch("mythril.mythril.mythril_analyzer.SymExecWrapper")
+def test_fire_lasers(mock_sym, mock_fire_lasers, mock_code_info):
+    type(mock_sym.return_value).execution_info = PropertyMock(return_value=[])
+    disassembler = MythrilDisassembler(eth=None, solc_version="v0.5.0")
+    disassembler.load_from_solidity(
+        [
+            str(
+                (
+                    Path(__file__).parent.parent / "testdata/input_contracts/origin.sol"
+                ).absolute()
+            )
+        ]
+    )
+    args = _cmd_args()
     analyzer = MythrilAnalyzer(disassembler, cmd_args=args)
 
     issues = analyzer.fire_lasers(modules=[]).sorted_issues()
@@ -52,3 +69,120 @@ def test_fire_lasers(mock_sym, mock_fire_lasers, mock_code_info):
     mock_code_info.assert_called()
     assert len(issues) == 1
     assert issues[0]["swc-id"] == "101"
+
+
+def _bytecode_analyzer(cache_dir, **overrides):
+    disassembler = MythrilDisassembler(eth=None)
+    disassembler.load_from_bytecode("0x6001600055", bin_runtime=True)
+    return MythrilAnalyzer(
+        disassembler, cmd_args=_cmd_args(result_cache=str(cache_dir), **overrides)
+    )
+
+
+@patch("mythril.mythril.mythril_analyzer.fire_lasers")
+@patch("mythril.mythril.mythril_analyzer.SymExecWrapper")
+def test_fire_lasers_reuses_cached_results(mock_sym, mock_fire_lasers, tmp_path):
+    # Arrange
+    type(mock_sym.return_value).execution_info = PropertyMock(return_value=[])
+    mock_fire_lasers.return_value = [Issue("", "", "234", "101", "title", "0x02445")]
+    _bytecode_analyzer(tmp_path).fire_lasers(modules=[])
+
+    # Act
+    analyzer = _bytecode_analyzer(tmp_path)
+    issues = analyzer.fire_lasers(modules=[]).sorted_issues()
+
+    # Assert
+    assert mock_sym.call_count == 1
+    assert analyzer.result_cache.hits == 1
+    assert len(issues) == 1
+    assert issues[0]["swc-id"] == "101"
+
+
+@patch("mythril.mythril.mythril_analyzer.fire_lasers", return_value=[])
+@patch("mythril.mythril.mythril_analyzer.SymExecWrapper")
+def test_result_cache_is_invalidated_by_detector_version(
+    mock_sym, mock_fire_lasers, tmp_path
+):
+    # Arrange
+    type(mock_sym.return_value).execution_info = PropertyMock(return_value=[])
+    _bytecode_analyzer(tmp_path).fire_lasers(modules=[])
+
+    # Act
+    with patch(
+        "mythril.mythril.mythril_analyzer.detector_version", return_value="changed"
+    ):
+        _bytecode_analyzer(tmp_path).fire_lasers(modules=[])
+
+    # Assert
+    assert mock_sym.call_count == 2
+
+
+@patch("mythril.mythril.mythril_analyzer.fire_lasers", return_value=[])
+@patch("mythril.mythril.mythril_analyzer.SymExecWrapper")
+def test_result_cache_is_invalidated_by_exploration_filters(
+    mock_sym, mock_fire_lasers, tmp_path
+):
+    # Arrange
+    type(mock_sym.return_value).execution_info = PropertyMock(return_value=[])
+    _bytecode_analyzer(tmp_path).fire_lasers(modules=[])
+
+    # Act
+    _bytecode_analyzer(tmp_path, explore_deny={"FUNCTION": ["burn"]}).fire_lasers(
+        modules=[]
+    )
+    _bytecode_analyzer(tmp_path, explore_allow={"FUNCTION": ["burn"]}).fire_lasers(
+        modules=[]
+    )
+
+    # Assert
+    assert mock_sym.call_count == 3
+
+
+@patch("mythril.mythril.mythril_analyzer.fire_lasers", return_value=[])
+@patch("mythril.mythril.mythril_analyzer.SymExecWrapper")
+def test_result_cache_is_invalidated_by_function_budgets(
+    mock_sym, mock_fire_lasers, tmp_path
+):
+    # Arrange
+    type(mock_sym.return_value).execution_info = PropertyMock(return_value=[])
+    _bytecode_analyzer(tmp_path).fire_lasers(modules=[])
+
+    # Act
+    for budget in (
+        "function_timeout",
+        "function_max_states",
+        "function_max_solver_calls",
+    ):
+        _bytecode_analyzer(tmp_path, **{budget: 10}).fire_lasers(modules=[])
+
+    # Assert
+    assert mock_sym.call_count == 4
+
+
+def _address_analyzer(cache_dir, block):
+    eth = EthJsonRpc("127.0.0.1", 8545)
+    disassembler = MythrilDisassembler(eth=eth)
+    disassembler.load_from_bytecode("0x6001600055", bin_runtime=True)
+    disassembler.block = block
+    return MythrilAnalyzer(
+        disassembler,
+        cmd_args=_cmd_args(result_cache=str(cache_dir), no_onchain_data=False),
+        address="0x" + "ab" * 20,
+    )
+
+
+@patch("mythril.mythril.mythril_analyzer.fire_lasers", return_value=[])
+@patch("mythril.mythril.mythril_analyzer.SymExecWrapper")
+def test_result_cache_of_deployed_contracts_is_keyed_by_block(
+    mock_sym, mock_fire_lasers, tmp_path
+):
+    # Arrange
+    type(mock_sym.return_value).execution_info = PropertyMock(return_value=[])
+    _address_analyzer(tmp_path, 100).fire_lasers(modules=[])
+
+    # Act
+    _address_analyzer(tmp_path, 100).fire_lasers(modules=[])
+    _address_analyzer(tmp_path, 101).fire_lasers(modules=[])
+
+    # Assert
+    assert mock_sym.call_count == 2
@@ -0,0 +1,41 @@
+from mythril.support.persistent_map import PersistentMap
+
+
+class Collision:
+    def __init__(self, name):
+        self.name = name
+
+    def __hash__(self):
+        return 7
+
+    def __eq__(self, other):
+        return isinstance(other, Collision) and other.name == self.name
+
+
+def test_set_leaves_the_old_map_unchanged():
+    # Arrange
+    old = PersistentMap()
+    for key in range(1000):
+        old = old.set(key, key * 2)
+
+    # Act
+    new = old.set(5, "five").set(1000, 0)
+
+    # Assert
+    assert len(old) == 1000 and len(new) == 1001
+    assert old[5] == 10 and new[5] == "five"
+    assert 1000 not in old and new[1000] == 0
+    assert all(new.get(key) == key * 2 for key in range(6, 1000))
+
+
+def test_keys_with_one_hash_are_kept_apart():
+    # Arrange
+    a, b = Collision("a"), Collision("b")
+
+    # Act
+    both = PersistentMap().set(a, 1).set(b, 2).set(a, 3)
+
+    # Assert
+    assert len(both) == 2
+    assert both[a] == 3 and both[b] == 2
+    assert both.get(Collision("c"), "missing") == "missing"
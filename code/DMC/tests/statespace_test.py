@@ -24,9 +24,19 @@ def test_statespace_dump():
             custom_modules_directory=None,
             pruning_factor=0,
             parallel_solving=True,
+            incremental_solving=False,
+            result_cache=None,
             unconstrained_storage=True,
             call_depth_limit=3,
             disable_iprof=True,
+            disable_block_stepping=False,
+            explore_allow=None,
+            explore_deny=None,
+            function_timeout=None,
+            function_max_states=None,
+            function_max_solver_calls=None,
+            transaction_workers=0,
+            state_workers=0,
             solver_log=None,
             transaction_sequences=None,
             disable_coverage_strategy=False,
@@ -0,0 +1,64 @@
+import z3
+
+from mythril.laser.ethereum.state.account import Account
+from mythril.laser.ethereum.state.world_state import WorldState
+from mythril.laser.smt import symbol_factory
+from mythril.support import z3_pickle
+
+
+def test_expressions_round_trip_with_shared_subterms():
+    # Arrange
+    x = z3.BitVec("x", 256)
+    storage = z3.Array("Storage", z3.BitVecSort(256), z3.BitVecSort(256))
+    shared = z3.Store(storage, x, x + 1)
+    keccak = z3.Function("keccak256_512", z3.BitVecSort(512), z3.BitVecSort(256))
+    obj = {
+        "values": [shared[0], shared[x] == 5, keccak(z3.Concat(x, x))],
+        "sorts": [x.sort(), storage.sort()],
+        "decl": keccak,
+    }
+
+    # Act
+    loaded = z3_pickle.loads(z3_pickle.dumps(obj))
+
+    # Assert
+    assert all(a.eq(b) for a, b in zip(loaded["values"], obj["values"]))
+    assert loaded["sorts"] == obj["sorts"]
+    assert loaded["decl"](z3.Concat(x, x)).eq(obj["values"][2])
+
+
+def test_world_state_round_trip():
+    # Arrange
+    world_state = WorldState()
+    account = Account("0x10", balances=world_state.balances)
+    world_state.put_account(account)
+    account.storage[symbol_factory.BitVecSym("slot", 256)] = symbol_factory.BitVecVal(
+        7, 256
+    )
+    world_state.constraints.append(
+        account.balance() > symbol_factory.BitVecVal(100, 256)
+    )
+
+    # Act
+    loaded = z3_pickle.loads(z3_pickle.dumps(world_state))
+
+    # Assert
+    loaded_account = loaded.accounts[0x10]
+    assert loaded_account.balance().raw.eq(account.balance().raw)
+    assert (
+        loaded_account.storage[symbol_factory.BitVecSym("slot", 256)].value == 7
+    )
+    assert loaded.constraints[0].raw.eq(world_state.constraints[0].raw)
+
+
+def test_expressions_of_other_contexts_are_translated():
+    # Arrange
+    context = z3.Context()
+    y = z3.BitVec("y", 8, ctx=context)
+
+    # Act
+    loaded = z3_pickle.loads(z3_pickle.dumps(y + 1))
+
+    # Assert
+    assert loaded.ctx == z3.main_ctx()
+    assert loaded.eq(z3.BitVec("y", 8) + 1)